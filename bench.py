@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# Sin pantalla: los benchmarks corren igual en la Raspberry y en un servidor
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import pygame
+
+BASELINES_PATH = 'bench_baselines.json'
+
+# Umbral de regresión relativo y piso absoluto (las medidas de pocos
+# microsegundos tienen más ruido que cambio real)
+DEFAULT_THRESHOLD = 0.25
+MIN_REGRESSION_US = 2.0
+
+# Cada ronda dura al menos esto; se informa la mejor ronda (el ruido del
+# sistema solo suma tiempo, así que el mínimo es lo más estable)
+ROUND_SECONDS = 0.05
+ROUNDS = 7
+# Un caso que parece empeorar se vuelve a medir antes de informarlo
+RECHECKS = 2
+
+WIDTH, HEIGHT = 800, 600
+SIZES = (74, 100, 150, 200)
+ANGLES = (0, 15, 45, 90)
+LETTER_COUNTS = (10, 50, 100)
+WORD = "MOVIMIENTO"
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Registra una función que prepara el caso y devuelve lo que se mide"""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def measure(fn):
+    """Microsegundos por llamada: mínimo de ROUNDS rondas calibradas"""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= ROUND_SECONDS:
+            break
+        loops *= 2
+    rounds = [elapsed / loops]
+    for _ in range(ROUNDS - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        rounds.append((time.perf_counter() - start) / loops)
+    return min(rounds) * 1e6
+
+
+# --- Primitivas del bucle principal ---
+
+def _register_primitives():
+    for size in SIZES:
+        benchmark(f"font_construct/{size}")(lambda size=size: lambda: pygame.font.Font(None, size))
+
+        def render(size=size):
+            font = pygame.font.Font(None, size)
+            return lambda: font.render("M", True, (0, 0, 0))
+        benchmark(f"font_render/{size}")(render)
+
+        for angle in ANGLES:
+            def rotate(size=size, angle=angle):
+                text = pygame.font.Font(None, size).render("M", True, (0, 0, 0))
+                return lambda: pygame.transform.rotate(text, angle)
+            benchmark(f"rotate/{size}/{angle}")(rotate)
+
+        def blit(size=size):
+            screen = pygame.display.get_surface()
+            text = pygame.transform.rotate(pygame.font.Font(None, size).render("M", True, (0, 0, 0)), 30)
+            return lambda: screen.blit(text, (100, 100))
+        benchmark(f"blit/{size}")(blit)
+
+    for count in LETTER_COUNTS:
+        def compose(count=count):
+            # Igual que un cuadro de movimiento.py: fuente, render, rotación y blit por letra
+            screen = pygame.display.get_surface()
+            letters = [(WORD[i % len(WORD)], SIZES[i % len(SIZES)], (i * 37) % 360,
+                        (50 + i * 70) % WIDTH, HEIGHT // 2) for i in range(count)]
+
+            def frame():
+                screen.fill((255, 255, 255))
+                for letter, size, rotation, x, y in letters:
+                    text = pygame.font.Font(None, size).render(letter, True, (0, 0, 0))
+                    rotated = pygame.transform.rotate(text, rotation)
+                    screen.blit(rotated, rotated.get_rect(center=(x, y)))
+            return frame
+        benchmark(f"compose/{count}")(compose)
+
+
+_register_primitives()
+
+
+def _register_renderers():
+    # Camino anterior de movimiento.py frente a los dos backends de renderers.py
+    from renderers import FontRenderer, FreetypeRenderer
+
+    for size in range(74, 201, 21):
+        def legacy(size=size):
+            screen = pygame.display.get_surface()
+            state = {'angle': 0}
+
+            def draw():
+                state['angle'] = (state['angle'] + 7) % 360
+                text = pygame.font.Font(None, size).render("M", True, (0, 0, 0))
+                rotated = pygame.transform.rotate(text, state['angle'])
+                screen.blit(rotated, rotated.get_rect(center=(400, 300)))
+            return draw
+        benchmark(f"draw/legacy/{size}")(legacy)
+
+        for backend in (FontRenderer, FreetypeRenderer):
+            def draw_with(size=size, backend=backend):
+                screen = pygame.display.get_surface()
+                renderer = backend()
+                state = {'angle': 0}
+
+                def draw():
+                    state['angle'] = (state['angle'] + 7) % 360
+                    renderer.draw(screen, "M", size, state['angle'], (400, 300))
+                return draw
+            benchmark(f"draw/{backend.name}/{size}")(draw_with)
+
+
+_register_renderers()
+
+
+# --- Ejecución y comparación ---
+
+def machine_info():
+    return {
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'sdl': '.'.join(map(str, pygame.get_sdl_version())),
+    }
+
+
+def run(pattern=None):
+    """Mide los casos (pygame ya iniciado con una pantalla)"""
+    results = {}
+    for name, setup in BENCHMARKS:
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(setup())
+        print(f"{name:<24} {results[name]:>10.2f} µs")
+    return results
+
+
+def remeasure(name):
+    return measure(dict(BENCHMARKS)[name]())
+
+
+def load_baselines(path=BASELINES_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error leyendo las referencias: {e}")
+        return None
+
+
+def save_baselines(results, path=BASELINES_PATH):
+    try:
+        with open(path, 'w') as f:
+            json.dump({'machine': machine_info(), 'results': results}, f, indent=2, sort_keys=True)
+        print(f"Referencias guardadas en {path}")
+    except OSError as e:
+        print(f"Error guardando las referencias: {e}")
+
+
+def compare(results, baselines, threshold=DEFAULT_THRESHOLD, recheck=None):
+    """Lista de (nombre, referencia, actual, cambio) que superan el umbral
+
+    Con `recheck(nombre)` cada caso sospechoso se mide otra vez hasta
+    RECHECKS veces y solo se informa si sigue por encima del umbral.
+    """
+    if baselines['machine'] != machine_info():
+        print(f"Aviso: referencias tomadas en otro entorno ({baselines['machine']})")
+    regressions = []
+    for name, current in results.items():
+        base = baselines['results'].get(name)
+        if base is None:
+            continue
+        for _ in range(RECHECKS if recheck else 0):
+            if not _regressed(base, current, threshold):
+                break
+            current = min(current, recheck(name))
+        if _regressed(base, current, threshold):
+            regressions.append((name, base, current, (current - base) / base))
+    return regressions
+
+
+def _regressed(base, current, threshold):
+    return (current - base) / base > threshold and current - base > MIN_REGRESSION_US
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks del dibujo de letras")
+    parser.add_argument('pattern', nargs='?', help="solo los casos que contienen este texto")
+    parser.add_argument('--save', action='store_true', help="guardar los resultados como referencia")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="regresión relativa tolerada (0.25 = 25%%)")
+    parser.add_argument('--baselines', default=BASELINES_PATH)
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    try:
+        results = run(args.pattern)
+        if args.save:
+            baselines = load_baselines(args.baselines) or {'results': {}}
+            baselines['results'].update(results)
+            save_baselines(baselines['results'], args.baselines)
+            return 0
+
+        baselines = load_baselines(args.baselines)
+        if baselines is None:
+            print(f"Sin referencias: ejecuta 'python3 bench.py --save' para crear {args.baselines}")
+            return 0
+        regressions = compare(results, baselines, args.threshold, remeasure)
+    finally:
+        pygame.quit()
+    for name, base, current, change in regressions:
+        print(f"REGRESIÓN {name}: {base:.2f} -> {current:.2f} µs (+{change:.0%})")
+    if regressions:
+        return 1
+    print("Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import math
+import time
+from array import array
+
+# Ejes de pygame de cada stick del control Xbox
+STICK_AXES = {'LEFT': (0, 1), 'RIGHT': (3, 4)}
+
+# Margen sobre el ruido medido en reposo para la zona muerta
+DEADZONE_MARGIN = 1.5
+DEADZONE_MIN = 0.03
+DEADZONE_MAX = 0.5
+
+# Percentil del barrido tomado como extremo (descarta picos aislados)
+EXTENT_PERCENTILE = 0.995
+
+# Un barrido que no llega a esta distancia del centro no se usa para la ganancia
+MIN_SWEEP_EXTENT = 0.5
+
+
+def collect_samples(joystick, seconds, interval=0.001):
+    """Lee ambos sticks durante `seconds` segundos
+
+    Devuelve {stick: (xs, ys)} con las muestras en arrays compactos.
+    """
+    import pygame
+
+    samples = {stick: (array('f'), array('f')) for stick in STICK_AXES}
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        # Sin pump los valores de get_axis quedan congelados
+        pygame.event.pump()
+        for stick, (ax, ay) in STICK_AXES.items():
+            xs, ys = samples[stick]
+            xs.append(joystick.get_axis(ax))
+            ys.append(joystick.get_axis(ay))
+        time.sleep(interval)
+    return samples
+
+
+def _percentile(sorted_values, q):
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def fit_rest(xs, ys):
+    """Ajusta centro y zona muerta elíptica a partir de muestras en reposo"""
+    n = len(xs)
+    if n == 0:
+        raise ValueError("No hay muestras en reposo")
+
+    center_x = sum(xs) / n
+    center_y = sum(ys) / n
+
+    # Semiejes de la elipse: desviación máxima en cada eje con margen
+    dev_x = max(abs(x - center_x) for x in xs)
+    dev_y = max(abs(y - center_y) for y in ys)
+    dev_r = max(math.hypot(x - center_x, y - center_y) for x, y in zip(xs, ys))
+
+    def clamp(v):
+        return min(DEADZONE_MAX, max(DEADZONE_MIN, v * DEADZONE_MARGIN))
+
+    return {
+        'center_x': center_x,
+        'center_y': center_y,
+        'dead_zone': clamp(dev_r),
+        'dead_zone_x': clamp(dev_x),
+        'dead_zone_y': clamp(dev_y),
+    }
+
+
+def _fit_axis_gain(values, center):
+    # Extensión del recorrido a cada lado del centro
+    pos = sorted(v - center for v in values if v > center)
+    neg = sorted(center - v for v in values if v < center)
+    gain = [1.0, 1.0]
+    for i, side in enumerate((neg, pos)):
+        if side:
+            extent = _percentile(side, EXTENT_PERCENTILE)
+            if extent >= MIN_SWEEP_EXTENT:
+                gain[i] = 1.0 / extent
+    return gain
+
+
+def fit_sweep(xs, ys, center_x, center_y):
+    """Ajusta la ganancia de cada semieje a partir de barridos circulares
+
+    La ganancia se guarda como [negativa, positiva] para corregir sticks
+    cuyo recorrido no es simétrico respecto al centro.
+    """
+    if len(xs) == 0:
+        raise ValueError("No hay muestras del barrido")
+    return {
+        'gain_x': _fit_axis_gain(xs, center_x),
+        'gain_y': _fit_axis_gain(ys, center_y),
+    }
+
+
+def calibrate(rest, sweep):
+    """Combina reposo y barrido en la configuración de un stick"""
+    xs, ys = rest
+    result = fit_rest(xs, ys)
+    result.update(fit_sweep(sweep[0], sweep[1], result['center_x'], result['center_y']))
+
+    # La zona muerta se aplica después de la ganancia: pasarla a esas unidades
+    gx = max(result['gain_x'])
+    gy = max(result['gain_y'])
+    result['dead_zone_x'] = min(DEADZONE_MAX, result['dead_zone_x'] * gx)
+    result['dead_zone_y'] = min(DEADZONE_MAX, result['dead_zone_y'] * gy)
+    result['dead_zone'] = min(DEADZONE_MAX, result['dead_zone'] * max(gx, gy))
+    result['dead_zone_shape'] = 'elliptical'
+    return result
+
@@ -0,0 +1,84 @@
+from input_shaping import StickShaper
+
+# Límites y pasos de los gatillos y del stick derecho
+MIN_SIZE = 74
+MAX_SIZE = 200
+SIZE_STEP = 2
+ROTATION_SPEED = 5  # Grados por evento con el stick derecho al máximo
+
+
+class Player:
+    """Estado de entrada de quien controla una letra (control local o remoto)"""
+
+    def __init__(self, left_shaper=None, right_shaper=None, selected_index=0):
+        self.left_shaper = left_shaper or StickShaper()
+        self.right_shaper = right_shaper or StickShaper()
+        self.selected_index = selected_index
+        self.left_stick_x = 0
+        self.left_stick_y = 0
+        self.move_active = False
+
+
+def apply_event(player, ev_type, code, state, letter_sizes, letter_rotations):
+    """Aplica un evento con la semántica de la librería inputs
+
+    Devuelve True si el evento pide salir de la aplicación (botón Start).
+    """
+    selected_index = player.selected_index
+
+    if ev_type == "Absolute":
+        # Stick izquierdo
+        if code == "ABS_X":  # Movimiento horizontal
+            # Zona muerta radial y curva de respuesta por tabla
+            player.left_stick_x, player.left_stick_y = player.left_shaper.update_x(state)
+            player.move_active = player.left_stick_x != 0 or player.left_stick_y != 0
+
+        elif code == "ABS_Y":  # Movimiento vertical
+            player.left_stick_x, player.left_stick_y = player.left_shaper.update_y(state)
+            player.move_active = player.left_stick_x != 0 or player.left_stick_y != 0
+
+        elif code == "ABS_Z":  # Gatillo izquierdo
+            if state > 0:
+                letter_sizes[selected_index] = max(MIN_SIZE, letter_sizes[selected_index] - SIZE_STEP)
+
+        elif code == "ABS_RZ":  # Gatillo derecho
+            if state > 0:
+                letter_sizes[selected_index] = min(MAX_SIZE, letter_sizes[selected_index] + SIZE_STEP)
+
+        # Stick derecho para rotación
+        elif code == "ABS_RX":  # Eje X del stick derecho
+            # Rotar más rápido cuando el stick se mueve más
+            rotation_speed = player.right_shaper.shape_axis(state) * ROTATION_SPEED
+            if rotation_speed:
+                letter_rotations[selected_index] += rotation_speed
+                # Mantener el ángulo entre 0 y 360 grados
+                letter_rotations[selected_index] %= 360
+
+    elif ev_type == "Key" and state == 1:
+        if code == "BTN_SOUTH":  # Botón A
+            player.selected_index = (selected_index + 1) % len(letter_sizes)
+        elif code == "BTN_NORTH":  # Botón Y
+            player.selected_index = (selected_index - 1) % len(letter_sizes)
+        elif code == "BTN_START":  # Botón Start
+            return True
+
+    return False
+
+
+class ButtonCombo:
+    """Detecta una combinación de botones pulsados a la vez (semántica de inputs)"""
+
+    def __init__(self, *codes):
+        self.codes = frozenset(codes)
+        self.held = set()
+
+    def update(self, code, state):
+        """Devuelve True en la pulsación que completa la combinación"""
+        if code not in self.codes:
+            return False
+        if state:
+            completed = code not in self.held and len(self.held) == len(self.codes) - 1
+            self.held.add(code)
+            return completed
+        self.held.discard(code)
+        return False
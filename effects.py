@@ -0,0 +1,223 @@
+import time
+
+import numpy as np
+import pygame
+
+# Capacidad fija del sistema de partículas (tope duro)
+PARTICLE_CAPACITY = 2048
+PARTICLE_LIFETIME = 0.8  # Segundos
+PARTICLE_SPEED = 180.0  # Píxeles por segundo
+PARTICLE_DRAG = 0.9  # Fracción de velocidad que se conserva por segundo
+BURST_SIZE = 96
+
+# Estela: anillo de superficies reutilizadas
+TRAIL_LENGTH = 8
+TRAIL_SLOT_SIZE = 320  # Lado del glifo rotado más grande (tamaño 200)
+TRAIL_ALPHA = 120
+
+# Presupuesto por cuadro del efecto; por encima se baja la calidad
+EFFECTS_BUDGET_MS = 3.0
+QUALITY_STEPS = (0.25, 0.5, 0.75, 1.0)
+
+
+class ParticleSystem:
+    """Partículas en arrays preasignados con nacimiento en orden circular
+
+    Todas las partículas viven lo mismo, así que las vivas ocupan un tramo
+    contiguo del anillo (de la más vieja a la más nueva) y se actualizan con
+    operaciones vectorizadas sobre vistas, sin crear arrays por cuadro.
+    """
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.birth = np.zeros(capacity, np.float64)
+        self.color = np.zeros(capacity, np.uint32)
+        self.ipos = np.zeros((capacity, 2), np.intp)
+        self.step = np.zeros((capacity, 2), np.float32)
+        # Buffers del dibujo: máscara de visibles, visibles compactadas y
+        # sus desplazamientos de +1 píxel
+        self.visible = np.zeros(capacity, bool)
+        self.inside = np.zeros(capacity, bool)
+        self.draw_xy = np.zeros((4, capacity), np.intp)
+        self.draw_color = np.zeros(capacity, np.uint32)
+
+        # Direcciones aleatorias precalculadas para las ráfagas
+        rng = np.random.default_rng(seed)
+        angles = rng.uniform(0, 2 * np.pi, capacity)
+        speeds = rng.uniform(0.3, 1.0, capacity) * PARTICLE_SPEED
+        self.directions = np.stack((np.cos(angles) * speeds, np.sin(angles) * speeds), axis=1).astype(np.float32)
+
+        self.head = 0  # Próximo hueco a escribir
+        self.count = 0  # Partículas vivas (desde head - count)
+
+    def _segments(self):
+        # Tramo vivo como una o dos vistas del anillo
+        start = (self.head - self.count) % self.capacity
+        end = start + self.count
+        if end <= self.capacity:
+            return (slice(start, end),)
+        return slice(start, self.capacity), slice(0, end - self.capacity)
+
+    def emit(self, x, y, color, count, now):
+        count = min(count, self.capacity)
+        end = self.head + count
+        if end <= self.capacity:
+            rings = (slice(self.head, end),)
+        else:
+            rings = (slice(self.head, self.capacity), slice(0, end - self.capacity))
+        for ring in rings:
+            self.pos[ring] = (x, y)
+            # Cada hueco tiene su dirección precalculada; como cada ráfaga
+            # empieza en otro hueco, las ráfagas no se repiten
+            self.vel[ring] = self.directions[ring]
+            self.birth[ring] = now
+            self.color[ring] = color
+        self.head = end % self.capacity
+        # Si se llena el anillo, las más viejas se sobrescriben (tope duro)
+        self.count = min(self.capacity, self.count + count)
+
+    def update(self, dt, now):
+        # Retirar las partículas que cumplieron su vida (las más viejas primero)
+        limit = now - PARTICLE_LIFETIME
+        for seg in self._segments():
+            dead = int(np.searchsorted(self.birth[seg], limit, side='right'))
+            self.count -= dead
+            if dead < seg.stop - seg.start:
+                break
+
+        drag = PARTICLE_DRAG ** dt
+        for seg in self._segments():
+            vel = self.vel[seg]
+            step = self.step[seg]
+            np.multiply(vel, dt, out=step)
+            self.pos[seg] += step
+            vel *= drag
+
+    def draw(self, surface):
+        if self.count == 0:
+            return
+        width, height = surface.get_size()
+        pixels = pygame.surfarray.pixels2d(surface)
+        try:
+            for seg in self._segments():
+                ipos = self.ipos[seg]
+                np.copyto(ipos, self.pos[seg], casting='unsafe')
+                # Las que salieron de la pantalla no se dibujan (no se pegan al borde)
+                visible, inside = self.visible[seg], self.inside[seg]
+                np.greater_equal(ipos[:, 0], 0, out=visible)
+                np.less(ipos[:, 0], width - 1, out=inside)
+                visible &= inside
+                np.greater_equal(ipos[:, 1], 0, out=inside)
+                visible &= inside
+                np.less(ipos[:, 1], height - 1, out=inside)
+                visible &= inside
+                n = int(np.count_nonzero(visible))
+                if n == 0:
+                    continue
+                xs, ys, xs1, ys1 = self.draw_xy[:, :n]
+                colors = self.draw_color[:n]
+                np.compress(visible, ipos[:, 0], out=xs)
+                np.compress(visible, ipos[:, 1], out=ys)
+                np.compress(visible, self.color[seg], out=colors)
+                np.add(xs, 1, out=xs1)
+                np.add(ys, 1, out=ys1)
+                # Puntos de 2x2 píxeles
+                pixels[xs, ys] = colors
+                pixels[xs1, ys] = colors
+                pixels[xs, ys1] = colors
+                pixels[xs1, ys1] = colors
+        finally:
+            del pixels
+
+
+class TrailRing:
+    """Estela de una letra: anillo fijo de superficies que se reutilizan"""
+
+    def __init__(self, length=TRAIL_LENGTH, slot_size=TRAIL_SLOT_SIZE):
+        self.slots = [pygame.Surface((slot_size, slot_size), pygame.SRCALPHA) for _ in range(length)]
+        self.rects = [None] * length
+        self.head = 0
+
+    def record(self, glyph, rect):
+        """Copia el glifo rotado en el siguiente hueco del anillo"""
+        slot = self.slots[self.head]
+        slot.fill((0, 0, 0, 0))
+        slot.blit(glyph, (0, 0))
+        self.rects[self.head] = rect.copy()
+        self.head = (self.head + 1) % len(self.slots)
+
+    def fade(self):
+        """Avanza sin copiar nada: la estela se apaga cuando la letra se detiene"""
+        self.rects[self.head] = None
+        self.head = (self.head + 1) % len(self.slots)
+
+    def draw(self, surface, length):
+        n = len(self.slots)
+        for k in range(1, length + 1):
+            i = (self.head - k) % n
+            rect = self.rects[i]
+            if rect is None:
+                continue
+            slot = self.slots[i]
+            # Más transparente cuanto más vieja es la copia
+            slot.set_alpha(TRAIL_ALPHA * (length - k + 1) // length)
+            surface.blit(slot, rect.topleft, (0, 0, rect.width, rect.height))
+
+
+class EffectsLayer:
+    """Capa opcional de estelas y partículas con calidad adaptable
+
+    Si el efecto supera EFFECTS_BUDGET_MS se reduce la calidad (menos
+    partículas por ráfaga y estelas más cortas) antes que la tasa de
+    cuadros; cuando sobra tiempo se recupera poco a poco.
+    """
+
+    def __init__(self, trails=1, budget_ms=EFFECTS_BUDGET_MS):
+        self.particles = ParticleSystem()
+        self.trails = [TrailRing() for _ in range(trails)]
+        self.budget_ms = budget_ms
+        self.quality = len(QUALITY_STEPS) - 1
+        self.last_ms = 0.0
+        self.last_time = None
+
+    @property
+    def level(self):
+        return QUALITY_STEPS[self.quality]
+
+    def burst(self, x, y, surface, color):
+        count = int(BURST_SIZE * self.level)
+        self.particles.emit(x, y, surface.map_rgb(color), count, time.monotonic())
+
+    def record_trail(self, trail_index, glyph, rect):
+        self.trails[trail_index].record(glyph, rect)
+
+    def fade_trail(self, trail_index):
+        self.trails[trail_index].fade()
+
+    def trail_length(self):
+        return max(1, int(TRAIL_LENGTH * self.level))
+
+    def draw_trails(self, surface):
+        start = time.perf_counter()
+        length = self.trail_length()
+        for trail in self.trails:
+            trail.draw(surface, length)
+        self.last_ms = (time.perf_counter() - start) * 1000
+
+    def draw_particles(self, surface):
+        start = time.perf_counter()
+        now = time.monotonic()
+        dt = 0.0 if self.last_time is None else min(0.1, now - self.last_time)
+        self.last_time = now
+        self.particles.update(dt, now)
+        self.particles.draw(surface)
+        self.last_ms += (time.perf_counter() - start) * 1000
+        self._adapt()
+
+    def _adapt(self):
+        if self.last_ms > self.budget_ms and self.quality > 0:
+            self.quality -= 1
+        elif self.last_ms < self.budget_ms * 0.5 and self.quality < len(QUALITY_STEPS) - 1:
+            self.quality += 1
@@ -0,0 +1,350 @@
+import math
+import random
+import sys
+import threading
+import time
+from array import array
+
+# Remuestreo a frecuencia fija en un anillo de tamaño fijo
+SAMPLE_RATE = 100  # Hz
+SAMPLE_PERIOD = 1.0 / SAMPLE_RATE
+RING_SIZE = 256  # 2.56 s: un trazo más largo no se considera gesto
+
+# Un trazo empieza cuando un stick sale del reposo y termina cuando vuelve
+# y se queda quieto un momento
+REST_RADIUS = 0.3
+REST_HOLD = 0.08  # Segundos en reposo para cerrar el trazo
+
+# Comparación con las plantillas (estilo $1: arco remuestreado y normalizado)
+POINTS = 32
+ROTATION_STEPS = 12
+
+# Gestos que reconoce el sistema y la acción que disparan en la escena
+ACTIONS = {'circle': 'spin', 'shake': 'scatter', 'flick': 'reassemble'}
+
+AXIS_SCALE = 32768.0
+
+
+def _circle(n, direction):
+    return [(math.cos(direction * 2 * math.pi * k / n), math.sin(direction * 2 * math.pi * k / n))
+            for k in range(n + 1)]
+
+
+def _shake(n, cycles):
+    # Sacudida sobre el eje X: `cycles` oscilaciones completas
+    return [(math.sin(2 * math.pi * cycles * k / n), 0.0) for k in range(n + 1)]
+
+
+def _stroke(points):
+    """Recorta el principio y el final en reposo, como los trazos reales"""
+    moving = [k for k, p in enumerate(points) if math.hypot(*p) > REST_RADIUS]
+    return points[moving[0]:moving[-1] + 1]
+
+
+class Gesture:
+    """Plantilla de gesto: puntos, stick de origen y límites de duración"""
+
+    def __init__(self, name, points, stick, min_duration, max_duration, threshold, rotate=False):
+        self.name = name
+        self.points = _normalize(_resample(points, POINTS))
+        self.stick = stick
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.threshold = threshold
+        # Las plantillas circulares se prueban en varias fases; las lineales
+        # solo en los dos sentidos
+        self.rotations = ROTATION_STEPS if rotate else 2
+
+
+def _resample(points, n):
+    """Remuestrea un trazo a n puntos equiespaciados a lo largo del arco"""
+    length = sum(math.dist(a, b) for a, b in zip(points, points[1:]))
+    if length == 0:
+        return [points[0]] * n
+    step = length / (n - 1)
+    out = [points[0]]
+    acc = 0.0
+    prev = points[0]
+    i = 1
+    while i < len(points) and len(out) < n:
+        d = math.dist(prev, points[i])
+        if d > 0 and acc + d >= step:
+            t = (step - acc) / d
+            prev = (prev[0] + t * (points[i][0] - prev[0]), prev[1] + t * (points[i][1] - prev[1]))
+            out.append(prev)
+            acc = 0.0
+        else:
+            acc += d
+            prev = points[i]
+            i += 1
+    while len(out) < n:
+        out.append(points[-1])
+    return out
+
+
+def _normalize(points):
+    # Centroide en el origen y distancia cuadrática media 1 (escala uniforme
+    # para no amplificar el ruido del eje que apenas se mueve)
+    cx = sum(p[0] for p in points) / len(points)
+    cy = sum(p[1] for p in points) / len(points)
+    moved = [(x - cx, y - cy) for x, y in points]
+    rms = math.sqrt(sum(x * x + y * y for x, y in moved) / len(moved)) or 1.0
+    return [(x / rms, y / rms) for x, y in moved]
+
+
+def _distance(points, template, rotations):
+    """Distancia cuadrática media mínima entre el trazo y la plantilla rotada"""
+    best = math.inf
+    for r in range(rotations):
+        angle = 2 * math.pi * r / rotations
+        c, s = math.cos(angle), math.sin(angle)
+        total = 0.0
+        for (x, y), (tx, ty) in zip(points, template):
+            dx = x * c - y * s - tx
+            dy = x * s + y * c - ty
+            total += dx * dx + dy * dy
+        best = min(best, total)
+    return math.sqrt(best / len(points))
+
+
+# Biblioteca pequeña: giro completo con el stick izquierdo (en ambos
+# sentidos), sacudida izquierda-derecha y golpe rápido del stick derecho
+LIBRARY = [
+    Gesture('circle', _circle(64, 1), 'left', 0.3, 2.0, 0.4, rotate=True),
+    Gesture('circle', _circle(64, -1), 'left', 0.3, 2.0, 0.4, rotate=True),
+    Gesture('shake', _stroke(_shake(128, 2)), 'left', 0.2, 1.5, 0.45),
+    Gesture('shake', _stroke(_shake(128, 3)), 'left', 0.2, 1.5, 0.45),
+    Gesture('flick', _stroke(_shake(128, 0.5)), 'right', 0.04, 0.3, 0.45),
+]
+
+
+class GestureRecognizer:
+    """Reconocedor incremental de gestos sobre ABS_X/ABS_Y/ABS_RX
+
+    `feed` se llama desde el hilo del control por cada evento: solo guarda el
+    valor y, cuando toca, escribe muestras en el anillo (O(1)). La
+    comparación con las plantillas se hace en `poll`, desde el bucle de
+    dibujo, una vez que el trazo termina.
+    """
+
+    def __init__(self, library=LIBRARY):
+        self.library = library
+        self.xs = array('f', bytes(4 * RING_SIZE))
+        self.ys = array('f', bytes(4 * RING_SIZE))
+        self.rxs = array('f', bytes(4 * RING_SIZE))
+        self.lock = threading.Lock()
+        self.x = self.y = self.rx = 0.0
+        self.next_sample = None
+        self.head = 0
+        self.stroke_len = 0  # Muestras del trazo actual (puede superar RING_SIZE)
+        self.rest_samples = 0
+        self.finished = None  # Muestras (x, y, rx) del último trazo cerrado
+        self.events = 0
+
+    def feed(self, code, value, now):
+        """Registra un evento de eje; devuelve enseguida"""
+        with self.lock:
+            if code == 'ABS_X':
+                self.x = value / AXIS_SCALE
+            elif code == 'ABS_Y':
+                self.y = value / AXIS_SCALE
+            elif code == 'ABS_RX':
+                self.rx = value / AXIS_SCALE
+            else:
+                return
+            self.events += 1
+            self._advance(now)
+
+    def _advance(self, now):
+        if self.next_sample is None:
+            self.next_sample = now
+        # Tras una pausa larga no hace falta rellenar más que un anillo
+        if now - self.next_sample > RING_SIZE * SAMPLE_PERIOD:
+            self.next_sample = now - RING_SIZE * SAMPLE_PERIOD
+        while self.next_sample <= now:
+            self._sample()
+            self.next_sample += SAMPLE_PERIOD
+
+    def _sample(self):
+        moving = math.hypot(self.x, self.y) > REST_RADIUS or abs(self.rx) > REST_RADIUS
+        if not moving and self.stroke_len == 0:
+            return
+        i = self.head
+        self.xs[i], self.ys[i], self.rxs[i] = self.x, self.y, self.rx
+        self.head = (i + 1) % RING_SIZE
+        self.stroke_len += 1
+        if moving:
+            self.rest_samples = 0
+            return
+        self.rest_samples += 1
+        if self.rest_samples * SAMPLE_PERIOD >= REST_HOLD:
+            # Trazo cerrado: se copia (tamaño acotado) para compararlo en poll
+            if self.stroke_len <= RING_SIZE:
+                n = self.stroke_len
+                idx = [(self.head - n + k) % RING_SIZE for k in range(n)]
+                self.finished = ([self.xs[k] for k in idx], [self.ys[k] for k in idx],
+                                 [self.rxs[k] for k in idx])
+            self.stroke_len = 0
+            self.rest_samples = 0
+
+    def poll(self, now=None):
+        """Devuelve el nombre del gesto reconocido desde la última llamada o None"""
+        with self.lock:
+            if now is not None and self.next_sample is not None:
+                self._advance(now)
+            finished, self.finished = self.finished, None
+        if finished is None:
+            return None
+        return self.classify(*finished)
+
+    def classify(self, xs, ys, rxs):
+        # Quitar las muestras de reposo del final
+        n = len(xs) - int(REST_HOLD * SAMPLE_RATE)
+        if n < 3:
+            return None
+        duration = n * SAMPLE_PERIOD
+        left_travel = sum(math.hypot(xs[k + 1] - xs[k], ys[k + 1] - ys[k]) for k in range(n - 1))
+        right_travel = sum(abs(rxs[k + 1] - rxs[k]) for k in range(n - 1))
+        if left_travel >= right_travel:
+            stick, path = 'left', list(zip(xs[:n], ys[:n]))
+        else:
+            stick, path = 'right', [(rx, 0.0) for rx in rxs[:n]]
+        if stick == 'right':
+            # Un golpe dura pocas muestras y entre dos de ellas el stick pudo
+            # recorrer buena parte del camino: fijar la entrada y la salida
+            # en el borde del reposo, como en la plantilla
+            first, last = path[0][0], path[-1][0]
+            if abs(first) > REST_RADIUS:
+                path.insert(0, (math.copysign(REST_RADIUS, first), 0.0))
+            if abs(last) > REST_RADIUS:
+                path.append((math.copysign(REST_RADIUS, last), 0.0))
+        points = _normalize(_resample(path, POINTS))
+
+        best, best_distance = None, math.inf
+        for gesture in self.library:
+            if gesture.stick != stick or not gesture.min_duration <= duration <= gesture.max_duration:
+                continue
+            d = _distance(points, gesture.points, gesture.rotations)
+            if d < gesture.threshold and d < best_distance:
+                best, best_distance = gesture.name, d
+        return best
+
+
+# --- Reproducción para medir precisión y rendimiento ---
+
+def synthesize(name, rng, rate=250):
+    """Eventos sintéticos (tiempo, código, valor) de un gesto con ruido"""
+    events = []
+    t = 0.0
+
+    def emit(x=None, y=None, rx=None):
+        nonlocal t
+        t += rng.uniform(0.7, 1.3) / rate
+        for code, v in (('ABS_X', x), ('ABS_Y', y), ('ABS_RX', rx)):
+            if v is not None:
+                v = max(-1.0, min(1.0, v + rng.gauss(0, 0.02)))
+                events.append((t, code, int(v * 32767)))
+
+    if name == 'circle':
+        duration = rng.uniform(0.5, 1.5)
+        direction = rng.choice((1, -1))
+        phase = rng.uniform(0, 2 * math.pi)
+        radius = rng.uniform(0.8, 1.0)
+        steps = int(duration * rate)
+        for k in range(steps // 8):
+            emit(radius * math.cos(phase) * k * 8 / steps, radius * math.sin(phase) * k * 8 / steps)
+        for k in range(steps):
+            a = phase + direction * 2 * math.pi * k / steps
+            emit(radius * math.cos(a), radius * math.sin(a))
+    elif name == 'shake':
+        cycles = rng.choice((2, 3))
+        duration = rng.uniform(0.4, 1.0)
+        steps = int(duration * rate)
+        for k in range(steps):
+            emit(math.sin(2 * math.pi * cycles * k / steps) * rng.uniform(0.85, 1.0), rng.gauss(0, 0.05))
+    elif name == 'flick':
+        duration = rng.uniform(0.06, 0.2)
+        steps = max(6, int(duration * rate))
+        sign = rng.choice((1, -1))
+        for k in range(steps):
+            emit(rx=sign * math.sin(math.pi * k / steps))
+    elif name == 'drive':
+        # Juego normal: llevar una letra de un lado a otro despacio
+        angle = rng.uniform(0, 2 * math.pi)
+        steps = int(rng.uniform(0.5, 2.0) * rate)
+        for k in range(steps):
+            m = min(1.0, k / (0.2 * rate)) * rng.uniform(0.5, 1.0)
+            emit(m * math.cos(angle), m * math.sin(angle))
+    elif name == 'turn':
+        # Rotar una letra con el stick derecho sostenido
+        steps = int(rng.uniform(0.5, 1.5) * rate)
+        sign = rng.choice((1, -1))
+        for k in range(steps):
+            emit(rx=sign * min(1.0, k / (0.1 * rate)))
+    # Volver al centro
+    for _ in range(int(0.2 * rate)):
+        emit(0.0, 0.0, 0.0)
+    return events
+
+
+def replay(recognizer, events, start=0.0):
+    """Alimenta el reconocedor con eventos y devuelve los gestos detectados"""
+    found = []
+    if not events:
+        return found
+    for t, code, value in events:
+        recognizer.feed(code, value, start + t)
+        gesture = recognizer.poll()
+        if gesture is not None:
+            found.append(gesture)
+    gesture = recognizer.poll(start + events[-1][0] + 1.0)
+    if gesture is not None:
+        found.append(gesture)
+    return found
+
+
+def evaluate(trials=100, seed=1):
+    """Precisión por clase y coste por evento sobre gestos sintéticos"""
+    rng = random.Random(seed)
+    classes = ['circle', 'shake', 'flick', 'drive', 'turn']
+    expected = {'drive': None, 'turn': None}
+    print(f"{'Gesto':<8} {'aciertos':>9} {'confusiones'}")
+    total_events = 0
+    feed_time = 0.0
+    correct = total = 0
+    for name in classes:
+        hits = 0
+        confusion = {}
+        for _ in range(trials):
+            recognizer = GestureRecognizer()
+            events = synthesize(name, rng)
+            start = time.perf_counter()
+            found = replay(recognizer, events)
+            feed_time += time.perf_counter() - start
+            total_events += len(events)
+            want = expected.get(name, name)
+            got = found[0] if found else None
+            if got == want and len(found) <= 1:
+                hits += 1
+            else:
+                confusion[got] = confusion.get(got, 0) + 1
+        correct += hits
+        total += trials
+        print(f"{name:<8} {hits / trials:>9.0%} {confusion or ''}")
+    print(f"Precisión total: {correct / total:.1%}")
+    print(f"Coste medio: {feed_time / total_events * 1e6:.2f} µs por evento "
+          f"({total_events / feed_time:,.0f} eventos/s, incluye la comparación)")
+    return correct / total
+
+
+if __name__ == "__main__":
+    # python3 gestures.py            -> precisión y rendimiento con gestos sintéticos
+    # python3 gestures.py grabación.tlm -> gestos presentes en una telemetría grabada
+    if len(sys.argv) > 1:
+        import telemetry
+        recognizer = GestureRecognizer()
+        events = [(t, code, value) for t, code, value in telemetry.load_samples(sys.argv[1])]
+        for gesture in replay(recognizer, events):
+            print(f"{gesture} -> {ACTIONS[gesture]}")
+    else:
+        evaluate()
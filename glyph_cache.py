@@ -0,0 +1,81 @@
+from collections import OrderedDict
+
+import pygame
+
+import memory_budget
+
+# Memoria aproximada de un pygame.font.Font con la fuente por defecto
+FONT_BYTES = 64 * 1024
+
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+class GlyphCache:
+    """Caché de fuentes por tamaño y de máscaras de glifos ya renderizadas
+
+    Crear un pygame.font.Font y rasterizar un glifo son las operaciones más
+    caras del dibujo de las letras; aquí se hacen una sola vez por tamaño.
+    Cada glifo se guarda una sola vez en blanco con su alfa y el color se
+    aplica al dibujarlo (ver highlight.py), así los colores de resaltado no
+    multiplican las superficies. La caché se registra en el presupuesto de
+    memoria y, si hay que liberar, desaloja primero los glifos y luego las
+    fuentes menos usados.
+    """
+
+    def __init__(self, font_path=None, budget=memory_budget.budget):
+        self.font_path = font_path
+        self.fonts = OrderedDict()
+        self.glyphs = OrderedDict()
+        self.bytes = 0
+        self.budget = budget
+        if budget is not None:
+            self.budget_name = budget.register('glyphs', self)
+
+    def footprint(self):
+        return self.bytes
+
+    def evict(self, nbytes):
+        freed = 0
+        while freed < nbytes and self.glyphs:
+            _, surface = self.glyphs.popitem(last=False)
+            freed += surface_bytes(surface)
+        while freed < nbytes and self.fonts:
+            self.fonts.popitem(last=False)
+            freed += FONT_BYTES
+        self.bytes -= freed
+        return freed
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(self.font_path, size)
+            self.fonts[size] = font
+            self._grow(FONT_BYTES)
+        else:
+            self.fonts.move_to_end(size)
+        return font
+
+    def mask(self, text, size):
+        """Glifo en blanco con alfa por píxel (una superficie por glifo)"""
+        key = (text, size)
+        surface = self.glyphs.get(key)
+        if surface is None:
+            surface = self.font(size).render(text, True, (255, 255, 255))
+            self.glyphs[key] = surface
+            self._grow(surface_bytes(surface))
+        else:
+            self.glyphs.move_to_end(key)
+        return surface
+
+    def rotated(self, text, size, rotation):
+        """Copia rotada de la máscara, lista para colorear en el lugar"""
+        # transform.rotate siempre devuelve una superficie nueva (también con
+        # ángulo 0), así que teñirla no altera la caché
+        return pygame.transform.rotate(self.mask(text, size), rotation)
+
+    def _grow(self, nbytes):
+        self.bytes += nbytes
+        if self.budget is not None:
+            self.budget.enforce()
@@ -0,0 +1,119 @@
+import math
+from collections import OrderedDict
+
+import pygame
+
+# Estilos de resaltado de la letra seleccionada
+HIGHLIGHT_STYLES = ('tint', 'pulse', 'outline')
+PULSE_HZ = 1.5
+OUTLINE_WIDTH = 3
+
+# Superficies auxiliares: glifo rotado más grande (tamaño 200)
+SCRATCH_SIZE = 320
+SWATCH_CAPACITY = 16  # Colores sólidos guardados para teñir
+
+# Color de cada jugador (el control local es el primero)
+PLAYER_COLORS = [
+    (0, 255, 0), (255, 0, 128), (0, 128, 255), (255, 160, 0),
+    (160, 0, 255), (0, 200, 200), (200, 200, 0), (255, 64, 64),
+]
+
+
+class Swatches:
+    """Superficies de color sólido para teñir con blit
+
+    Un blit con BLEND_RGBA_MULT usa el camino vectorizado de SDL y es
+    mucho más rápido que `fill` con el mismo modo; cada color se rellena
+    una sola vez y las superficies se reutilizan al cambiar de color.
+    """
+
+    def __init__(self, size=SCRATCH_SIZE, capacity=SWATCH_CAPACITY):
+        self.size = size
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+    def get(self, color):
+        color = tuple(color[:3])
+        surface = self.surfaces.get(color)
+        if surface is not None:
+            self.surfaces.move_to_end(color)
+            return surface
+        if len(self.surfaces) >= self.capacity:
+            _, surface = self.surfaces.popitem(last=False)
+        else:
+            surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+        surface.fill(color + (255,))
+        self.surfaces[color] = surface
+        return surface
+
+
+def tint(surface, color, swatches):
+    """Colorea en el lugar una máscara blanca multiplicando sus canales
+
+    El alfa se multiplica por 255, así que los bordes suavizados del glifo
+    no cambian.
+    """
+    width, height = surface.get_size()
+    if width > swatches.size or height > swatches.size:
+        surface.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
+    else:
+        surface.blit(swatches.get(color), (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return surface
+
+
+def pulse_color(base, color, now, hz=PULSE_HZ, steps=8):
+    """Color que oscila entre `base` y `color` `hz` veces por segundo"""
+    a = round((0.5 - 0.5 * math.cos(2 * math.pi * hz * now)) * steps) / steps
+    return tuple(int(b + (c - b) * a) for b, c in zip(base, color))
+
+
+class Highlighter:
+    """Dibuja máscaras de glifos con color y resaltado mediante mezclas
+
+    Ningún estilo vuelve a rasterizar el glifo: el color se multiplica sobre
+    la copia rotada que el dibujo ya necesita y el contorno reutiliza una
+    única superficie auxiliar. Los colores de `pulse` cambian en cada cuadro
+    y se cuantizan para no rellenar una muestra de color nueva cada vez.
+    """
+
+    def __init__(self, style='tint', base_color=(0, 0, 0), outline_width=OUTLINE_WIDTH):
+        if style not in HIGHLIGHT_STYLES:
+            raise ValueError(f"Estilo de resaltado desconocido: {style}")
+        self.style = style
+        self.base_color = base_color
+        self.offsets = [(dx, dy) for dx in (-outline_width, 0, outline_width)
+                        for dy in (-outline_width, 0, outline_width) if dx or dy]
+        self.scratch = pygame.Surface((SCRATCH_SIZE, SCRATCH_SIZE), pygame.SRCALPHA)
+        self.swatches = Swatches()
+
+    def draw(self, surface, glyph, center, color=None, now=0.0):
+        """Dibuja una máscara rotada centrada en `center`
+
+        `color` es el color de resaltado (None si la letra no está
+        seleccionada). El glifo queda teñido y se devuelve su rectángulo.
+        """
+        rect = glyph.get_rect(center=center)
+        if color is None:
+            tint(glyph, self.base_color, self.swatches)
+        elif self.style == 'pulse':
+            tint(glyph, pulse_color(self.base_color, color, now), self.swatches)
+        elif self.style == 'outline':
+            self._outline(surface, glyph, rect, color)
+            tint(glyph, self.base_color, self.swatches)
+        else:
+            tint(glyph, color, self.swatches)
+        surface.blit(glyph, rect)
+        return rect
+
+    def _outline(self, surface, glyph, rect, color):
+        area = pygame.Rect(0, 0, rect.width, rect.height)
+        if area.width > SCRATCH_SIZE or area.height > SCRATCH_SIZE:
+            scratch = glyph.copy()
+        else:
+            scratch = self.scratch
+            scratch.fill((0, 0, 0, 0), area)
+            # Sumar sobre transparente copia el glifo tal cual (con su alfa)
+            scratch.blit(glyph, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        scratch.blit(self.swatches.get(color), (0, 0), area, special_flags=pygame.BLEND_RGBA_MULT)
+        for dx, dy in self.offsets:
+            surface.blit(scratch, rect.move(dx, dy), area)
@@ -0,0 +1,294 @@
+import struct
+import sys
+from array import array
+
+# Operaciones registradas por letra
+MOVE, RESIZE, ROTATE, SELECT = range(4)
+OP_NAMES = ('mover', 'tamaño', 'rotar', 'seleccionar')
+# Marca de registro que sigue al anterior en el mismo paso de deshacer
+# (p. ej. un giro de todas las letras en el mismo cuadro)
+GROUP = 0x80
+
+# Registro: tiempo desde el inicio de la sesión, letra, operación y dos
+# valores (desplazamiento x/y, cambio de tamaño, giro o selección anterior/nueva)
+RECORD = struct.Struct('<fBBff')
+
+HISTORY_CAPACITY = 65536  # Registros en el anillo (~900 KB)
+CHECKPOINT_INTERVAL = 256  # Registros entre instantáneas completas
+MAX_CHECKPOINTS = 64
+# Cambios de la misma letra y operación separados por menos de esto se
+# acumulan en un solo registro (un arrastre es un solo paso de deshacer)
+COALESCE_GAP = 0.5
+EPSILON = 1e-3
+
+# Archivo exportado: cabecera, instantánea inicial y registros
+FILE_MAGIC = b'MVHS'
+FILE_VERSION = 1
+HEADER = struct.Struct('<4sBHI')  # magia, versión, letras, registros
+
+
+def _wrap(angle):
+    return (angle + 180) % 360 - 180
+
+
+class History:
+    """Registro de cambios por letra con deshacer, rehacer e instantáneas
+
+    Una vez por cuadro `record()` compara la escena con la vista en el
+    cuadro anterior y guarda las diferencias, así registra todo lo que hace
+    la entrada (control local, remoto, gestos) sin tocar esos caminos. Los
+    registros viven en un anillo de tamaño fijo y cada CHECKPOINT_INTERVAL
+    registros se guarda una instantánea completa: deshacer y rehacer
+    recorren un paso y saltar a una instantánea copia un estado, sin
+    importar cuánto lleve abierta la sesión.
+    """
+
+    def __init__(self, positions, sizes, rotations, player, capacity=HISTORY_CAPACITY,
+                 checkpoint_interval=CHECKPOINT_INTERVAL, max_checkpoints=MAX_CHECKPOINTS):
+        self.positions = positions
+        self.sizes = sizes
+        self.rotations = rotations
+        self.player = player
+        self.letters = len(sizes)
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        # Números de secuencia absolutos: [start, end) está en el anillo y
+        # `cursor` es cuántos registros hay aplicados (los demás son rehacer)
+        self.start = self.end = self.cursor = 0
+        self.open = {}  # (letra, operación) -> (secuencia, último cambio)
+        self.frame_records = 0
+        self.baseline = self.snapshot()
+        self.origin = self.baseline  # Composición inicial: volver aquí reinicia la escena
+        self.checkpoints = [(0, self.baseline)]
+
+    @property
+    def nbytes(self):
+        snapshot_bytes = len(self.baseline) * self.baseline.itemsize
+        return len(self.buffer) + snapshot_bytes * (len(self.checkpoints) + 2)
+
+    # --- Estado de la escena ---
+
+    def snapshot(self):
+        state = array('d')
+        for (x, y), size, rotation in zip(self.positions, self.sizes, self.rotations):
+            state.extend((x, y, size, rotation))
+        state.append(self.player.selected_index)
+        return state
+
+    def restore(self, state):
+        for i in range(self.letters):
+            x, y, size, rotation = state[4 * i:4 * i + 4]
+            self.positions[i][0] = x
+            self.positions[i][1] = y
+            self.sizes[i] = int(size)
+            self.rotations[i] = rotation
+        self.player.selected_index = int(state[-1])
+        self._sync()
+
+    def _sync(self):
+        # Lo que cambia el propio historial no se vuelve a registrar
+        self.baseline = self.snapshot()
+        self.open.clear()
+
+    # --- Registro ---
+
+    def _read(self, seq):
+        return RECORD.unpack_from(self.buffer, (seq % self.capacity) * RECORD.size)
+
+    def _write(self, seq, record):
+        RECORD.pack_into(self.buffer, (seq % self.capacity) * RECORD.size, *record)
+
+    def _add(self, now, letter, op, a, b):
+        key = (letter, op)
+        opened = self.open.get(key)
+        if op != SELECT and opened is not None and now - opened[1] < COALESCE_GAP \
+                and self.start <= opened[0] < self.end:
+            # Acumular en el registro abierto de esta letra y operación
+            t, index, flags, old_a, old_b = self._read(opened[0])
+            self._write(opened[0], (t, index, flags, old_a + a, old_b + b))
+            self.open[key] = (opened[0], now)
+            return
+        if self.cursor < self.end:
+            # Un cambio nuevo descarta lo que quedaba por rehacer
+            self.end = self.cursor
+            self.start = min(self.start, self.end)
+            self.checkpoints = [c for c in self.checkpoints if c[0] <= self.end]
+        if self.end - self.start >= self.capacity:
+            self.start += 1
+        flags = op | (GROUP if self.frame_records else 0)
+        self._write(self.end, (now, letter, flags, a, b))
+        self.open[key] = (self.end, now)
+        self.end += 1
+        self.cursor = self.end
+        self.frame_records += 1
+
+    def record(self, now):
+        """Registra los cambios desde el cuadro anterior (`now`: segundos de sesión)"""
+        self.frame_records = 0
+        current = self.snapshot()
+        base = self.baseline
+        for i in range(self.letters):
+            k = 4 * i
+            dx, dy = current[k] - base[k], current[k + 1] - base[k + 1]
+            if abs(dx) > EPSILON or abs(dy) > EPSILON:
+                self._add(now, i, MOVE, dx, dy)
+            if current[k + 2] != base[k + 2]:
+                self._add(now, i, RESIZE, current[k + 2] - base[k + 2], 0.0)
+            turn = _wrap(current[k + 3] - base[k + 3])
+            if abs(turn) > EPSILON:
+                self._add(now, i, ROTATE, turn, 0.0)
+        if current[-1] != base[-1]:
+            self._add(now, int(current[-1]), SELECT, base[-1], current[-1])
+        self.baseline = current
+
+        if self.frame_records and self.end - self.checkpoints[-1][0] >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self):
+        # Los registros abiertos se cierran para que la instantánea y los
+        # registros posteriores no se solapen
+        self.open.clear()
+        self.checkpoints.append((self.cursor, self.snapshot()))
+        if len(self.checkpoints) > self.max_checkpoints:
+            self.checkpoints.pop(0)
+
+    # --- Deshacer, rehacer y saltos ---
+
+    def apply(self, record, direction=1):
+        _, letter, flags, a, b = record
+        op = flags & ~GROUP
+        if op == MOVE:
+            self.positions[letter][0] += a * direction
+            self.positions[letter][1] += b * direction
+        elif op == RESIZE:
+            self.sizes[letter] = int(round(self.sizes[letter] + a * direction))
+        elif op == ROTATE:
+            self.rotations[letter] = (self.rotations[letter] + a * direction) % 360
+        elif op == SELECT:
+            self.player.selected_index = int(a if direction < 0 else b)
+
+    def undo(self):
+        """Deshace un paso (un registro o un grupo del mismo cuadro)"""
+        if self.cursor <= self.start:
+            return False
+        while self.cursor > self.start:
+            self.cursor -= 1
+            record = self._read(self.cursor)
+            self.apply(record, -1)
+            if not record[2] & GROUP:
+                break
+        self._sync()
+        return True
+
+    def redo(self):
+        if self.cursor >= self.end or self.cursor < self.start:
+            return False
+        self.apply(self._read(self.cursor), 1)
+        self.cursor += 1
+        while self.cursor < self.end:
+            record = self._read(self.cursor)
+            if not record[2] & GROUP:
+                break
+            self.apply(record, 1)
+            self.cursor += 1
+        self._sync()
+        return True
+
+    def jump(self, seq, state):
+        """Restaura la instantánea `state` tomada con `seq` registros aplicados"""
+        self.restore(state)
+        self.cursor = seq
+        if seq < self.start:
+            # Los registros siguientes ya no están en el anillo
+            self.start = self.end = seq
+            self.checkpoints = [c for c in self.checkpoints if c[0] <= seq]
+        return True
+
+    def rewind(self):
+        """Salta a la instantánea anterior a la posición actual"""
+        for seq, state in reversed(self.checkpoints):
+            if seq < self.cursor:
+                return self.jump(seq, state)
+        return False
+
+    def reset(self):
+        """Vuelve a la composición inicial (se puede rehacer si sigue en el anillo)"""
+        return self.jump(0, self.origin)
+
+    # --- Exportación y reproducción ---
+
+    def export(self, path):
+        """Guarda la sesión reproducible más larga que queda en memoria"""
+        # Primera instantánea desde la que todos los registros hasta el cursor
+        # siguen en el anillo; si no hay ninguna, el estado actual sin registros
+        candidates = [(0, self.origin)] if self.start == 0 else []
+        candidates += [(s, c) for s, c in self.checkpoints if self.start <= s <= self.cursor]
+        seq, state = min(candidates, key=lambda c: c[0], default=(self.cursor, self.snapshot()))
+        count = self.cursor - seq
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, self.letters, count))
+            f.write(state.tobytes())
+            for s in range(seq, self.cursor):
+                f.write(RECORD.pack(*self._read(s)))
+        return count
+
+
+class SessionReplay:
+    """Reproduce una sesión exportada sobre las listas de la escena"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} no es una sesión exportada")
+        magic, version, letters, count = HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"{path} no es una sesión exportada")
+        state_size = (4 * letters + 1) * 8
+        expected = HEADER.size + state_size + count * RECORD.size
+        if len(data) != expected:
+            raise ValueError(f"{path} está truncado ({len(data)} bytes, se esperaban {expected})")
+        self.letters = letters
+        self.state = array('d')
+        offset = HEADER.size
+        self.state.frombytes(data[offset:offset + state_size])
+        offset += state_size
+        self.records = [RECORD.unpack_from(data, offset + i * RECORD.size) for i in range(count)]
+        self.next = 0
+        self.start = None
+
+    @property
+    def duration(self):
+        if not self.records:
+            return 0.0
+        return self.records[-1][0] - self.records[0][0]
+
+    def step(self, now, history):
+        """Aplica los registros hasta `now` con el historial de la escena
+
+        Devuelve False cuando terminó la sesión.
+        """
+        if self.start is None:
+            self.start = now - (self.records[0][0] if self.records else 0.0)
+            history.restore(self.state)
+        elapsed = now - self.start
+        while self.next < len(self.records) and self.records[self.next][0] <= elapsed:
+            history.apply(self.records[self.next])
+            self.next += 1
+        return self.next < len(self.records)
+
+
+if __name__ == "__main__":
+    # Resumen de una sesión exportada: python3 history.py sesión.mvh
+    if len(sys.argv) < 2:
+        print("Uso: python3 history.py sesión.mvh")
+        sys.exit(1)
+    replay = SessionReplay(sys.argv[1])
+    counts = [0] * len(OP_NAMES)
+    for record in replay.records:
+        counts[record[2] & ~GROUP] += 1
+    print(f"{replay.letters} letras, {len(replay.records)} registros, {replay.duration:.1f} s")
+    for name, count in zip(OP_NAMES, counts):
+        print(f"  {name:<12} {count}")
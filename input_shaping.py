@@ -0,0 +1,169 @@
+import math
+from array import array
+
+# Rango de los ejes de 16 bits que entrega la librería inputs
+AXIS_MIN = -32768
+AXIS_MAX = 32767
+AXIS_SIZE = AXIS_MAX - AXIS_MIN + 1
+
+# Resolución de la tabla de magnitud (cubre 0..sqrt(2) por las esquinas)
+MAGNITUDE_STEPS = 2048
+MAGNITUDE_RANGE = math.sqrt(2)
+
+# Formas de zona muerta soportadas
+DEADZONE_SHAPES = ('axial', 'radial', 'scaled_radial', 'elliptical')
+
+
+def response_curve(name, exponent=2.0):
+    """Devuelve la curva de respuesta f(m) con m y f(m) en 0..1"""
+    if name == 'linear':
+        return lambda m: m
+    if name == 'exponential':
+        # Más precisión cerca del centro y velocidad completa en el borde
+        return lambda m: m ** exponent
+    if name == 's_curve':
+        # Lenta al inicio y al final, rápida en la zona media
+        return lambda m: m ** exponent / (m ** exponent + (1 - m) ** exponent)
+    raise ValueError(f"Curva de respuesta desconocida: {name}")
+
+
+def build_axis_lut(center=0.0, gain=(1.0, 1.0)):
+    """Tabla cruda de 16 bits -> valor normalizado y calibrado
+
+    Incluye el centro y la ganancia [negativa, positiva] que guarda la
+    calibración del perfil, así que no cuestan nada por evento.
+    """
+    gain_neg, gain_pos = gain
+    lut = array('f', bytes(4 * AXIS_SIZE))
+    for i in range(AXIS_SIZE):
+        v = (i + AXIS_MIN) / 32768 - center
+        v *= gain_pos if v > 0 else gain_neg
+        lut[i] = max(-1.0, min(1.0, v))
+    return lut
+
+
+def build_magnitude_lut(dead_zone, shape='scaled_radial', curve='linear', exponent=2.0):
+    """Tabla magnitud -> factor por el que multiplicar (x, y)
+
+    Guardar el factor f(m)/m en lugar de f(m) evita normalizar el vector:
+    la salida es simplemente (x * k, y * k).
+    """
+    f = response_curve(curve, exponent)
+    lut = array('f', bytes(4 * (MAGNITUDE_STEPS + 1)))
+    for i in range(1, MAGNITUDE_STEPS + 1):
+        m = i * MAGNITUDE_RANGE / MAGNITUDE_STEPS
+        if shape != 'axial' and m <= dead_zone:
+            continue
+        if shape == 'scaled_radial':
+            # Reescalar desde el borde de la zona muerta para no perder recorrido
+            shaped = (min(m, 1.0) - dead_zone) / (1.0 - dead_zone)
+        else:
+            shaped = min(m, 1.0)
+        lut[i] = f(shaped) / m
+    return lut
+
+
+class StickShaper:
+    """Forma la entrada de un stick con tablas precalculadas
+
+    Cada evento cuesta un índice en la tabla del eje, una hipotenusa y un
+    índice en la tabla de magnitud. La zona 'elliptical' usa un semieje por
+    eje (`dead_zone_x`, `dead_zone_y`, como los mide la calibración) y
+    reescala desde el borde de la elipse antes de la tabla de la curva.
+    """
+
+    def __init__(self, dead_zone=0.1, shape='scaled_radial', curve='linear',
+                 exponent=2.0, center=(0.0, 0.0), gain_x=(1.0, 1.0), gain_y=(1.0, 1.0),
+                 dead_zone_x=None, dead_zone_y=None):
+        if shape not in DEADZONE_SHAPES:
+            raise ValueError(f"Forma de zona muerta desconocida: {shape}")
+        self.shape = shape
+        self.dead_zone = dead_zone
+        self.lut_x = build_axis_lut(center[0], gain_x)
+        self.lut_y = build_axis_lut(center[1], gain_y)
+        if shape == 'elliptical':
+            # La zona muerta se resuelve antes: la tabla solo aplica la curva
+            self.lut_m = build_magnitude_lut(0.0, 'radial', curve, exponent)
+        else:
+            self.lut_m = build_magnitude_lut(dead_zone, shape, curve, exponent)
+        # Inversos de los semiejes para la prueba de la elipse
+        self.inv_dzx = 1.0 / max(dead_zone if dead_zone_x is None else dead_zone_x, 1e-6)
+        self.inv_dzy = 1.0 / max(dead_zone if dead_zone_y is None else dead_zone_y, 1e-6)
+        self.scale_m = MAGNITUDE_STEPS / MAGNITUDE_RANGE
+        self.x = 0.0
+        self.y = 0.0
+
+    @classmethod
+    def from_profile(cls, stick_config, curve='linear', exponent=2.0):
+        """Crea el shaper a partir de la calibración de un stick del perfil"""
+        shape = stick_config.get('dead_zone_shape', 'radial')
+        if shape == 'radial':
+            shape = 'scaled_radial'
+        dead_zone = stick_config.get('dead_zone', 0.2)
+        return cls(
+            dead_zone=dead_zone,
+            shape=shape,
+            curve=curve,
+            exponent=exponent,
+            center=(stick_config.get('center_x', 0.0), stick_config.get('center_y', 0.0)),
+            gain_x=stick_config.get('gain_x', (1.0, 1.0)),
+            gain_y=stick_config.get('gain_y', (1.0, 1.0)),
+            dead_zone_x=stick_config.get('dead_zone_x', dead_zone),
+            dead_zone_y=stick_config.get('dead_zone_y', dead_zone),
+        )
+
+    def copy(self):
+        """Nuevo shaper con estado propio que comparte las tablas
+
+        Las tablas ocupan ~0.5 MB por eje; varios jugadores con la misma
+        configuración no necesitan duplicarlas.
+        """
+        clone = object.__new__(StickShaper)
+        clone.__dict__.update(self.__dict__)
+        clone.x = 0.0
+        clone.y = 0.0
+        return clone
+
+    def _elliptical(self, x, y):
+        # Cada eje normalizado por su semieje: r <= 1 dentro de la elipse
+        r = math.hypot(x * self.inv_dzx, y * self.inv_dzy)
+        if r <= 1.0:
+            return 0.0, 0.0
+        m = math.hypot(x, y)
+        # Borde de la elipse en la dirección del stick
+        edge = m / r
+        shaped = min(1.0, (m - edge) / (1.0 - edge)) if edge < 1.0 else 1.0
+        k = self.lut_m[int(shaped * self.scale_m)] * shaped / m
+        return x * k, y * k
+
+    def _shape(self):
+        x, y = self.x, self.y
+        if self.shape == 'elliptical':
+            return self._elliptical(x, y)
+        if self.shape == 'axial':
+            # Zona muerta independiente por eje (comportamiento anterior)
+            dz = self.dead_zone
+            x = 0.0 if abs(x) <= dz else x
+            y = 0.0 if abs(y) <= dz else y
+        k = self.lut_m[min(MAGNITUDE_STEPS, int(math.hypot(x, y) * self.scale_m))]
+        return x * k, y * k
+
+    def update_x(self, raw):
+        """Actualiza el eje X con un valor crudo y devuelve (x, y) formados"""
+        # Fuera de rango (otros controladores) se recorta en lugar de dar la vuelta
+        self.x = self.lut_x[min(AXIS_MAX, max(AXIS_MIN, raw)) - AXIS_MIN]
+        return self._shape()
+
+    def update_y(self, raw):
+        """Actualiza el eje Y con un valor crudo y devuelve (x, y) formados"""
+        self.y = self.lut_y[min(AXIS_MAX, max(AXIS_MIN, raw)) - AXIS_MIN]
+        return self._shape()
+
+    def shape_axis(self, raw):
+        """Forma un eje aislado (p. ej. el stick derecho para rotar)"""
+        x = self.lut_x[min(AXIS_MAX, max(AXIS_MIN, raw)) - AXIS_MIN]
+        if self.shape == 'elliptical':
+            # En un eje aislado la elipse se reduce a su semieje X
+            return self._elliptical(x, 0.0)[0]
+        k = self.lut_m[min(MAGNITUDE_STEPS, int(abs(x) * self.scale_m))]
+        return x * k
@@ -0,0 +1,210 @@
+import os
+import signal
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Presupuesto global de las cachés (la Raspberry Pi puede tener 1 GB en total)
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Informes de memoria
+REPORT_DIR = 'memory_reports'
+TRACE_FRAMES = 8  # Profundidad de pila registrada por asignación
+TOP_ALLOCATORS = 25
+RSS_INTERVAL = 30.0  # Segundos entre muestras de RSS
+RSS_SAMPLES = 2880  # 24 horas a 30 s
+
+
+class MemoryBudget:
+    """Contabilidad de memoria de las cachés con un único presupuesto
+
+    Cada caché registrada expone `footprint()` (bytes) y, si puede liberar
+    memoria, `evict(bytes)`, que devuelve lo liberado. Al pasarse del
+    presupuesto se desalojan primero las cachés más grandes.
+    """
+
+    def __init__(self, limit_bytes=DEFAULT_BUDGET_BYTES):
+        self.limit = limit_bytes
+        self.caches = {}
+        self.evicted_bytes = 0
+        self.lock = threading.Lock()
+
+    def register(self, name, cache):
+        """Registra una caché; devuelve el nombre final (único)"""
+        with self.lock:
+            key = name
+            n = 1
+            while key in self.caches:
+                n += 1
+                key = f"{name}#{n}"
+            self.caches[key] = cache
+        return key
+
+    def unregister(self, name):
+        with self.lock:
+            self.caches.pop(name, None)
+
+    def usage(self):
+        with self.lock:
+            return {name: cache.footprint() for name, cache in self.caches.items()}
+
+    def total(self):
+        return sum(self.usage().values())
+
+    def enforce(self):
+        """Desaloja hasta volver al presupuesto; devuelve los bytes liberados"""
+        usage = self.usage()
+        over = sum(usage.values()) - self.limit
+        freed = 0
+        if over <= 0:
+            return 0
+        with self.lock:
+            evictable = [(usage[name], name, cache) for name, cache in self.caches.items()
+                         if hasattr(cache, 'evict')]
+        for _, name, cache in sorted(evictable, key=lambda item: item[0], reverse=True):
+            freed += cache.evict(over - freed)
+            if freed >= over:
+                break
+        self.evicted_bytes += freed
+        return freed
+
+
+class FixedAllocation:
+    """Memoria reservada una sola vez (tablas, buffers): solo se contabiliza"""
+
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+    def footprint(self):
+        return self.nbytes
+
+
+# Presupuesto compartido por todo el proceso
+budget = MemoryBudget()
+
+
+def read_rss():
+    """Memoria residente del proceso en bytes (0 si no se puede leer)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            # En macOS ru_maxrss viene en bytes y en Linux en KB; es el pico, no el actual
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+def rss_slope(samples):
+    """Pendiente de la RSS en bytes por hora (mínimos cuadrados)"""
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_r = sum(r for _, r in samples) / n
+    num = sum((t - mean_t) * (r - mean_r) for t, r in samples)
+    den = sum((t - mean_t) ** 2 for t, _ in samples)
+    return num / den * 3600 if den else 0.0
+
+
+class MemoryTracer:
+    """Informes de memoria bajo demanda para instalaciones de larga duración
+
+    Un hilo muestrea la RSS cada RSS_INTERVAL segundos. `request()` (desde
+    una combinación de botones o SIGUSR1) pide un informe con las mayores
+    asignaciones de tracemalloc, el crecimiento desde el informe anterior, la
+    tendencia de la RSS y el uso del presupuesto. tracemalloc no se activa
+    hasta el primer pedido salvo que se indique `trace=True`, así no cuesta
+    nada mientras no hace falta.
+    """
+
+    def __init__(self, directory=REPORT_DIR, budget=budget, frames=TRACE_FRAMES,
+                 rss_interval=RSS_INTERVAL):
+        self.directory = directory
+        self.budget = budget
+        self.frames = frames
+        self.rss_interval = rss_interval
+        self.rss = deque(maxlen=RSS_SAMPLES)
+        self.pending = threading.Event()
+        self.previous = None
+        self.started_at = time.monotonic()
+
+    def start(self, trace=False, signum=getattr(signal, 'SIGUSR1', None)):
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        if signum is not None and threading.current_thread() is threading.main_thread():
+            signal.signal(signum, lambda *args: self.request())
+        thread = threading.Thread(target=self._run, name="memory-tracer")
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def request(self):
+        """Pide un informe; se escribe en el hilo del trazador, no en el de dibujo"""
+        self.pending.set()
+
+    def _run(self):
+        while True:
+            requested = self.pending.wait(self.rss_interval)
+            self.rss.append((time.monotonic() - self.started_at, read_rss()))
+            if requested:
+                self.pending.clear()
+                try:
+                    path = self.write_report()
+                    print(f"Informe de memoria guardado en {path}")
+                except Exception as e:
+                    print(f"Error escribiendo el informe de memoria: {e}")
+
+    def write_report(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f"memoria-{stamp}.txt")
+        lines = [f"Informe de memoria {time.strftime('%Y-%m-%d %H:%M:%S')}", ""]
+
+        # Tendencia de la RSS
+        samples = list(self.rss)
+        lines.append(f"RSS actual: {read_rss() / 1e6:.1f} MB")
+        lines.append(f"Tendencia: {rss_slope(samples) / 1e6:+.2f} MB/hora en {len(samples)} muestras")
+        step = max(1, len(samples) // 24)
+        for t, rss in samples[::step]:
+            lines.append(f"  {t / 3600:8.2f} h  {rss / 1e6:8.1f} MB")
+        lines.append("")
+
+        # Presupuesto de las cachés
+        if self.budget is not None:
+            usage = self.budget.usage()
+            lines.append(f"Presupuesto: {sum(usage.values()) / 1e6:.1f} / {self.budget.limit / 1e6:.1f} MB, "
+                         f"desalojado: {self.budget.evicted_bytes / 1e6:.1f} MB")
+            for name, nbytes in sorted(usage.items(), key=lambda item: -item[1]):
+                lines.append(f"  {name:<24} {nbytes / 1e6:8.2f} MB")
+            lines.append("")
+
+        # Asignaciones
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            lines.append("tracemalloc iniciado ahora: el próximo informe mostrará las asignaciones")
+        else:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            traced, peak = tracemalloc.get_traced_memory()
+            lines.append(f"Python trazado: {traced / 1e6:.1f} MB (pico {peak / 1e6:.1f} MB)")
+            lines.append("Mayores asignaciones:")
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATORS]:
+                lines.append(f"  {stat}")
+            if self.previous is not None:
+                lines.append("")
+                lines.append("Mayor crecimiento desde el informe anterior:")
+                for stat in snapshot.compare_to(self.previous, 'lineno')[:TOP_ALLOCATORS]:
+                    lines.append(f"  {stat}")
+            self.previous = snapshot
+            # Instantánea completa para analizarla fuera de la instalación
+            snapshot.dump(os.path.join(self.directory, f"memoria-{stamp}.snap"))
+
+        with open(path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        return path
@@ -3,6 +3,16 @@ import random
 from inputs import get_gamepad
 import threading
 import sys
+import os
+import time
+import profile_store
+from input_shaping import StickShaper
+from controls import Player, ButtonCombo, apply_event
+from highlight import PLAYER_COLORS
+from renderers import make_renderer
+import memory_budget
+from network_input import NetworkInputServer
+from scene_sync import SceneBroadcaster
 
 # Inicializar pygame
 pygame.init()
@@ -16,6 +26,66 @@ pygame.display.set_caption("Movimiento")
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 
+# Entrada remota desde teléfonos y portátiles (ver network_input.py)
+NETWORK_INPUT = False
+NETWORK_PORT = 9999
+WEBSOCKET_PORT = None  # Puerto para navegadores (requiere websockets)
+
+# Escena repartida en varias pantallas contiguas (ver scene_sync.py).
+# Con SYNC_NODES > 1 este proceso es el líder y dibuja la porción 0
+SYNC_NODES = 1
+SYNC_INTERFACE = '0.0.0.0'  # '127.0.0.1' para probar varios procesos en un equipo
+WORLD_WIDTH = WIDTH * SYNC_NODES
+
+# Estelas y partículas (ver effects.py, requiere numpy)
+EFFECTS = False
+EFFECTS_TRAILS = 2  # Estelas simultáneas como máximo
+
+# Resaltado de la letra seleccionada: 'tint', 'pulse' u 'outline'; cada
+# jugador tiene su color (ver highlight.py)
+HIGHLIGHT_STYLE = 'tint'
+
+# Dibujo de las letras: 'font' (pygame.font con glifos en caché) o
+# 'freetype' (render_to directo con rotación, ver renderers.py)
+RENDERER = 'font'
+FONT_PATH = None  # Ruta a una fuente TTF propia; None usa la de pygame
+
+# Gestos con los sticks (ver gestures.py): un círculo con el stick izquierdo
+# hace girar todas las letras, una sacudida las dispersa y un golpe rápido
+# del stick derecho vuelve a formar la palabra. Solo con el lector en hilo
+GESTURES = False
+SPIN_SPEED = 12  # Grados por cuadro durante el giro
+
+# Leer el control en un proceso aparte con el estado en memoria compartida
+# (ver shared_input.py); si es False se usa un hilo como siempre
+INPUT_PROCESS = False
+
+# Memoria: presupuesto de las cachés e informes bajo demanda (Select + RB
+# o `kill -USR1 <pid>`), que se guardan en memory_reports/
+MEMORY_BUDGET_MB = 64
+MEMORY_REPORTS = True
+
+# Posprocesado del cuadro: sombra suave y corrección de color (ver postprocess.py)
+POSTPROCESS = False
+
+# Vista previa para el personal de sala (ver preview.py): puerto HTTP o None
+PREVIEW_PORT = None
+
+# Historial para deshacer (ver history.py): Ctrl+Z deshace, Ctrl+Y rehace,
+# RePág vuelve a la instantánea anterior, Inicio a la composición inicial y
+# F12 exporta la sesión a sessions/. HISTORY_REPLAY reproduce una sesión exportada
+HISTORY = True
+HISTORY_REPLAY = None
+
+# Coreografía programada (ver timeline.py): ruta a un .mvk o .json; la
+# entrada del control se suma encima y la letra vuelve a su lugar al soltarla
+TIMELINE = None
+
+# Respuesta de los sticks
+MAX_SPEED = 5  # Píxeles por cuadro con el stick al máximo
+STICK_CURVE = 'exponential'  # 'linear', 'exponential' o 's_curve'
+STICK_CURVE_EXPONENT = 2.0
+
 # Palabra a mostrar
 word = "MOVIMIENTO"
 letters = list(word)
@@ -24,82 +94,185 @@ letters = list(word)
 letter_sizes = [random.randint(74, 200) for _ in letters]
 
 # Posición inicial de las letras
-letter_positions = [
-    [50 + i * 70, HEIGHT // 2] for i in range(len(letters))
-]
+def word_layout():
+    return [[50 + i * 70, HEIGHT // 2] for i in range(len(letters))]
+
+letter_positions = word_layout()
 
 # Ángulos de rotación para cada letra
 letter_rotations = [0 for _ in letters]
 
+# Velocidad máxima de cada letra en píxeles por cuadro
+letter_speed_limits = [MAX_SPEED for _ in letters]
+
+# Forma de la entrada de los sticks según la calibración del perfil
+sticks = profile_store.load_profiles()[0]["Default"]['sticks']
+left_shaper = StickShaper.from_profile(sticks['LEFT'], STICK_CURVE, STICK_CURVE_EXPONENT)
+right_shaper = StickShaper.from_profile(sticks['RIGHT'], STICK_CURVE, STICK_CURVE_EXPONENT)
+
 # Variables de control
-selected_index = 0
-left_stick_x = 0
-left_stick_y = 0
+local_player = Player(left_shaper, right_shaper)
+report_combo = ButtonCombo("BTN_SELECT", "BTN_TR")
+players = [local_player]
 running = True
-move_active = False
 
 # Funciones para manejar el control de Xbox
 def handle_gamepad():
-    global left_stick_x, left_stick_y, running, move_active, selected_index
+    global running
     
     while running:
         try:
             events = get_gamepad()
             for event in events:
-                if event.ev_type == "Absolute":
-                    # Stick izquierdo
-                    if event.code == "ABS_X":  # Movimiento horizontal
-                        if abs(event.state) > 3000:  # Zona muerta
-                            left_stick_x = event.state / 32767 * 5
-                            move_active = True
-                        else:
-                            left_stick_x = 0
-                            move_active = False
-                            
-                    elif event.code == "ABS_Y":  # Movimiento vertical
-                        if abs(event.state) > 3000:  # Zona muerta
-                            left_stick_y = event.state / 32767 * 5
-                            move_active = True
-                        else:
-                            left_stick_y = 0
-                            move_active = False
-                            
-                    elif event.code == "ABS_Z":  # Gatillo izquierdo
-                        if event.state > 0:
-                            letter_sizes[selected_index] = max(74, letter_sizes[selected_index] - 2)
-                            
-                    elif event.code == "ABS_RZ":  # Gatillo derecho
-                        if event.state > 0:
-                            letter_sizes[selected_index] = min(200, letter_sizes[selected_index] + 2)
-                            
-                    # Stick derecho para rotación
-                    elif event.code == "ABS_RX":  # Eje X del stick derecho
-                        if abs(event.state) > 3000:
-                            # Rotar más rápido cuando el stick se mueve más
-                            rotation_speed = event.state / 32767 * 5
-                            letter_rotations[selected_index] += rotation_speed
-                            # Mantener el ángulo entre 0 y 360 grados
-                            letter_rotations[selected_index] %= 360
-                            
-                elif event.ev_type == "Key" and event.state == 1:
-                    if event.code == "BTN_SOUTH":  # Botón A
-                        selected_index = (selected_index + 1) % len(letters)
-                    elif event.code == "BTN_NORTH":  # Botón Y
-                        selected_index = (selected_index - 1) % len(letters)
-                    elif event.code == "BTN_START":  # Botón Start
-                        running = False
+                if gesture_recognizer is not None and event.ev_type == "Absolute":
+                    gesture_recognizer.feed(event.code, event.state, time.monotonic())
+                if apply_event(local_player, event.ev_type, event.code, event.state,
+                               letter_sizes, letter_rotations):
+                    running = False
+                if memory_tracer is not None and event.ev_type == "Key" and \
+                        report_combo.update(event.code, event.state):
+                    memory_tracer.request()
                         
         except Exception as e:
             print(f"Error en el gamepad: {e}")
             continue
 
-# Crear un hilo para manejar el gamepad
-gamepad_thread = threading.Thread(target=handle_gamepad)
-gamepad_thread.daemon = True
-gamepad_thread.start()
+def apply_remote_event(player, ev_type, code, state):
+    apply_event(player, ev_type, code, state, letter_sizes, letter_rotations)
+
+def make_remote_player():
+    # Los jugadores remotos comparten las tablas sin calibrar y empiezan en una letra al azar
+    return Player(remote_shaper.copy(), remote_shaper.copy(), random.randrange(len(letters)))
+
+# Servidor de entrada remota
+network_server = None
+if NETWORK_INPUT:
+    remote_shaper = StickShaper(curve=STICK_CURVE, exponent=STICK_CURVE_EXPONENT)
+    network_server = NetworkInputServer(make_remote_player, port=NETWORK_PORT,
+                                        websocket_port=WEBSOCKET_PORT)
+    network_server.start()
+
+# Reconocedor de gestos
+gesture_recognizer = None
+spin_remaining = 0
+if GESTURES:
+    from gestures import GestureRecognizer, ACTIONS
+    gesture_recognizer = GestureRecognizer()
+
+def run_gesture_action(action):
+    global spin_remaining
+    if action == 'spin':
+        spin_remaining = 360
+    elif action == 'scatter':
+        for pos in letter_positions:
+            pos[0] = random.randint(0, WORLD_WIDTH - 50)
+            pos[1] = random.randint(0, HEIGHT - 50)
+    elif action == 'reassemble':
+        letter_positions[:] = word_layout()
+
+# Presupuesto de memoria y caché de glifos
+memory_budget.budget.limit = MEMORY_BUDGET_MB * 1024 * 1024
+renderer = make_renderer(RENDERER, FONT_PATH, HIGHLIGHT_STYLE, BLACK)
+memory_budget.budget.register('stick_tables', memory_budget.FixedAllocation(
+    sum(len(lut) * lut.itemsize for shaper in (left_shaper, right_shaper)
+        for lut in (shaper.lut_x, shaper.lut_y, shaper.lut_m))))
+memory_tracer = None
+if MEMORY_REPORTS:
+    memory_tracer = memory_budget.MemoryTracer()
+    memory_tracer.start()
+
+# Capa de efectos
+effects = None
+if EFFECTS:
+    from effects import EffectsLayer
+    effects = EffectsLayer(trails=EFFECTS_TRAILS)
+last_selection = {}
+
+# Posprocesado
+postprocessor = None
+if POSTPROCESS:
+    from postprocess import PostProcessor, Bloom, ColorGrade
+    # Letras oscuras sobre fondo blanco: el resplandor se aplica como sombra
+    postprocessor = PostProcessor([
+        Bloom(threshold=128, strength=0.6, mode='shadow'),
+        ColorGrade(gamma=(1.05, 1.0, 0.95)),
+    ])
+
+# Vista previa remota
+preview = None
+if PREVIEW_PORT:
+    from preview import PreviewServer
+    preview = PreviewServer(screen, port=PREVIEW_PORT)
+    preview.start()
+
+# Coreografía
+timeline_player = None
+if TIMELINE:
+    from timeline import Timeline, TimelinePlayer
+    try:
+        show = Timeline.load(TIMELINE, loop=True)
+        if show.letters != len(letters):
+            raise ValueError(f"la coreografía tiene {show.letters} letras y la palabra {len(letters)}")
+        timeline_player = TimelinePlayer(show)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error cargando la coreografía: {e}")
+
+# Historial (con coreografía no se usa: la posición la marca la coreografía)
+history = None
+session_replay = None
+session_start = time.monotonic()
+if (HISTORY or HISTORY_REPLAY) and timeline_player is None:
+    from history import History, SessionReplay
+    history = History(letter_positions, letter_sizes, letter_rotations, local_player)
+    memory_budget.budget.register('history', memory_budget.FixedAllocation(history.nbytes))
+    if HISTORY_REPLAY:
+        try:
+            session_replay = SessionReplay(HISTORY_REPLAY)
+            if session_replay.letters != len(letters):
+                raise ValueError(f"la sesión tiene {session_replay.letters} letras y la palabra {len(letters)}")
+        except (OSError, ValueError) as e:
+            print(f"Error cargando la sesión: {e}")
+            session_replay = None
+
+def handle_history_key(event):
+    ctrl = event.mod & pygame.KMOD_CTRL
+    if ctrl and event.key == pygame.K_z and not event.mod & pygame.KMOD_SHIFT:
+        history.undo()
+    elif ctrl and event.key in (pygame.K_y, pygame.K_z):
+        history.redo()
+    elif event.key == pygame.K_PAGEUP:
+        history.rewind()
+    elif event.key == pygame.K_HOME:
+        history.reset()
+    elif event.key == pygame.K_F12:
+        path = time.strftime("sessions/sesion-%Y%m%d-%H%M%S.mvh")
+        try:
+            os.makedirs("sessions", exist_ok=True)
+            count = history.export(path)
+            print(f"Sesión exportada en {path} ({count} registros)")
+        except OSError as e:
+            print(f"Error exportando la sesión: {e}")
+
+# Difusión del estado a los nodos seguidores
+scene_broadcaster = SceneBroadcaster(interface=SYNC_INTERFACE) if SYNC_NODES > 1 else None
+
+shared_input = None
+if INPUT_PROCESS:
+    from shared_input import SharedInputReader
+    shared_input = SharedInputReader(sticks['LEFT'], sticks['RIGHT'], STICK_CURVE, STICK_CURVE_EXPONENT)
+    shared_input.start()
+else:
+    # Crear un hilo para manejar el gamepad
+    gamepad_thread = threading.Thread(target=handle_gamepad)
+    gamepad_thread.daemon = True
+    gamepad_thread.start()
 
 # Modificar el manejo de salida
 def cleanup():
+    if shared_input is not None:
+        shared_input.close()
+    if preview is not None:
+        preview.close()
     pygame.quit()
     sys.exit()
 
@@ -119,37 +292,102 @@ def test_gamepad():
 
 # Bucle principal del programa
 while running:
+    frame_start = time.perf_counter()
     screen.fill(WHITE)
 
+    # Estado del control publicado por el proceso lector
+    if shared_input is not None and shared_input.apply(local_player, letter_sizes, letter_rotations):
+        running = False
+
+    # Gestos reconocidos desde el último cuadro
+    if gesture_recognizer is not None:
+        gesture = gesture_recognizer.poll(time.monotonic())
+        if gesture is not None:
+            run_gesture_action(ACTIONS[gesture])
+        if spin_remaining > 0:
+            step = min(SPIN_SPEED, spin_remaining)
+            spin_remaining -= step
+            for i in range(len(letter_rotations)):
+                letter_rotations[i] = (letter_rotations[i] + step) % 360
+
+    # Aplicar en lote la entrada remota recibida desde el último cuadro
+    if network_server is not None:
+        players = [local_player] + network_server.drain(apply_remote_event)
+    # Letra seleccionada -> color del primer jugador que la tiene
+    selected = {}
+    for k, player in enumerate(players):
+        selected.setdefault(player.selected_index, PLAYER_COLORS[k % len(PLAYER_COLORS)])
+
+    if effects is not None:
+        # Ráfaga de partículas cuando un jugador cambia de letra
+        for k, player in enumerate(players):
+            previous = last_selection.get(player)
+            if previous is not None and previous != player.selected_index:
+                pos = letter_positions[player.selected_index]
+                effects.burst(pos[0], pos[1], screen, PLAYER_COLORS[k % len(PLAYER_COLORS)])
+        last_selection = {player: player.selected_index for player in players}
+        
+        # Estelas de las letras en movimiento
+        trailing = {}
+        for player in players:
+            if player.move_active and len(trailing) < EFFECTS_TRAILS:
+                trailing.setdefault(player.selected_index, len(trailing))
+        for trail_index in range(len(trailing), EFFECTS_TRAILS):
+            effects.fade_trail(trail_index)
+        effects.draw_trails(screen)
+
     # Dibujar las letras en pantalla
+    now = time.monotonic()
+    if timeline_player is not None:
+        timeline_player.step(letter_positions, letter_sizes, letter_rotations, now)
     for i, (letter, pos, size, rotation) in enumerate(zip(letters, letter_positions, letter_sizes, letter_rotations)):
-        font = pygame.font.Font(None, size)
-        color = BLACK if i != selected_index else (0, 255, 0)
-        text = font.render(letter, True, color)
+        # Máscara del glifo rotada; el color se aplica al dibujarla
+        trail = effects is not None and i in trailing
+        rotated_text, text_rect = renderer.draw(screen, letter, size, rotation, (pos[0], pos[1]),
+                                                selected.get(i), now, keep=trail)
         
-        # Crear una superficie rotada
-        rotated_text = pygame.transform.rotate(text, rotation)
-        # Obtener el rectángulo de la superficie rotada
-        text_rect = rotated_text.get_rect(center=(pos[0], pos[1]))
-        # Dibujar el texto rotado
-        screen.blit(rotated_text, text_rect)
+        if trail:
+            effects.record_trail(trailing[i], rotated_text, text_rect)
+
+    if effects is not None:
+        effects.draw_particles(screen)
 
     # Mover la letra seleccionada según el joystick izquierdo solo si se está presionando
-    if move_active:
-        letter_positions[selected_index][0] += left_stick_x
-        letter_positions[selected_index][1] -= left_stick_y
-        
-        # Limitar el movimiento dentro de la pantalla
-        letter_positions[selected_index][0] = max(0, min(WIDTH - 50, letter_positions[selected_index][0]))
-        letter_positions[selected_index][1] = max(0, min(HEIGHT - 50, letter_positions[selected_index][1]))
+    for player in players:
+        if player.move_active:
+            index = player.selected_index
+            speed = letter_speed_limits[index]
+            letter_positions[index][0] += player.left_stick_x * speed
+            letter_positions[index][1] -= player.left_stick_y * speed
+            
+            # Limitar el movimiento dentro de la pantalla
+            letter_positions[index][0] = max(0, min(WORLD_WIDTH - 50, letter_positions[index][0]))
+            letter_positions[index][1] = max(0, min(HEIGHT - 50, letter_positions[index][1]))
+
+    # Registrar los cambios de este cuadro (o reproducir una sesión exportada)
+    if history is not None:
+        if session_replay is not None and not session_replay.step(time.monotonic(), history):
+            session_replay = None
+        history.record(time.monotonic() - session_start)
+
+    if scene_broadcaster is not None:
+        scene_broadcaster.send(letter_positions, letter_sizes, letter_rotations, selected)
 
     # Manejar eventos de salida
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
             cleanup()
+        elif event.type == pygame.KEYDOWN and history is not None:
+            handle_history_key(event)
+
+    if postprocessor is not None:
+        postprocessor.process(screen)
+
+    if preview is not None:
+        preview.capture(screen, frame_start)
 
     pygame.display.flip()
 
-# Finalizar pygame
-pygame.quit()
\ No newline at end of file
+# Finalizar: la salida por Start también cierra el lector y la vista previa
+cleanup()
\ No newline at end of file
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+# Puerto UDP por defecto del servidor de entrada
+DEFAULT_PORT = 9999
+
+# Paquete UDP: cabecera y eventos (código, valor de 16 bits)
+PACKET_MAGIC = b'MV'
+PACKET_VERSION = 1
+HEADER = struct.Struct('!2sBBIB')
+EVENT = struct.Struct('!Bh')
+MAX_EVENTS_PER_PACKET = 64
+
+# Bandera del primer paquete de una sesión: reinicia la secuencia
+FLAG_RESET = 0x01
+
+# Códigos que puede enviar un cliente remoto (BTN_START queda excluido:
+# un visitante no puede cerrar la instalación)
+CODES = ['ABS_X', 'ABS_Y', 'ABS_Z', 'ABS_RZ', 'ABS_RX', 'BTN_SOUTH', 'BTN_NORTH']
+CODE_INDEX = {code: i for i, code in enumerate(CODES)}
+EV_TYPES = {code: "Key" if code.startswith('BTN_') else "Absolute" for code in CODES}
+
+# Ejes de estado continuo: solo importa el último valor de cada cuadro
+COALESCED_CODES = ('ABS_X', 'ABS_Y')
+
+# Límites por cliente
+MAX_CLIENTS = 64
+MAX_PENDING_EVENTS = 64
+RATE_LIMIT = 250  # Paquetes por segundo
+RATE_BURST = 50
+CLIENT_TIMEOUT = 10.0  # Segundos sin paquetes antes de liberar al cliente
+
+
+def encode_packet(seq, events, reset=False):
+    """Codifica una lista de (código, valor) en un datagrama"""
+    events = events[:MAX_EVENTS_PER_PACKET]
+    flags = FLAG_RESET if reset else 0
+    payload = [HEADER.pack(PACKET_MAGIC, PACKET_VERSION, flags, seq & 0xFFFFFFFF, len(events))]
+    for code, value in events:
+        payload.append(EVENT.pack(CODE_INDEX[code], max(-32768, min(32767, int(value)))))
+    return b''.join(payload)
+
+
+def decode_packet(data):
+    """Decodifica un datagrama; devuelve (seq, reset, eventos) o None si es inválido"""
+    if len(data) < HEADER.size:
+        return None
+    magic, version, flags, seq, count = HEADER.unpack_from(data)
+    if magic != PACKET_MAGIC or version != PACKET_VERSION:
+        return None
+    if count > MAX_EVENTS_PER_PACKET or len(data) != HEADER.size + count * EVENT.size:
+        return None
+    events = []
+    for offset in range(HEADER.size, len(data), EVENT.size):
+        code, value = EVENT.unpack_from(data, offset)
+        if code >= len(CODES):
+            return None
+        events.append((CODES[code], value))
+    return seq, bool(flags & FLAG_RESET), events
+
+
+def _seq_newer(seq, last):
+    # Comparación con vuelta de 32 bits (aritmética de números de serie)
+    return 0 < (seq - last) & 0xFFFFFFFF < 0x80000000
+
+
+class RemoteClient:
+    """Estado de un cliente: secuencia, límite de tasa y eventos pendientes"""
+
+    def __init__(self, player, now):
+        self.player = player
+        self.last_seq = None
+        self.last_seen = now
+        self.tokens = RATE_BURST
+        self.sticks = {}
+        self.pending = deque(maxlen=MAX_PENDING_EVENTS)
+        self.dropped_stale = 0
+        self.dropped_rate = 0
+
+    def allow(self, now):
+        # Cubeta de fichas: RATE_LIMIT paquetes/s con ráfagas de RATE_BURST
+        self.tokens = min(RATE_BURST, self.tokens + (now - self.last_seen) * RATE_LIMIT)
+        self.last_seen = now
+        if self.tokens < 1:
+            self.dropped_rate += 1
+            return False
+        self.tokens -= 1
+        return True
+
+
+class NetworkInputServer:
+    """Servidor de entrada remota por UDP (y WebSocket opcional)
+
+    Los paquetes se reciben en un bucle asyncio en su propio hilo y solo se
+    acumulan por cliente; el bucle de dibujo llama a `drain` una vez por
+    cuadro para aplicarlos, así el coste por cuadro queda acotado por el
+    número de clientes y no por la cantidad de paquetes.
+    """
+
+    def __init__(self, make_player, host='0.0.0.0', port=DEFAULT_PORT, websocket_port=None):
+        self.make_player = make_player
+        self.host = host
+        self.port = port
+        self.websocket_port = websocket_port
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.loop = None
+        self.transport = None
+        self.ready = threading.Event()
+
+    # --- Hilo de red ---
+
+    def ingest(self, key, seq, reset, events):
+        """Registra un lote de eventos de un cliente (UDP o WebSocket)"""
+        now = time.monotonic()
+        with self.lock:
+            client = self.clients.get(key)
+            if client is None:
+                if len(self.clients) >= MAX_CLIENTS:
+                    return False
+                client = RemoteClient(self.make_player(), now)
+                self.clients[key] = client
+
+            if not client.allow(now):
+                return False
+
+            # Descartar paquetes duplicados o que llegan fuera de orden
+            if not reset and client.last_seq is not None and not _seq_newer(seq, client.last_seq):
+                client.dropped_stale += 1
+                return False
+            client.last_seq = seq
+
+            for code, value in events:
+                if code in COALESCED_CODES:
+                    client.sticks[code] = value
+                else:
+                    client.pending.append((code, value))
+        return True
+
+    def start(self):
+        """Arranca el servidor en un hilo en segundo plano"""
+        thread = threading.Thread(target=self._run, name="network-input")
+        thread.daemon = True
+        thread.start()
+        self.ready.wait(5)
+        return thread
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+            self.ready.set()
+            self.loop.run_forever()
+        except OSError as e:
+            print(f"Error iniciando el servidor de entrada remota: {e}")
+            self.ready.set()
+        finally:
+            if self.transport is not None:
+                self.transport.close()
+
+    async def _serve(self):
+        server = self
+
+        class Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                packet = decode_packet(data)
+                if packet is not None:
+                    server.ingest(addr, *packet)
+
+        self.transport, _ = await self.loop.create_datagram_endpoint(
+            Protocol, local_addr=(self.host, self.port))
+        self.port = self.transport.get_extra_info('sockname')[1]
+        print(f"Entrada remota UDP escuchando en {self.host}:{self.port}")
+
+        if self.websocket_port is not None:
+            await self._serve_websocket()
+
+    async def _serve_websocket(self):
+        try:
+            import websockets
+        except ImportError:
+            print("Librería websockets no disponible: WebSocket desactivado")
+            return
+
+        async def handler(websocket, *args):
+            # Mensajes JSON: {"seq": n, "reset": bool, "events": [[código, valor], ...]}
+            key = ('ws', id(websocket))
+            async for message in websocket:
+                try:
+                    data = json.loads(message)
+                    events = [(code, max(-32768, min(32767, int(value))))
+                              for code, value in data['events'][:MAX_EVENTS_PER_PACKET]
+                              if code in CODE_INDEX]
+                    self.ingest(key, int(data['seq']), bool(data.get('reset')), events)
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+        await websockets.serve(handler, self.host, self.websocket_port)
+        print(f"Entrada remota WebSocket escuchando en {self.host}:{self.websocket_port}")
+
+    # --- Bucle de dibujo ---
+
+    def drain(self, apply):
+        """Aplica los eventos pendientes llamando a apply(player, ev_type, code, state)
+
+        Devuelve la lista de jugadores remotos activos.
+        """
+        now = time.monotonic()
+        with self.lock:
+            batches = []
+            for key, client in list(self.clients.items()):
+                if now - client.last_seen > CLIENT_TIMEOUT:
+                    del self.clients[key]
+                    continue
+                if client.sticks or client.pending:
+                    batches.append((client.player, client.sticks, list(client.pending)))
+                    client.sticks = {}
+                    client.pending.clear()
+            players = [client.player for client in self.clients.values()]
+
+        # Aplicar fuera del candado para no frenar la recepción
+        for player, sticks, pending in batches:
+            for code, value in sticks.items():
+                apply(player, EV_TYPES[code], code, value)
+            for code, value in pending:
+                apply(player, EV_TYPES[code], code, value)
+        return players
+
+    def stats(self):
+        """Paquetes descartados por cliente: {clave: (obsoletos, por tasa)}"""
+        with self.lock:
+            return {key: (c.dropped_stale, c.dropped_rate) for key, c in self.clients.items()}
+
+
+class InputClient:
+    """Cliente UDP mínimo (para pruebas por loopback o un puente local)"""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self.addr = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.seq = 0
+        self.reset = True
+
+    def send(self, events):
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        self.sock.sendto(encode_packet(self.seq, events, self.reset), self.addr)
+        self.reset = False
+
+    def close(self):
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    # Prueba por loopback: python3 network_input.py [puerto]
+    from controls import Player
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    server = NetworkInputServer(Player, host='127.0.0.1', port=port)
+    server.start()
+
+    def show(player, ev_type, code, state):
+        print(f"Jugador {id(player):x}: {ev_type} {code} {state}")
+
+    client = InputClient(port=server.port)
+    client.send([('ABS_X', 20000), ('ABS_Y', -12000), ('BTN_SOUTH', 1)])
+    time.sleep(0.1)
+    server.drain(show)
+    client.close()
+    server.stop()
@@ -0,0 +1,290 @@
+import sys
+import time
+
+import numpy as np
+import pygame
+
+# Niveles de calidad: (factor de reducción, pasadas de desenfoque, tolerancia
+# de la corrección de color en niveles de 0..255: los canales cuya curva se
+# aparta menos que esto de la identidad no se corrigen)
+QUALITY_LEVELS = ((8, 1, 6), (4, 1, 6), (4, 2, 3), (2, 2, 0))
+
+# Objetivo de cuadros por segundo y presupuesto del posprocesado por cuadro
+TARGET_FPS = 60
+POSTPROCESS_BUDGET_MS = 6.0
+TIMING_SMOOTHING = 0.1
+ADAPT_FRAMES = 30  # Cuadros seguidos fuera de rango antes de cambiar de nivel
+
+
+class Downsampled:
+    """Copia reducida del cuadro en buffers preasignados
+
+    La reducción la hace `smoothscale` en C sobre una superficie pequeña del
+    mismo formato que la pantalla; numpy solo trabaja a la resolución
+    reducida.
+    """
+
+    def __init__(self, screen, factor):
+        size = screen.get_size()
+        self.factor = factor
+        self.small_size = (max(1, size[0] // factor), max(1, size[1] // factor))
+        w, h = self.small_size
+        self.buf = np.zeros((w, h, 3), np.float32)
+        self.tmp = np.zeros((w, h, 3), np.float32)
+        self.small = pygame.Surface(self.small_size, 0, screen)
+        self.full = pygame.Surface(size, 0, screen)
+
+    def read(self, screen):
+        pygame.transform.smoothscale(screen, self.small_size, self.small)
+        view = pygame.surfarray.pixels3d(self.small)
+        try:
+            np.copyto(self.buf, view)
+        finally:
+            del view
+
+    def blur(self, radius, passes):
+        # Desenfoque de caja separable; varias pasadas se acercan a una gaussiana
+        for _ in range(passes):
+            for axis in (0, 1):
+                _box_blur_axis(self.buf, self.tmp, radius, axis)
+
+    def to_surface(self, dest_size):
+        np.clip(self.buf, 0, 255, out=self.buf)
+        view = pygame.surfarray.pixels3d(self.small)
+        try:
+            np.copyto(view, self.buf, casting='unsafe')
+        finally:
+            del view
+        return pygame.transform.smoothscale(self.small, dest_size, self.full)
+
+
+def _box_blur_axis(buf, tmp, radius, axis):
+    # Suma de 2r+1 vistas desplazadas; los bordes se promedian con menos muestras
+    n = buf.shape[axis]
+    tmp[...] = buf
+    for k in range(1, radius + 1):
+        lo = [slice(None)] * 3
+        hi = [slice(None)] * 3
+        lo[axis] = slice(0, n - k)
+        hi[axis] = slice(k, n)
+        tmp[tuple(lo)] += buf[tuple(hi)]
+        tmp[tuple(hi)] += buf[tuple(lo)]
+    np.multiply(tmp, 1.0 / (2 * radius + 1), out=buf)
+
+
+class Bloom:
+    """Resplandor: extrae las zonas brillantes (o oscuras), las desenfoca y las suma
+
+    En modo 'shadow' se extraen las zonas oscuras y se restan, útil para
+    escenas de letras oscuras sobre fondo claro.
+    """
+
+    name = 'bloom'
+
+    def __init__(self, threshold=200, strength=0.8, radius=3, mode='add'):
+        self.threshold = threshold
+        self.strength = strength
+        self.radius = radius
+        self.mode = mode
+        self.luma = None
+
+    def apply(self, screen, ctx):
+        small = ctx.downsampled(self, screen)
+        small.read(screen)
+        buf = small.buf
+        if self.luma is None or self.luma.shape != buf.shape[:2]:
+            self.luma = np.zeros(buf.shape[:2], np.float32)
+        luma = self.luma
+        np.dot(buf, np.array((0.299, 0.587, 0.114), np.float32), out=luma)
+        if self.mode == 'shadow':
+            # Intensidad = cuánto más oscuro que el umbral
+            np.subtract(self.threshold, luma, out=luma)
+            buf[...] = 255.0
+        else:
+            luma -= self.threshold
+        np.maximum(luma, 0, out=luma)
+        luma *= self.strength / 255.0
+        buf *= luma[..., None]
+        small.blur(self.radius, ctx.blur_passes)
+        return small.to_surface(screen.get_size()), (
+            pygame.BLEND_RGB_SUB if self.mode == 'shadow' else pygame.BLEND_RGB_ADD)
+
+
+class Blur:
+    """Desenfoque de todo el cuadro mezclado con el original"""
+
+    name = 'blur'
+
+    def __init__(self, amount=0.5, radius=2):
+        self.amount = amount
+        self.radius = radius
+
+    def apply(self, screen, ctx):
+        small = ctx.downsampled(self, screen)
+        small.read(screen)
+        small.blur(self.radius, ctx.blur_passes)
+        surface = small.to_surface(screen.get_size())
+        surface.set_alpha(int(255 * self.amount))
+        return surface, 0
+
+
+class ColorGrade:
+    """Corrección de color por tabla: lift, gamma y gain por canal
+
+    En superficies de 32 bits el cuadro se recorre como pares de bytes con
+    una tabla de 65536 entradas por par, así cada par cuesta un `np.take`
+    sobre el buffer de la pantalla. Los pares cuyos canales no cambian (o
+    cambian menos que la tolerancia del nivel de calidad) no se tocan: con
+    curvas identidad la pasada no hace nada.
+    """
+
+    name = 'grade'
+
+    def __init__(self, lift=(0, 0, 0), gamma=(1.0, 1.0, 1.0), gain=(1.0, 1.0, 1.0)):
+        x = np.arange(256, dtype=np.float32) / 255.0
+        self.luts = []
+        for l, g, k in zip(lift, gamma, gain):
+            y = (x ** (1.0 / g)) * k + l / 255.0
+            self.luts.append((np.clip(y, 0, 1) * 255 + 0.5).astype(np.uint8))
+        identity = np.arange(256)
+        self.deviation = [int(np.abs(lut.astype(int) - identity).max()) for lut in self.luts]
+        self._pairs = {}
+
+    def _pair_luts(self, screen, tolerance):
+        """[(par, tabla de 16 bits)] para el formato de `screen` y la tolerancia"""
+        key = (screen.get_shifts()[:3], tolerance)
+        pairs = self._pairs.get(key)
+        if pairs is not None:
+            return pairs
+        # Tabla por byte del píxel: identidad salvo en los canales a corregir
+        byte_luts = [np.arange(256, dtype=np.uint16) for _ in range(4)]
+        active = [False] * 4
+        for shift, lut, deviation in zip(key[0], self.luts, self.deviation):
+            if deviation <= tolerance:
+                continue
+            byte = shift // 8 if sys.byteorder == 'little' else 3 - shift // 8
+            byte_luts[byte] = lut.astype(np.uint16)
+            active[byte] = True
+        pairs = []
+        index = np.arange(65536, dtype=np.uint16)
+        for pair in (0, 1):
+            if active[2 * pair] or active[2 * pair + 1]:
+                # Palabras leídas como '<u2': el byte bajo es el primero del par
+                lo, hi = byte_luts[2 * pair], byte_luts[2 * pair + 1]
+                pairs.append((pair, lo[index & 0xFF] | (hi[index >> 8] << 8)))
+        self._pairs[key] = pairs
+        return pairs
+
+    def apply(self, screen, ctx):
+        tolerance = ctx.grade_tolerance
+        if screen.get_bytesize() != 4:
+            return self._apply_planes(screen, tolerance)
+        pairs = self._pair_luts(screen, tolerance)
+        if not pairs:
+            return None, 0
+        buffer = screen.get_buffer()
+        words = np.frombuffer(buffer, '<u2')
+        try:
+            for pair, lut in pairs:
+                np.take(lut, words[pair::2], out=words[pair::2], mode='clip')
+        finally:
+            # Liberar las vistas desbloquea la pantalla
+            del words
+            del buffer
+        return None, 0
+
+    def _apply_planes(self, screen, tolerance):
+        # Otros formatos: un canal a la vez sobre pixels3d
+        view = pygame.surfarray.pixels3d(screen)
+        try:
+            for channel, lut in enumerate(self.luts):
+                if self.deviation[channel] <= tolerance:
+                    continue
+                plane = view[..., channel]
+                plane[...] = np.take(lut, plane)
+        finally:
+            del view
+        return None, 0
+
+
+class PostProcessor:
+    """Cadena de pasadas de posprocesado sobre el cuadro ya compuesto
+
+    Cada pasada recibe la pantalla y devuelve, si hace falta, una
+    superficie que se mezcla sobre el cuadro con los flags indicados. Los
+    tiempos de cada pasada quedan en `timings` (ms, suavizados) y la calidad
+    se ajusta sola cuando el cuadro completo no llega a `target_fps` o el
+    posprocesado pasa de `budget_ms`.
+    """
+
+    def __init__(self, passes, target_fps=TARGET_FPS, budget_ms=POSTPROCESS_BUDGET_MS, quality=None):
+        self.passes = list(passes)
+        self.frame_budget_ms = 1000.0 / target_fps
+        self.budget_ms = budget_ms
+        self.quality = len(QUALITY_LEVELS) - 1 if quality is None else quality
+        self.auto_quality = quality is None
+        self.timings = {p.name: 0.0 for p in self.passes}
+        self.total_ms = 0.0
+        self.frame_ms = 0.0
+        self.last_call = None
+        self._buffers = {}
+        self._over = 0
+        self._under = 0
+
+    @property
+    def factor(self):
+        return QUALITY_LEVELS[self.quality][0]
+
+    @property
+    def blur_passes(self):
+        return QUALITY_LEVELS[self.quality][1]
+
+    @property
+    def grade_tolerance(self):
+        return QUALITY_LEVELS[self.quality][2]
+
+    def downsampled(self, owner, screen):
+        key = (id(owner), self.factor)
+        buffers = self._buffers.get(key)
+        if buffers is None or buffers.full.get_size() != screen.get_size():
+            # Solo se reservan buffers al cambiar de nivel de calidad
+            buffers = Downsampled(screen, self.factor)
+            self._buffers = {k: v for k, v in self._buffers.items() if k[1] == self.factor}
+            self._buffers[key] = buffers
+        return buffers
+
+    def process(self, screen):
+        total_start = time.perf_counter()
+        if self.last_call is not None:
+            interval = (total_start - self.last_call) * 1000
+            self.frame_ms += (interval - self.frame_ms) * TIMING_SMOOTHING
+        self.last_call = total_start
+        for p in self.passes:
+            start = time.perf_counter()
+            surface, flags = p.apply(screen, self)
+            if surface is not None:
+                screen.blit(surface, (0, 0), special_flags=flags)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[p.name] += (elapsed - self.timings[p.name]) * TIMING_SMOOTHING
+        elapsed = (time.perf_counter() - total_start) * 1000
+        self.total_ms += (elapsed - self.total_ms) * TIMING_SMOOTHING
+        if self.auto_quality:
+            self._adapt()
+
+    def _adapt(self):
+        # Histéresis: bajar si se pierde el objetivo, subir con holgura clara
+        slow_frame = self.frame_ms > self.frame_budget_ms * 1.05
+        if slow_frame or self.total_ms > self.budget_ms:
+            self._over += 1
+            self._under = 0
+            if self._over >= ADAPT_FRAMES and self.quality > 0:
+                self.quality -= 1
+                self._over = 0
+        elif self.total_ms < self.budget_ms * 0.5:
+            self._under += 1
+            self._over = 0
+            if self._under >= ADAPT_FRAMES * 4 and self.quality < len(QUALITY_LEVELS) - 1:
+                self.quality += 1
+                self._under = 0
+        else:
+            self._over = self._under = 0
@@ -0,0 +1,292 @@
+import atexit
+import multiprocessing
+import os
+import signal
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from multiprocessing import shared_memory
+
+import pygame
+
+PREVIEW_PORT = 8081
+PREVIEW_SCALE = 0.5  # Resolución de la vista previa respecto a la pantalla
+PREVIEW_FPS = 10  # Capturas por segundo como máximo
+MIN_PREVIEW_FPS = 1
+PREVIEW_FORMAT = 'jpg'  # 'png' deja el texto más nítido a cambio de más bytes
+
+# Presupuesto del cuadro: con el cuadro cerca del límite se capturan menos
+# imágenes, y se vuelve a subir cuando hay margen
+TARGET_FPS = 60
+SLOW_FRACTION = 0.9
+FAST_FRACTION = 0.6
+ADAPT_INTERVAL = 1.0  # Segundos entre ajustes de la tasa
+TIMING_SMOOTHING = 0.1
+
+# Bloque compartido: contador de secuencia (seqlock) y clientes conectados
+# (lo escribe el proceso del servidor), seguidos de los píxeles de la captura
+SEQ = struct.Struct('<I')
+CLIENTS = struct.Struct('<I')
+CLIENTS_OFFSET = SEQ.size
+PIXELS_OFFSET = SEQ.size + CLIENTS.size
+MAX_READ_RETRIES = 100
+STREAM_BOUNDARY = 'frame'
+
+PAGE = b"""<!doctype html>
+<html><head><title>Movimiento</title></head>
+<body style="margin:0;background:#222"><img src="/stream" style="width:100%"></body></html>
+"""
+
+
+def _server_main(shm, size, bitsize, masks, host, port, fmt):
+    """Proceso del servidor: codifica la última captura y la sirve por HTTP"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parent = os.getppid()
+    surface = pygame.Surface(size, 0, bitsize, masks)
+    pixels = memoryview(surface.get_buffer()).cast('B')
+    content_type = 'image/png' if fmt == 'png' else 'image/jpeg'
+    namehint = f"preview.{fmt}"
+
+    latest = {'image': None, 'id': 0}
+    ready = threading.Condition()
+    clients = [0]
+
+    def set_clients(delta):
+        with ready:
+            clients[0] += delta
+            CLIENTS.pack_into(shm.buf, CLIENTS_OFFSET, clients[0])
+
+    def read_capture():
+        buf = shm.buf
+        for _ in range(MAX_READ_RETRIES):
+            before = SEQ.unpack_from(buf, 0)[0]
+            if before & 1:
+                time.sleep(0.001)
+                continue
+            pixels[:] = buf[PIXELS_OFFSET:PIXELS_OFFSET + len(pixels)]
+            if SEQ.unpack_from(buf, 0)[0] == before:
+                return before
+        return None
+
+    def encode_loop():
+        last_seq = 0
+        while os.getppid() == parent:
+            seq = SEQ.unpack_from(shm.buf, 0)[0]
+            if seq == last_seq:
+                time.sleep(0.01)
+                continue
+            seq = read_capture()
+            if seq is None:
+                continue
+            last_seq = seq
+            data = BytesIO()
+            try:
+                pygame.image.save(surface, data, namehint)
+            except pygame.error as e:
+                print(f"Error codificando la vista previa: {e}")
+                continue
+            with ready:
+                latest['image'] = data.getvalue()
+                latest['id'] += 1
+                ready.notify_all()
+        server.shutdown()
+
+    def next_image(last_id, timeout=5.0):
+        with ready:
+            ready.wait_for(lambda: latest['id'] != last_id, timeout)
+            return latest['image'], latest['id']
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_image_headers(self, image):
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(image)))
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path == '/':
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.end_headers()
+                self.wfile.write(PAGE)
+            elif self.path == '/frame':
+                # Una imagen suelta: cuenta como cliente hasta que llega una captura nueva
+                set_clients(1)
+                try:
+                    image, _ = next_image(latest['id'], 2.0)
+                finally:
+                    set_clients(-1)
+                if image is None:
+                    self.send_error(503)
+                    return
+                self.send_response(200)
+                self.send_image_headers(image)
+                self.wfile.write(image)
+            elif self.path == '/stream':
+                self.stream()
+            else:
+                self.send_error(404)
+
+        def stream(self):
+            self.send_response(200)
+            self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={STREAM_BOUNDARY}')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            set_clients(1)
+            last_id = None
+            try:
+                while True:
+                    image, last_id = next_image(last_id)
+                    if image is None:
+                        continue
+                    self.wfile.write(f'--{STREAM_BOUNDARY}\r\n'.encode())
+                    self.send_image_headers(image)
+                    self.wfile.write(image)
+                    self.wfile.write(b'\r\n')
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                set_clients(-1)
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:
+        print(f"Error iniciando la vista previa: {e}")
+        return
+    server.daemon_threads = True
+    print(f"Vista previa en http://{host}:{server.server_address[1]}/")
+    threading.Thread(target=encode_loop, name="preview-encoder", daemon=True).start()
+    server.serve_forever()
+
+
+class PreviewServer:
+    """Vista previa remota de la pantalla en MJPEG por HTTP
+
+    El bucle de dibujo solo reduce la pantalla a una superficie preparada y
+    copia sus píxeles a un bloque compartido protegido por un seqlock; la
+    codificación y el servidor corren en un proceso aparte (método 'fork',
+    como en shared_input.py). Sin clientes conectados no se captura nada.
+    """
+
+    def __init__(self, screen, host='0.0.0.0', port=PREVIEW_PORT, scale=PREVIEW_SCALE,
+                 max_fps=PREVIEW_FPS, fmt=PREVIEW_FORMAT, target_fps=TARGET_FPS):
+        width, height = screen.get_size()
+        self.size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        # Mismo formato que la pantalla: la reducción es una copia directa
+        self.small = pygame.Surface(self.size, 0, screen)
+        self.pixels = memoryview(self.small.get_buffer()).cast('B')
+        block = PIXELS_OFFSET + len(self.pixels)
+        self.shm = shared_memory.SharedMemory(create=True, size=block)
+        self.shm.buf[:block] = bytes(block)
+        context = multiprocessing.get_context('fork')
+        self.process = context.Process(
+            target=_server_main, name="preview-server",
+            args=(self.shm, self.size, self.small.get_bitsize(), self.small.get_masks(), host, port, fmt))
+        self.process.daemon = True
+
+        self.max_fps = max_fps
+        self.fps = max_fps
+        self.budget_ms = 1000.0 / target_fps
+        self.seq = 0
+        self.frame_ms = None
+        self.capture_ms = 0.0
+        self.captures = 0
+        self.last_capture = 0.0
+        self.last_adapt = 0.0
+
+    def start(self):
+        self.process.start()
+        # Si el programa termina sin llamar a close() (una excepción en el
+        # bucle), el proceso y el bloque compartido no deben quedar vivos
+        atexit.register(self.close)
+        return self.process
+
+    @property
+    def clients(self):
+        return CLIENTS.unpack_from(self.shm.buf, CLIENTS_OFFSET)[0]
+
+    def _adapt(self, now):
+        if now - self.last_adapt < ADAPT_INTERVAL or self.frame_ms is None:
+            return
+        self.last_adapt = now
+        if self.frame_ms > self.budget_ms * SLOW_FRACTION:
+            self.fps = max(MIN_PREVIEW_FPS, self.fps / 2)
+        elif self.frame_ms < self.budget_ms * FAST_FRACTION:
+            self.fps = min(self.max_fps, self.fps + 1)
+
+    def capture(self, screen, frame_start):
+        """Llamar una vez por cuadro con la pantalla ya compuesta
+
+        `frame_start` es `time.perf_counter()` al empezar el cuadro: el
+        trabajo del cuadro (sin la espera de flip) decide la tasa de captura.
+        Devuelve True si se publicó una captura.
+        """
+        now = time.perf_counter()
+        work_ms = (now - frame_start) * 1000
+        if self.frame_ms is None:
+            self.frame_ms = work_ms
+        else:
+            self.frame_ms += (work_ms - self.frame_ms) * TIMING_SMOOTHING
+        self._adapt(now)
+
+        if now - self.last_capture < 1.0 / self.fps or not self.clients:
+            return False
+        self.last_capture = now
+        pygame.transform.scale(screen, self.size, self.small)
+        # Impar mientras se copia; el servidor descarta lecturas cambiadas a medias
+        buf = self.shm.buf
+        SEQ.pack_into(buf, 0, (self.seq + 1) & 0xFFFFFFFF)
+        buf[PIXELS_OFFSET:PIXELS_OFFSET + len(self.pixels)] = self.pixels
+        self.seq = (self.seq + 2) & 0xFFFFFFFF
+        SEQ.pack_into(buf, 0, self.seq)
+        self.captures += 1
+        self.capture_ms += ((time.perf_counter() - now) * 1000 - self.capture_ms) * TIMING_SMOOTHING
+        return True
+
+    def close(self):
+        if self.shm is None:
+            return
+        atexit.unregister(self.close)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.pixels.release()
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+
+if __name__ == "__main__":
+    # Prueba sin pantalla: python3 preview.py [puerto] y abrir http://localhost:puerto/
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PREVIEW_PORT
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    preview = PreviewServer(screen, host='127.0.0.1', port=port)
+    preview.start()
+    font = pygame.font.Font(None, 120)
+    try:
+        while True:
+            frame_start = time.perf_counter()
+            screen.fill((255, 255, 255))
+            text = pygame.transform.rotate(font.render("MOVIMIENTO", True, (0, 0, 0)), time.time() * 30 % 360)
+            screen.blit(text, text.get_rect(center=(400, 300)))
+            preview.capture(screen, frame_start)
+            pygame.display.flip()
+            time.sleep(1 / 60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{preview.captures} capturas a {preview.fps:.0f} por segundo, "
+              f"{preview.capture_ms:.2f} ms por captura")
+        preview.close()
+        pygame.quit()
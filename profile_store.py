@@ -0,0 +1,255 @@
+import copy
+import json
+import os
+import pickle
+import tempfile
+
+from input_shaping import DEADZONE_SHAPES
+
+# Archivo de perfiles compartido por los configuradores
+PROFILES_PATH = 'controller_profiles.json'
+
+# Versión actual del esquema de perfiles
+SCHEMA_VERSION = 2
+
+# Configuración por defecto de un perfil
+DEFAULT_CONFIG = {
+    'buttons': {
+        'A': None, 'B': None, 'X': None, 'Y': None,
+        'LB': None, 'RB': None, 'START': None, 'BACK': None
+    },
+    'triggers': {
+        'LT': {'min': 0, 'max': 1},
+        'RT': {'min': 0, 'max': 1}
+    },
+    'sticks': {
+        'LEFT': {
+            'center_x': 0, 'center_y': 0, 'dead_zone': 0.2,
+            'gain_x': [1.0, 1.0], 'gain_y': [1.0, 1.0],
+            'dead_zone_x': 0.2, 'dead_zone_y': 0.2, 'dead_zone_shape': 'radial'
+        },
+        'RIGHT': {
+            'center_x': 0, 'center_y': 0, 'dead_zone': 0.2,
+            'gain_x': [1.0, 1.0], 'gain_y': [1.0, 1.0],
+            'dead_zone_x': 0.2, 'dead_zone_y': 0.2, 'dead_zone_shape': 'radial'
+        }
+    }
+}
+
+
+def default_config():
+    """Devuelve una copia profunda de la configuración por defecto"""
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+
+def default_profiles():
+    """Devuelve el conjunto mínimo de perfiles"""
+    return {"Default": default_config()}
+
+
+def _migrate_0_to_1(data):
+    # Versión 0: el archivo era directamente {nombre: perfil}
+    return {'schema_version': 1, 'profiles': data}
+
+
+def _migrate_1_to_2(data):
+    # Versión 2: calibración estadística (ganancia y zona muerta elíptica)
+    # Las entradas con tipos inesperados se dejan para que validate() las rechace
+    if not isinstance(data['profiles'], dict):
+        raise ValueError("La sección 'profiles' no es un objeto JSON")
+    for profile in data['profiles'].values():
+        sticks = profile.get('sticks') if isinstance(profile, dict) else None
+        if not isinstance(sticks, dict):
+            continue
+        for stick in sticks.values():
+            if not isinstance(stick, dict):
+                continue
+            dead_zone = stick.get('dead_zone', 0.2)
+            stick.setdefault('gain_x', [1.0, 1.0])
+            stick.setdefault('gain_y', [1.0, 1.0])
+            stick.setdefault('dead_zone_x', dead_zone)
+            stick.setdefault('dead_zone_y', dead_zone)
+            stick.setdefault('dead_zone_shape', 'radial')
+    data['schema_version'] = 2
+    return data
+
+
+# Migraciones indexadas por la versión de origen
+MIGRATIONS = {
+    0: _migrate_0_to_1,
+    1: _migrate_1_to_2,
+}
+
+
+def migrate(data):
+    """Lleva los datos leídos del disco hasta SCHEMA_VERSION"""
+    if not isinstance(data, dict):
+        raise ValueError("El archivo de perfiles no contiene un objeto JSON")
+
+    version = data.get('schema_version', 0) if 'profiles' in data else 0
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Versión de esquema desconocida: {version}")
+
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version = data['schema_version']
+    return data
+
+
+def _merge_defaults(profile, defaults):
+    # Completa las claves que falten sin pisar los valores existentes
+    merged = copy.deepcopy(defaults)
+    for key, value in profile.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_defaults(value, merged[key])
+        else:
+            merged[key] = value
+    return merged
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_profile(name, profile):
+    # Tipos de las secciones y de los campos numéricos que leen los sticks
+    for section in ('buttons', 'triggers', 'sticks'):
+        if not isinstance(profile[section], dict):
+            raise ValueError(f"Perfil '{name}': '{section}' no es un objeto JSON")
+    for button, value in profile['buttons'].items():
+        if value is not None and not isinstance(value, (int, str)):
+            raise ValueError(f"Perfil '{name}': botón {button} inválido")
+    for trigger, config in profile['triggers'].items():
+        if not isinstance(config, dict) or not all(_is_number(config.get(k)) for k in ('min', 'max')):
+            raise ValueError(f"Perfil '{name}': gatillo {trigger} inválido")
+    for stick, config in profile['sticks'].items():
+        if not isinstance(config, dict):
+            raise ValueError(f"Perfil '{name}': stick {stick} no es un objeto JSON")
+        # LEFT y RIGHT traen todas las claves de DEFAULT_CONFIG; en otros solo las presentes
+        for key in ('center_x', 'center_y', 'dead_zone', 'dead_zone_x', 'dead_zone_y'):
+            if key in config and not _is_number(config[key]):
+                raise ValueError(f"Perfil '{name}': {stick}.{key} no es un número")
+        for key in ('gain_x', 'gain_y'):
+            gain = config.get(key, [1.0, 1.0])
+            if not isinstance(gain, list) or len(gain) != 2 or not all(map(_is_number, gain)):
+                raise ValueError(f"Perfil '{name}': {stick}.{key} debe ser [negativa, positiva]")
+        if config.get('dead_zone_shape', 'radial') not in DEADZONE_SHAPES:
+            raise ValueError(f"Perfil '{name}': forma de zona muerta desconocida en {stick}")
+
+
+def validate(profiles):
+    """Valida los perfiles y completa las claves que falten
+
+    Lanza ValueError si algún perfil tiene secciones o campos con tipos
+    inválidos, así load_profiles aparta el archivo.
+    """
+    if not isinstance(profiles, dict):
+        raise ValueError("La sección 'profiles' no es un objeto JSON")
+
+    validated = {}
+    for name, profile in profiles.items():
+        if not isinstance(profile, dict):
+            raise ValueError(f"El perfil '{name}' no es un objeto JSON")
+        validated[name] = _merge_defaults(profile, DEFAULT_CONFIG)
+        _check_profile(name, validated[name])
+
+    if "Default" not in validated:
+        validated["Default"] = default_config()
+    return validated
+
+
+def _cache_path(path):
+    return os.path.splitext(path)[0] + '.cache'
+
+
+def _cache_key(path):
+    st = os.stat(path)
+    return (SCHEMA_VERSION, st.st_mtime_ns, st.st_size)
+
+
+def _atomic_write(path, data):
+    # Escribir en un temporal del mismo directorio, sincronizar y renombrar
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Sincronizar el directorio para que el renombrado sobreviva a un corte
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def _read_cache(path):
+    try:
+        with open(_cache_path(path), 'rb') as f:
+            key, profiles = pickle.load(f)
+        if key == _cache_key(path):
+            return profiles
+    except Exception:
+        pass
+    return None
+
+
+def _write_cache(path, profiles):
+    try:
+        payload = pickle.dumps((_cache_key(path), profiles),
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        _atomic_write(_cache_path(path), payload)
+    except OSError as e:
+        print(f"No se pudo escribir la caché de perfiles: {e}")
+
+
+def load_profiles(path=PROFILES_PATH):
+    """Carga los perfiles usando la caché binaria si está vigente
+
+    Devuelve una tupla (perfiles, existía_archivo). Si el archivo está
+    dañado se aparta con la extensión '.corrupt' y se usan los valores
+    por defecto.
+    """
+    if not os.path.exists(path):
+        return default_profiles(), False
+
+    profiles = _read_cache(path)
+    if profiles is not None:
+        return profiles, True
+
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        profiles = validate(migrate(data)['profiles'])
+    except (ValueError, KeyError, OSError) as e:
+        # json.JSONDecodeError hereda de ValueError
+        print(f"Archivo de perfiles dañado ({e}). Usando perfil por defecto")
+        try:
+            os.replace(path, path + '.corrupt')
+        except OSError:
+            pass
+        return default_profiles(), False
+
+    _write_cache(path, profiles)
+    return profiles, True
+
+
+def save_profiles(profiles, path=PROFILES_PATH):
+    """Guarda los perfiles de forma atómica y actualiza la caché"""
+    data = {'schema_version': SCHEMA_VERSION, 'profiles': profiles}
+    _atomic_write(path, json.dumps(data, indent=4).encode('utf-8'))
+    _write_cache(path, copy.deepcopy(profiles))
@@ -6,6 +6,17 @@ import sys
 import subprocess
 import time
 import os
+import profile_store
+from input_shaping import StickShaper
+from controls import Player, apply_event
+from glyph_cache import GlyphCache
+from highlight import Highlighter, PLAYER_COLORS
+
+# Referencia para medir el tiempo de arranque
+BOOT_TIME = time.monotonic()
+
+# Presupuesto por cuadro para precargar fuentes mientras se espera el control
+WARM_BUDGET = 0.008
 
 def setup_xbox_controller():
     """Función para detectar y configurar el control de Xbox One"""
@@ -126,15 +137,25 @@ def test_controller():
 def main():
     # Verificar si se está ejecutando en Raspberry Pi
     is_raspberry_pi = os.path.exists('/sys/firmware/devicetree/base/model')
+    timings = {}
+    controller = {'ready': False, 'failed': False}
     
-    if is_raspberry_pi:
-        print("Detectado sistema Raspberry Pi")
-        if not setup_xbox_controller():
-            print("No se pudo configurar el control. Saliendo...")
-            sys.exit(1)
-        
-        # Opcional: descomentar para probar el control
-        # test_controller()
+    # Configurar el control en segundo plano mientras se prepara la pantalla
+    def bring_up_controller():
+        ok = True
+        if is_raspberry_pi:
+            print("Detectado sistema Raspberry Pi")
+            ok = setup_xbox_controller()
+            
+            # Opcional: descomentar para probar el control
+            # test_controller()
+        timings['control'] = time.monotonic() - BOOT_TIME
+        controller['failed'] = not ok
+        controller['ready'] = ok
+    
+    controller_thread = threading.Thread(target=bring_up_controller)
+    controller_thread.daemon = True
+    controller_thread.start()
     
     # Inicializar pygame y continuar con el resto del código
     pygame.init()
@@ -143,11 +164,25 @@ def main():
     WIDTH, HEIGHT = 800, 600
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Movimiento")
+    timings['pantalla'] = time.monotonic() - BOOT_TIME
 
     # Colores
     BLACK = (0, 0, 0)
     WHITE = (255, 255, 255)
 
+    # Primer cuadro en cuanto hay pantalla, sin esperar al control
+    status_font = pygame.font.Font(None, 36)
+    waiting_text = status_font.render("Esperando control...", True, BLACK)
+    screen.fill(WHITE)
+    screen.blit(waiting_text, waiting_text.get_rect(center=(WIDTH // 2, HEIGHT - 40)))
+    pygame.display.flip()
+    timings['primer cuadro'] = time.monotonic() - BOOT_TIME
+
+    # Respuesta de los sticks
+    MAX_SPEED = 5  # Píxeles por cuadro con el stick al máximo
+    STICK_CURVE = 'exponential'  # 'linear', 'exponential' o 's_curve'
+    STICK_CURVE_EXPONENT = 2.0
+
     # Palabra a mostrar
     word = "MOVIMIENTO"
     letters = list(word)
@@ -163,77 +198,42 @@ def main():
     # Ángulos de rotación para cada letra
     letter_rotations = [0 for _ in letters]
 
+    # Velocidad máxima de cada letra en píxeles por cuadro
+    letter_speed_limits = [MAX_SPEED for _ in letters]
+
+    # Forma de la entrada de los sticks según la calibración del perfil
+    sticks = profile_store.load_profiles()[0]["Default"]['sticks']
+    left_shaper = StickShaper.from_profile(sticks['LEFT'], STICK_CURVE, STICK_CURVE_EXPONENT)
+    right_shaper = StickShaper.from_profile(sticks['RIGHT'], STICK_CURVE, STICK_CURVE_EXPONENT)
+
+    # Fuentes y glifos precargados en lugar de crearlos en cada cuadro
+    glyphs = GlyphCache()
+    highlighter = Highlighter('tint', BLACK)
+
     # Variables de control
-    selected_index = 0
-    left_stick_x = 0
-    left_stick_y = 0
+    local_player = Player(left_shaper, right_shaper)
     running = True
-    move_active = False
 
     # Funciones para manejar el control de Xbox
     def handle_gamepad():
-        global left_stick_x, left_stick_y, running, move_active, selected_index
+        nonlocal running
         
         while running:
             try:
                 events = get_gamepad()
                 for event in events:
-                    if event.ev_type == "Absolute":
-                        # Stick izquierdo
-                        if event.code == "ABS_X":  # Movimiento horizontal
-                            if abs(event.state) > 3000:  # Zona muerta
-                                left_stick_x = event.state / 32767 * 5
-                                move_active = True
-                            else:
-                                left_stick_x = 0
-                                move_active = False
-                                
-                        elif event.code == "ABS_Y":  # Movimiento vertical
-                            if abs(event.state) > 3000:  # Zona muerta
-                                left_stick_y = event.state / 32767 * 5
-                                move_active = True
-                            else:
-                                left_stick_y = 0
-                                move_active = False
-                                
-                        elif event.code == "ABS_Z":  # Gatillo izquierdo
-                            if event.state > 0:
-                                letter_sizes[selected_index] = max(74, letter_sizes[selected_index] - 2)
-                                
-                        elif event.code == "ABS_RZ":  # Gatillo derecho
-                            if event.state > 0:
-                                letter_sizes[selected_index] = min(200, letter_sizes[selected_index] + 2)
-                                
-                        # Stick derecho para rotación
-                        elif event.code == "ABS_RX":  # Eje X del stick derecho
-                            if abs(event.state) > 3000:
-                                # Rotar más rápido cuando el stick se mueve más
-                                rotation_speed = event.state / 32767 * 5
-                                letter_rotations[selected_index] += rotation_speed
-                                # Mantener el ángulo entre 0 y 360 grados
-                                letter_rotations[selected_index] %= 360
-                                
-                    elif event.ev_type == "Key" and event.state == 1:
-                        if event.code == "BTN_SOUTH":  # Botón A
-                            selected_index = (selected_index + 1) % len(letters)
-                        elif event.code == "BTN_NORTH":  # Botón Y
-                            selected_index = (selected_index - 1) % len(letters)
-                        elif event.code == "BTN_START":  # Botón Start
-                            running = False
+                    if apply_event(local_player, event.ev_type, event.code, event.state,
+                                   letter_sizes, letter_rotations):
+                        running = False
                             
             except Exception as e:
                 print(f"Error en el gamepad: {e}")
                 continue
 
-    # Crear un hilo para manejar el gamepad
-    gamepad_thread = threading.Thread(target=handle_gamepad)
-    gamepad_thread.daemon = True
-    gamepad_thread.start()
-
     # Modificar el manejo de salida
-    def cleanup():
+    def cleanup(status=0):
         pygame.quit()
-        sys.exit()
+        sys.exit(status)
 
     # Agregar después de las importaciones
     def test_gamepad():
@@ -249,31 +249,68 @@ def main():
     # Descomentar para probar:
     # test_gamepad()
 
+    def draw_letters():
+        # Dibujar las letras en pantalla
+        for i, (letter, pos, size, rotation) in enumerate(zip(letters, letter_positions, letter_sizes, letter_rotations)):
+            color = PLAYER_COLORS[0] if i == local_player.selected_index else None
+            # Máscara del glifo rotada; el color se aplica al dibujarla
+            rotated_text = glyphs.rotated(letter, size, rotation)
+            highlighter.draw(screen, rotated_text, (pos[0], pos[1]), color, time.monotonic())
+
+    # Pre-renderizar los glifos del texto configurado con sus tamaños actuales
+    for letter, size in zip(letters, letter_sizes):
+        glyphs.mask(letter, size)
+    timings['glifos'] = time.monotonic() - BOOT_TIME
+
+    # Mientras el control se configura, precargar las fuentes del resto de tamaños
+    font_warmer = (glyphs.font(size) for size in range(74, 201))
+    clock = pygame.time.Clock()
+    while not controller['ready']:
+        if controller['failed']:
+            print("No se pudo configurar el control. Saliendo...")
+            # Estado 1 para que los scripts y servicios distingan el fallo
+            cleanup(1)
+        
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                cleanup()
+        
+        deadline = time.monotonic() + WARM_BUDGET
+        while font_warmer is not None and time.monotonic() < deadline:
+            if next(font_warmer, None) is None:
+                font_warmer = None
+        
+        screen.fill(WHITE)
+        draw_letters()
+        screen.blit(waiting_text, waiting_text.get_rect(center=(WIDTH // 2, HEIGHT - 40)))
+        pygame.display.flip()
+        clock.tick(30)
+
+    # Crear un hilo para manejar el gamepad
+    gamepad_thread = threading.Thread(target=handle_gamepad)
+    gamepad_thread.daemon = True
+    gamepad_thread.start()
+
+    timings['interactivo'] = time.monotonic() - BOOT_TIME
+    print("Tiempos de arranque: " + ", ".join(
+        f"{stage} {seconds:.2f} s" for stage, seconds in sorted(timings.items(), key=lambda t: t[1])))
+
     # Bucle principal del programa
     while running:
         screen.fill(WHITE)
 
-        # Dibujar las letras en pantalla
-        for i, (letter, pos, size, rotation) in enumerate(zip(letters, letter_positions, letter_sizes, letter_rotations)):
-            font = pygame.font.Font(None, size)
-            color = BLACK if i != selected_index else (0, 255, 0)
-            text = font.render(letter, True, color)
-            
-            # Crear una superficie rotada
-            rotated_text = pygame.transform.rotate(text, rotation)
-            # Obtener el rectángulo de la superficie rotada
-            text_rect = rotated_text.get_rect(center=(pos[0], pos[1]))
-            # Dibujar el texto rotado
-            screen.blit(rotated_text, text_rect)
+        draw_letters()
 
         # Mover la letra seleccionada según el joystick izquierdo solo si se está presionando
-        if move_active:
-            letter_positions[selected_index][0] += left_stick_x
-            letter_positions[selected_index][1] -= left_stick_y
+        if local_player.move_active:
+            index = local_player.selected_index
+            speed = letter_speed_limits[index]
+            letter_positions[index][0] += local_player.left_stick_x * speed
+            letter_positions[index][1] -= local_player.left_stick_y * speed
             
             # Limitar el movimiento dentro de la pantalla
-            letter_positions[selected_index][0] = max(0, min(WIDTH - 50, letter_positions[selected_index][0]))
-            letter_positions[selected_index][1] = max(0, min(HEIGHT - 50, letter_positions[selected_index][1]))
+            letter_positions[index][0] = max(0, min(WIDTH - 50, letter_positions[index][0]))
+            letter_positions[index][1] = max(0, min(HEIGHT - 50, letter_positions[index][1]))
 
         # Manejar eventos de salida
         for event in pygame.event.get():
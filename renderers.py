@@ -0,0 +1,115 @@
+from collections import OrderedDict
+
+import pygame
+
+from glyph_cache import GlyphCache
+from highlight import Highlighter, pulse_color
+
+# pygame.font escala la fuente por defecto (freesansbold) a 0.6875 del
+# tamaño pedido; freetype no, así que se aplica aquí para que las letras
+# midan lo mismo con los dos backends
+DEFAULT_FONT_SCALE = 0.6875
+
+# Backends de dibujo disponibles
+RENDERERS = ('font', 'freetype')
+
+# Rectángulos de texto rotado guardados (calcularlos cuesta casi lo mismo
+# que dibujar; la mayoría de las letras no cambia de cuadro a cuadro)
+RECT_CACHE_SIZE = 2048
+
+
+class FontRenderer:
+    """Camino de pygame.font: máscara en caché, rotación, tinte y blit"""
+
+    name = 'font'
+
+    def __init__(self, font_path=None, style='tint', base_color=(0, 0, 0)):
+        self.glyphs = GlyphCache(font_path)
+        self.highlighter = Highlighter(style, base_color)
+
+    def draw(self, surface, text, size, rotation, center, color=None, now=0.0, keep=False):
+        """Dibuja `text` centrado en `center`; devuelve (glifo, rectángulo)
+
+        El glifo es la superficie rotada que se dibujó (para las estelas).
+        """
+        glyph = self.glyphs.rotated(text, size, rotation)
+        rect = self.highlighter.draw(surface, glyph, center, color, now)
+        return glyph, rect
+
+
+class FreetypeRenderer:
+    """Camino de pygame.freetype: un solo Font y render_to sobre la pantalla
+
+    El tamaño y la rotación se pasan en cada llamada y el glifo se rasteriza
+    directamente en la superficie de destino, sin superficies intermedias.
+    freetype guarda internamente los glifos rasterizados.
+    """
+
+    name = 'freetype'
+
+    def __init__(self, font_path=None, style='tint', base_color=(0, 0, 0)):
+        import pygame.freetype
+        pygame.freetype.init()
+        self.font = pygame.freetype.Font(font_path)
+        self.font.antialiased = True
+        self.scale = DEFAULT_FONT_SCALE if font_path is None else 1.0
+        self.style = style
+        self.base_color = base_color
+        self.outline = Highlighter('outline').offsets
+        self.rects = OrderedDict()
+
+    def _rect(self, text, size, rotation):
+        key = (text, size, rotation)
+        rect = self.rects.get(key)
+        if rect is None:
+            rect = self.font.get_rect(text, size=size, rotation=rotation)
+            self.rects[key] = rect
+            if len(self.rects) > RECT_CACHE_SIZE:
+                self.rects.popitem(last=False)
+        else:
+            self.rects.move_to_end(key)
+        return rect.copy()
+
+    def draw(self, surface, text, size, rotation, center, color=None, now=0.0, keep=False):
+        """Dibuja `text` centrado en `center`; devuelve (glifo, rectángulo)
+
+        Solo con `keep=True` se crea la superficie del glifo (p. ej. para las
+        estelas); si no, el glifo devuelto es None.
+        """
+        size = size * self.scale
+        rotation = int(round(rotation)) % 360
+        fg = self.base_color
+        if color is not None:
+            if self.style == 'pulse':
+                fg = pulse_color(self.base_color, color, now)
+            elif self.style == 'tint':
+                fg = color
+
+        if keep:
+            glyph, rect = self.font.render(text, fg, size=size, rotation=rotation)
+            rect = glyph.get_rect(center=center)
+        else:
+            glyph = None
+            rect = self._rect(text, size, rotation)
+            rect.center = center
+
+        if color is not None and self.style == 'outline':
+            for dx, dy in self.outline:
+                self.font.render_to(surface, rect.move(dx, dy), text, color, size=size, rotation=rotation)
+        if glyph is not None:
+            surface.blit(glyph, rect)
+        else:
+            self.font.render_to(surface, rect, text, fg, size=size, rotation=rotation)
+        return glyph, rect
+
+
+def make_renderer(name='font', font_path=None, style='tint', base_color=(0, 0, 0)):
+    """Crea el backend de dibujo; si freetype no está disponible usa pygame.font"""
+    if name == 'freetype':
+        try:
+            return FreetypeRenderer(font_path, style, base_color)
+        except (ImportError, pygame.error) as e:
+            print(f"Error iniciando freetype, se usa pygame.font: {e}")
+    elif name != 'font':
+        raise ValueError(f"Backend de dibujo desconocido: {name}")
+    return FontRenderer(font_path, style, base_color)
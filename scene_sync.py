@@ -0,0 +1,254 @@
+import ipaddress
+import socket
+import struct
+import sys
+import time
+
+# Grupo multicast y puerto por defecto de la sincronización
+DEFAULT_GROUP = '239.255.42.99'
+DEFAULT_PORT = 5007
+
+# Paquete de estado: cabecera y un registro por letra cambiada
+FRAME_MAGIC = b'MS'
+FRAME_VERSION = 1
+HEADER = struct.Struct('!2sBBIdIB')
+LETTER = struct.Struct('!BhhBH')  # índice, x, y, tamaño, rotación en centésimas de grado
+FLAG_KEYFRAME = 0x01
+
+# Cada cuántos cuadros se manda el estado completo (recuperación de pérdidas
+# y nodos que se incorporan tarde)
+KEYFRAME_INTERVAL = 60
+
+# Retardo de reproducción del seguidor: margen para absorber el jitter de red
+INTERP_DELAY = 0.05
+MAX_SNAPSHOTS = 32
+
+# El líder no envía nada mientras la escena está quieta; tras una pausa
+# mayor que esta no se interpola entre el estado viejo y el nuevo
+MAX_INTERP_GAP = 0.1
+FRAME_TIME = 1 / 60
+
+
+def _quantize(positions, sizes, rotations):
+    return [
+        (int(round(pos[0])), int(round(pos[1])), int(size), int(round(rot % 360 * 100)) % 36000)
+        for pos, size, rot in zip(positions, sizes, rotations)
+    ]
+
+
+def _selection_mask(selected):
+    mask = 0
+    for index in selected:
+        mask |= 1 << index
+    return mask
+
+
+class SceneBroadcaster:
+    """Nodo líder: difunde el estado de las letras como deltas comprimidos
+
+    Solo se envían las letras cuyo estado cuantizado cambió desde el último
+    envío, así que el ancho de banda depende de cuántas letras se mueven y
+    no del total.
+    """
+
+    def __init__(self, group=DEFAULT_GROUP, port=DEFAULT_PORT, interface='0.0.0.0', ttl=1):
+        self.addr = (group, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        if ipaddress.ip_address(group).is_multicast:
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+        self.last_sent = None
+        self.last_mask = 0
+        self.ticks = 0
+        self.frame = 0
+        self.bytes_sent = 0
+
+    def send(self, positions, sizes, rotations, selected=()):
+        state = _quantize(positions, sizes, rotations)
+        mask = _selection_mask(selected)
+        self.ticks += 1
+        keyframe = self.last_sent is None or self.ticks % KEYFRAME_INTERVAL == 0
+        if keyframe:
+            changed = range(len(state))
+        else:
+            changed = [i for i, (new, old) in enumerate(zip(state, self.last_sent)) if new != old]
+            if not changed and mask == self.last_mask:
+                return
+
+        records = [LETTER.pack(i, *state[i]) for i in changed]
+        packet = HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FLAG_KEYFRAME if keyframe else 0,
+                             self.frame, time.monotonic(), mask, len(records)) + b''.join(records)
+        try:
+            self.bytes_sent += self.sock.sendto(packet, self.addr)
+        except OSError as e:
+            print(f"Error enviando estado de la escena: {e}")
+        self.last_sent = state
+        self.last_mask = mask
+        self.frame = (self.frame + 1) & 0xFFFFFFFF
+
+    def close(self):
+        self.sock.close()
+
+
+class SceneReceiver:
+    """Nodo seguidor: reconstruye el estado y lo interpola en el tiempo"""
+
+    def __init__(self, group=DEFAULT_GROUP, port=DEFAULT_PORT, interface='0.0.0.0'):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if ipaddress.ip_address(group).is_multicast:
+            self.sock.bind(('', port))
+            membership = socket.inet_aton(group) + socket.inet_aton(interface)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        else:
+            self.sock.bind((group, port))
+        self.sock.setblocking(False)
+
+        self.state = None
+        self.selection = 0
+        self.last_frame = None
+        self.clock_offset = None
+        self.snapshots = []
+        self.packets = 0
+        self.lost = 0
+
+    def poll(self):
+        """Lee todos los paquetes pendientes sin bloquear"""
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            self._handle(data, time.monotonic())
+
+    def _handle(self, data, received_at):
+        if len(data) < HEADER.size:
+            return
+        magic, version, flags, frame, sent_at, selection, count = HEADER.unpack_from(data)
+        if magic != FRAME_MAGIC or version != FRAME_VERSION:
+            return
+        if len(data) != HEADER.size + count * LETTER.size:
+            return
+
+        keyframe = flags & FLAG_KEYFRAME
+        if self.last_frame is not None:
+            gap = (frame - self.last_frame) & 0xFFFFFFFF
+            if gap == 0 or gap >= 0x80000000:
+                return  # Duplicado o atrasado
+            self.lost += gap - 1
+        elif not keyframe:
+            return  # Sin estado base todavía: esperar un cuadro completo
+        self.last_frame = frame
+        self.packets += 1
+
+        # El menor desfase observado es la mejor estimación del reloj del líder
+        offset = received_at - sent_at
+        if self.clock_offset is None or offset < self.clock_offset:
+            self.clock_offset = offset
+
+        records = [LETTER.unpack_from(data, HEADER.size + k * LETTER.size) for k in range(count)]
+        if keyframe:
+            size = max((r[0] for r in records), default=-1) + 1
+            self.state = [None] * size
+        elif records and max(r[0] for r in records) >= len(self.state):
+            return
+        state = list(self.state)
+        for index, x, y, letter_size, rotation in records:
+            state[index] = (x, y, letter_size, rotation / 100)
+        self.state = state
+        self.selection = selection
+
+        # Tras una pausa del líder, fijar el estado anterior justo antes del
+        # nuevo para no deslizar la letra durante toda la pausa
+        if self.snapshots and sent_at - self.snapshots[-1][0] > MAX_INTERP_GAP:
+            self.snapshots.append((sent_at - FRAME_TIME, self.snapshots[-1][1]))
+        self.snapshots.append((sent_at, state))
+        if len(self.snapshots) > MAX_SNAPSHOTS:
+            del self.snapshots[:-MAX_SNAPSHOTS]
+
+    def sample(self, now=None):
+        """Estado interpolado en `now - INTERP_DELAY` según el reloj del líder
+
+        Devuelve una lista de (x, y, tamaño, rotación) o None si aún no hay
+        estado.
+        """
+        if not self.snapshots:
+            return None
+        if now is None:
+            now = time.monotonic()
+        t = now - self.clock_offset - INTERP_DELAY
+
+        snapshots = self.snapshots
+        if t <= snapshots[0][0]:
+            return snapshots[0][1]
+        for (t0, s0), (t1, s1) in zip(snapshots, snapshots[1:]):
+            if t0 <= t <= t1:
+                a = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+                return [_lerp_letter(l0, l1, a) for l0, l1 in zip(s0, s1)]
+        # Sin datos más recientes: mantener el último estado conocido
+        return snapshots[-1][1]
+
+    def close(self):
+        self.sock.close()
+
+
+def _lerp_letter(l0, l1, a):
+    if l0 is None or l1 is None:
+        return l1
+    x0, y0, size0, rot0 = l0
+    x1, y1, size1, rot1 = l1
+    # Rotación por el camino más corto
+    drot = (rot1 - rot0 + 180) % 360 - 180
+    return (x0 + (x1 - x0) * a, y0 + (y1 - y0) * a,
+            int(round(size0 + (size1 - size0) * a)), (rot0 + drot * a) % 360)
+
+
+def run_follower(node_index, word="MOVIMIENTO", width=800, height=600,
+                 group=DEFAULT_GROUP, port=DEFAULT_PORT, interface='0.0.0.0'):
+    """Renderiza la porción `node_index` de la escena difundida por el líder"""
+    import pygame
+    from glyph_cache import GlyphCache
+    from highlight import Highlighter
+
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption(f"Movimiento - nodo {node_index}")
+    glyphs = GlyphCache()
+    highlighter = Highlighter()
+    receiver = SceneReceiver(group, port, interface)
+    offset_x = node_index * width
+    clock = pygame.time.Clock()
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        receiver.poll()
+        state = receiver.sample()
+        screen.fill((255, 255, 255))
+        if state is not None:
+            for i, (letter, entry) in enumerate(zip(word, state)):
+                if entry is None:
+                    continue
+                x, y, size, rotation = entry
+                # Solo las letras que caen (al menos en parte) en esta porción
+                if not -size < x - offset_x < width + size:
+                    continue
+                color = (0, 255, 0) if receiver.selection >> i & 1 else None
+                highlighter.draw(screen, glyphs.rotated(letter, size, rotation), (x - offset_x, y), color)
+        pygame.display.flip()
+        clock.tick(60)
+
+    print(f"Paquetes: {receiver.packets}, perdidos: {receiver.lost}")
+    receiver.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    # Seguidor: python3 scene_sync.py <índice de nodo> [interfaz]
+    if len(sys.argv) < 2:
+        print("Uso: python3 scene_sync.py <índice de nodo> [interfaz]")
+        sys.exit(1)
+    run_follower(int(sys.argv[1]), interface=sys.argv[2] if len(sys.argv) > 2 else '0.0.0.0')
@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+import signal
+import statistics
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+from controls import MIN_SIZE, MAX_SIZE, SIZE_STEP, ROTATION_SPEED, Player, apply_event
+from input_shaping import StickShaper
+
+# Bloque compartido: contador de secuencia (seqlock) seguido del estado
+SEQ = struct.Struct('<I')
+# Stick izquierdo formado (x, y), rotación acumulada del stick derecho y
+# contadores acumulados de gatillos y botones: el lector aplica diferencias,
+# así no se pierde ningún evento aunque lea una vez por cuadro
+STATE = struct.Struct('<ffdIIIIId')
+BLOCK_SIZE = SEQ.size + STATE.size
+MAX_READ_RETRIES = 100
+
+InputState = namedtuple('InputState', [
+    'left_x', 'left_y', 'rotation', 'size_down', 'size_up',
+    'next_letter', 'prev_letter', 'start', 'heartbeat',
+])
+EMPTY_STATE = InputState(0.0, 0.0, 0.0, 0, 0, 0, 0, 0, 0.0)
+
+GamepadEvent = namedtuple('GamepadEvent', ['ev_type', 'code', 'state'])
+
+
+def _write(buf, seq, state):
+    # Impar mientras se escribe; el lector reintenta si ve un valor impar o cambiado
+    SEQ.pack_into(buf, 0, (seq + 1) & 0xFFFFFFFF)
+    STATE.pack_into(buf, SEQ.size, *state)
+    SEQ.pack_into(buf, 0, (seq + 2) & 0xFFFFFFFF)
+    return (seq + 2) & 0xFFFFFFFF
+
+
+def _reader_main(shm, left_config, right_config, curve, exponent, source=None):
+    """Proceso lector: decodifica los eventos y publica el estado en el bloque"""
+    # SDL pudo instalar sus manejadores antes del fork; el hijo debe poder
+    # terminarse con SIGTERM y dejar Ctrl+C al proceso principal
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if source is None:
+        from inputs import get_gamepad
+        source = get_gamepad
+    left = StickShaper.from_profile(left_config, curve, exponent)
+    right = StickShaper.from_profile(right_config, curve, exponent)
+    parent = os.getppid()
+
+    left_x = left_y = rotation = 0.0
+    size_down = size_up = next_letter = prev_letter = start = 0
+    seq = 0
+    while os.getppid() == parent:
+        try:
+            events = source()
+        except Exception as e:
+            print(f"Error en el gamepad: {e}")
+            continue
+        for event in events:
+            code, value = event.code, event.state
+            if event.ev_type == "Absolute":
+                if code == "ABS_X":
+                    left_x, left_y = left.update_x(value)
+                elif code == "ABS_Y":
+                    left_x, left_y = left.update_y(value)
+                elif code == "ABS_Z" and value > 0:
+                    size_down += 1
+                elif code == "ABS_RZ" and value > 0:
+                    size_up += 1
+                elif code == "ABS_RX":
+                    rotation += right.shape_axis(value) * ROTATION_SPEED
+            elif event.ev_type == "Key" and value == 1:
+                if code == "BTN_SOUTH":
+                    next_letter += 1
+                elif code == "BTN_NORTH":
+                    prev_letter += 1
+                elif code == "BTN_START":
+                    start += 1
+        # Una publicación por lote de eventos leídos
+        seq = _write(shm.buf, seq, (left_x, left_y, rotation, size_down, size_up,
+                                    next_letter, prev_letter, start, time.monotonic()))
+
+
+class SharedInputReader:
+    """Lector del control en un proceso aparte con estado en memoria compartida
+
+    El proceso hijo decodifica y forma los eventos; el bucle de dibujo lee un
+    bloque de tamaño fijo protegido por un seqlock, sin colas ni pickling.
+    Usa el método 'fork' para que el hijo herede el bloque y no tenga que
+    volver a importar el programa principal.
+    """
+
+    def __init__(self, left_config, right_config, curve='linear', exponent=2.0, source=None):
+        self.shm = shared_memory.SharedMemory(create=True, size=BLOCK_SIZE)
+        self.shm.buf[:BLOCK_SIZE] = bytes(BLOCK_SIZE)
+        context = multiprocessing.get_context('fork')
+        self.process = context.Process(
+            target=_reader_main, name="gamepad-reader",
+            args=(self.shm, left_config, right_config, curve, exponent, source))
+        self.process.daemon = True
+        self.last = EMPTY_STATE
+        self.retries = 0
+
+    def start(self):
+        self.process.start()
+        return self.process
+
+    def read(self):
+        """Última instantánea coherente del estado (O(1) por cuadro)"""
+        buf = self.shm.buf
+        for _ in range(MAX_READ_RETRIES):
+            before = SEQ.unpack_from(buf, 0)[0]
+            if before & 1:
+                self.retries += 1
+                continue
+            state = STATE.unpack_from(buf, SEQ.size)
+            if SEQ.unpack_from(buf, 0)[0] == before:
+                return InputState(*state)
+            self.retries += 1
+        # El escritor no terminó a tiempo: usar la lectura anterior
+        return self.last
+
+    def apply(self, player, letter_sizes, letter_rotations):
+        """Aplica al jugador lo ocurrido desde la lectura anterior
+
+        Devuelve True si se pulsó Start.
+        """
+        state = self.read()
+        last, self.last = self.last, state
+        count = len(letter_sizes)
+
+        player.left_stick_x, player.left_stick_y = state.left_x, state.left_y
+        player.move_active = state.left_x != 0 or state.left_y != 0
+
+        # Cambios de letra antes que el resto, como en el orden de los eventos
+        player.selected_index = (player.selected_index + (state.next_letter - last.next_letter)
+                                 - (state.prev_letter - last.prev_letter)) % count
+        index = player.selected_index
+        size_delta = (state.size_up - last.size_up) - (state.size_down - last.size_down)
+        if size_delta:
+            letter_sizes[index] = max(MIN_SIZE, min(MAX_SIZE, letter_sizes[index] + size_delta * SIZE_STEP))
+        if state.rotation != last.rotation:
+            letter_rotations[index] = (letter_rotations[index] + state.rotation - last.rotation) % 360
+        return state.start != last.start
+
+    def close(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.shm.close()
+        self.shm.unlink()
+
+
+def synthetic_events(rate=1000, batch=8):
+    """Fuente de prueba: lotes de eventos de sticks a `rate` eventos por segundo"""
+    time.sleep(batch / rate)
+    t = time.monotonic()
+    raw = int(20000 * ((t * 0.5) % 2 - 1))
+    return [GamepadEvent("Absolute", ("ABS_X", "ABS_Y", "ABS_RX")[k % 3], raw) for k in range(batch)]
+
+
+def compare_jitter(seconds=5.0, letters=10):
+    """Compara el jitter del tiempo de cuadro entre el hilo y el proceso lector"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    sizes = [74 + 12 * i for i in range(letters)]
+    rotations = [0.0] * letters
+    config = {'dead_zone': 0.2}
+
+    def render_frames(step):
+        frames = []
+        last = time.perf_counter()
+        end = last + seconds
+        while last < end:
+            step()
+            screen.fill((255, 255, 255))
+            for i, size in enumerate(sizes):
+                text = pygame.font.Font(None, size).render("M", True, (0, 0, 0))
+                screen.blit(pygame.transform.rotate(text, rotations[i]), (70 * i, 200))
+            pygame.display.flip()
+            now = time.perf_counter()
+            frames.append((now - last) * 1000)
+            last = now
+        return frames
+
+    results = {}
+
+    # Modo hilo: decodificación y formado compiten por el GIL con el dibujo
+    player = Player(StickShaper(0.2), StickShaper(0.2))
+    running = True
+
+    def thread_reader():
+        while running:
+            for event in synthetic_events():
+                apply_event(player, event.ev_type, event.code, event.state, sizes, rotations)
+
+    thread = threading.Thread(target=thread_reader, daemon=True)
+    thread.start()
+    results['hilo'] = render_frames(lambda: None)
+    running = False
+    thread.join()
+
+    # Modo proceso: una lectura del bloque compartido por cuadro
+    player = Player()
+    reader = SharedInputReader(config, config, source=synthetic_events)
+    reader.start()
+    results['proceso'] = render_frames(lambda: reader.apply(player, sizes, rotations))
+    reader.close()
+    pygame.quit()
+
+    print(f"{'Modo':<8} {'cuadros':>8} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'desv. ms':>9}")
+    for mode, frames in results.items():
+        ordered = sorted(frames)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"{mode:<8} {len(frames):>8} {statistics.median(frames):>8.2f} {p99:>8.2f} "
+              f"{ordered[-1]:>8.2f} {statistics.pstdev(frames):>9.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    # Comparación de jitter: python3 shared_input.py [segundos]
+    compare_jitter(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
@@ -0,0 +1,259 @@
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import time
+import types
+
+import memory_budget
+from virtual_gamepad import BRIDGE_BUFFER, Storm, VirtualGamepad, NetworkPad, UinputPad, install
+
+# Histograma de tiempos de cuadro: tamaño fijo para no medir la memoria del
+# propio informe durante horas de prueba
+HISTOGRAM_BIN_MS = 0.1
+HISTOGRAM_MAX_MS = 250.0
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'movimiento.py')
+
+
+class FrameHistogram:
+    def __init__(self):
+        self.bins = [0] * (int(HISTOGRAM_MAX_MS / HISTOGRAM_BIN_MS) + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.bins[min(len(self.bins) - 1, int(ms / HISTOGRAM_BIN_MS))] += 1
+        self.count += 1
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = p * self.count
+        seen = 0
+        for i, n in enumerate(self.bins):
+            seen += n
+            if seen >= target:
+                return (i + 1) * HISTOGRAM_BIN_MS
+        return self.max
+
+    def summary(self):
+        return {'frames': self.count, 'p50': self.percentile(0.5), 'p95': self.percentile(0.95),
+                'p99': self.percentile(0.99), 'max': self.max}
+
+
+class SoakMonitor:
+    """Mide cada cuadro del script y detiene la prueba al terminar el tiempo
+
+    Se engancha a `pygame.display.flip`, así mide el bucle real sin cambiarlo.
+    """
+
+    def __init__(self, scene, pads, duration, report_every, remote_pads):
+        self.scene = scene
+        self.pads = pads
+        self.remote_pads = remote_pads
+        self.network_pads = []
+        self.duration = duration
+        self.report_every = report_every
+        self.total = FrameHistogram()
+        self.interval = FrameHistogram()
+        self.rss = []
+        self.network_depth = 0
+        self.reports = []
+        self.start = self.last_frame = self.last_report = None
+
+    def hook(self, pygame):
+        flip = pygame.display.flip
+
+        def measured_flip():
+            flip()
+            self.frame(pygame)
+        pygame.display.flip = measured_flip
+
+    def frame(self, pygame):
+        now = time.monotonic()
+        if self.start is None:
+            self.start = self.last_frame = self.last_report = now
+            self.rss.append((now, memory_budget.read_rss()))
+            for pad in self.pads:
+                pad.start()
+            self._start_network()
+            return
+        ms = (now - self.last_frame) * 1000
+        self.last_frame = now
+        self.total.add(ms)
+        self.interval.add(ms)
+
+        server = self.scene.get('network_server')
+        if server is not None:
+            with server.lock:
+                depth = sum(len(c.pending) for c in server.clients.values())
+            self.network_depth = max(self.network_depth, depth)
+
+        if now - self.last_report >= self.report_every:
+            self.report(now)
+        if now - self.start >= self.duration:
+            if self.interval.count:
+                self.report(now)
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            self.start = -float('inf')  # No volver a pedir la salida
+
+    def _start_network(self):
+        server = self.scene.get('network_server')
+        if self.remote_pads and server is None:
+            print("Aviso: la escena no tiene servidor de entrada remota, controles extra sin usar")
+            return
+        for pad in self.remote_pads:
+            self.network_pads.append(NetworkPad(pad, server.port).start())
+
+    def report(self, now):
+        self.last_report = now
+        self.rss.append((now, memory_budget.read_rss()))
+        elapsed = now - self.rss[0][0]
+        frames = self.interval.summary()
+        pads = [pad.stats() for pad in self.pads]
+        server = self.scene.get('network_server')
+        network_drops = [sum(d) for d in server.stats().values()] if server is not None else []
+        entry = {
+            'elapsed': elapsed,
+            'frame_ms': frames,
+            'devices': pads,
+            'network_depth': self.network_depth,
+            'network_dropped': sum(network_drops),
+            'rss': self.rss[-1][1],
+            'rss_slope': memory_budget.rss_slope(self.rss),
+        }
+        self.reports.append(entry)
+        generated = sum(p['generated'] for p in pads)
+        dropped = sum(p['dropped'] for p in pads)
+        print(f"[{elapsed:7.0f} s] cuadros {frames['frames']:>6} p50 {frames['p50']:5.1f} "
+              f"p95 {frames['p95']:5.1f} p99 {frames['p99']:5.1f} máx {frames['max']:6.1f} ms | "
+              f"eventos {generated} descartados {dropped} cola máx {max(p['max_depth'] for p in pads)} | "
+              f"red cola máx {self.network_depth} descartes {entry['network_dropped']} | "
+              f"RSS {entry['rss'] / 2**20:.1f} MB ({entry['rss_slope'] / 2**20:+.2f} MB/h)")
+        self.interval = FrameHistogram()
+        self.network_depth = 0
+
+    def summary(self):
+        rss = self.rss
+        return {
+            'duration': rss[-1][0] - rss[0][0] if len(rss) > 1 else 0.0,
+            'frame_ms': self.total.summary(),
+            'devices': [pad.stats() for pad in self.pads],
+            'network_sent': [pad.sent for pad in self.network_pads],
+            'network_dropped': self.reports[-1]['network_dropped'] if self.reports else 0,
+            'rss_start': rss[0][1] if rss else 0,
+            'rss_end': rss[-1][1] if rss else 0,
+            'rss_slope': memory_budget.rss_slope(rss),
+            'reports': self.reports,
+        }
+
+
+def load_scene(script, overrides):
+    """Código del script con constantes reemplazadas (`NOMBRE=valor`)"""
+    with open(script) as f:
+        source = f.read()
+    for name, value in overrides.items():
+        source, found = re.subn(rf'^{re.escape(name)} = .*$', f'{name} = {value}', source, count=1, flags=re.M)
+        if not found:
+            raise ValueError(f"{script} no define la constante {name}")
+    return compile(source, script, 'exec')
+
+
+def scene_constant(script, overrides, name):
+    """Valor de una constante del script con los reemplazos aplicados"""
+    if name in overrides:
+        return ast.literal_eval(overrides[name])
+    with open(script) as f:
+        match = re.search(rf'^{re.escape(name)} = (.*?)(\s+#.*)?$', f.read(), flags=re.M)
+    return ast.literal_eval(match.group(1)) if match else None
+
+
+def run(args):
+    storm = Storm(axis_hz=args.axis_hz, noise=args.noise, button_hz=args.button_hz)
+    # Los generadores arrancan con el primer cuadro, así el arranque de la
+    # escena no cuenta como eventos descartados
+    pads = [VirtualGamepad(storm, seed=0)]
+    pads += [VirtualGamepad(storm, seed=i, buffer=BRIDGE_BUFFER) for i in range(1, args.devices)]
+    overrides = dict(item.split('=', 1) for item in args.set)
+    if args.devices > 1:
+        # Los controles extra entran como jugadores remotos por loopback
+        overrides.setdefault('NETWORK_INPUT', 'True')
+        overrides.setdefault('NETWORK_PORT', '0')
+    code = load_scene(args.script, overrides)
+    if scene_constant(args.script, overrides, 'INPUT_PROCESS') and not args.uinput:
+        # El lector hijo hereda una copia del control sin su hilo generador:
+        # no recibiría nada y el informe mostraría todo como descartado
+        raise ValueError("INPUT_PROCESS=True solo se puede probar con --uinput")
+
+    if args.uinput:
+        UinputPad(pads[0]).start()
+    else:
+        install(pads[0])
+
+    import pygame
+    scene = types.ModuleType('__main__')
+    scene.__file__ = args.script
+    monitor = SoakMonitor(scene.__dict__, pads, args.duration, args.report_every, pads[1:])
+    monitor.hook(pygame)
+
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = scene
+    try:
+        exec(code, scene.__dict__)
+    except SystemExit:
+        pass
+    finally:
+        sys.modules['__main__'] = main
+        for pad in pads:
+            pad.stop()
+    return monitor.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga y resistencia con controles virtuales")
+    parser.add_argument('--duration', type=float, default=60.0, help="segundos de prueba (3600 = una hora)")
+    parser.add_argument('--devices', type=int, default=1, help="controles simultáneos (los extra por red)")
+    parser.add_argument('--axis-hz', type=float, default=1000, help="reportes por segundo de los sticks")
+    parser.add_argument('--noise', type=int, default=2000, help="amplitud del ruido de los ejes")
+    parser.add_argument('--button-hz', type=float, default=20, help="pulsaciones por segundo")
+    parser.add_argument('--report-every', type=float, default=60.0, help="segundos entre informes")
+    parser.add_argument('--set', action='append', default=[], metavar='NOMBRE=valor',
+                        help="reemplaza una constante del script (p. ej. RENDERER=\"'freetype'\")")
+    parser.add_argument('--uinput', action='store_true', help="crear un dispositivo uinput en lugar de reemplazar inputs")
+    parser.add_argument('--display', action='store_true', help="mostrar la ventana (por defecto sin pantalla)")
+    parser.add_argument('--json', help="guardar el resumen en este archivo")
+    parser.add_argument('--script', default=DEFAULT_SCRIPT)
+    args = parser.parse_args(argv)
+
+    if not args.display:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    try:
+        summary = run(args)
+    except ValueError as e:
+        print(f"Error en la prueba: {e}")
+        return 2
+    frames = summary['frame_ms']
+    print(f"\nResumen: {summary['duration']:.0f} s, {frames['frames']} cuadros, "
+          f"p50 {frames['p50']:.1f} p95 {frames['p95']:.1f} p99 {frames['p99']:.1f} máx {frames['max']:.1f} ms")
+    for i, stats in enumerate(summary['devices']):
+        print(f"Control {i}: {stats['generated']} eventos, {stats['dropped']} descartados, "
+              f"cola máx {stats['max_depth']} (p99 {stats['p99_depth']})")
+    print(f"RSS {summary['rss_start'] / 2**20:.1f} -> {summary['rss_end'] / 2**20:.1f} MB "
+          f"({summary['rss_slope'] / 2**20:+.2f} MB/h)")
+    if args.json:
+        try:
+            with open(args.json, 'w') as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            print(f"Error guardando el resumen: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import json
+import math
+import struct
+import queue
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+# Ejes que registra la telemetría y su escala completa en unidades crudas
+AXIS_CODES = ['ABS_X', 'ABS_Y', 'ABS_RX', 'ABS_RY', 'ABS_Z', 'ABS_RZ']
+FULL_SCALE = {
+    'ABS_X': 32768, 'ABS_Y': 32768, 'ABS_RX': 32768, 'ABS_RY': 32768,
+    'ABS_Z': 1023, 'ABS_RZ': 1023
+}
+AXIS_INDEX = {code: i for i, code in enumerate(AXIS_CODES)}
+
+# Ejes de pygame en el mismo orden que usa xbox_config_headless
+PYGAME_AXES = ['ABS_X', 'ABS_Y', 'ABS_Z', 'ABS_RX', 'ABS_RY', 'ABS_RZ']
+
+# Capacidad del buffer circular (~4 minutos a 1 kHz por eje)
+DEFAULT_CAPACITY = 1 << 18
+
+# Formato del archivo .tlm: cabecera, resumen JSON y muestras comprimidas
+FILE_MAGIC = b'MVTL'
+FILE_VERSION = 1
+HEADER = struct.Struct('<4sBII')
+
+# Margen aplicado sobre el ruido medido al sugerir la zona muerta
+DEADZONE_MARGIN = 1.25
+DEADZONE_MIN = 0.02
+DEADZONE_MAX = 0.5
+
+
+class TelemetryRecorder:
+    """Buffer circular preasignado de eventos de ejes con marca de tiempo"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.codes = array('B', bytes(capacity))
+        self.values = array('i', bytes(4 * capacity))
+        self.count = 0
+        self.rest_until = None
+
+    def add(self, timestamp, code, value):
+        axis = AXIS_INDEX.get(code)
+        if axis is None:
+            return
+        i = self.count % self.capacity
+        self.times[i] = timestamp
+        self.codes[i] = axis
+        self.values[i] = value
+        self.count += 1
+
+    def mark_rest_end(self, timestamp):
+        """Marca el final de la fase en reposo"""
+        self.rest_until = timestamp
+
+    @property
+    def dropped(self):
+        return max(0, self.count - self.capacity)
+
+    def samples(self):
+        """Devuelve (tiempo, eje, valor) en orden cronológico"""
+        n = min(self.count, self.capacity)
+        start = self.count % self.capacity if self.count > self.capacity else 0
+        for k in range(n):
+            i = (start + k) % self.capacity
+            yield self.times[i], self.codes[i], self.values[i]
+
+    def pack(self):
+        # Muestras en orden cronológico, una tabla por columna
+        times, codes, values = array('d'), array('B'), array('i')
+        for t, c, v in self.samples():
+            times.append(t)
+            codes.append(c)
+            values.append(v)
+        return zlib.compress(times.tobytes() + codes.tobytes() + values.tobytes())
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _std(values, mean):
+    if len(values) < 2:
+        return 0.0
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+
+
+def analyze(recorder):
+    """Calcula frecuencia, jitter, ruido en reposo y zona muerta por eje"""
+    per_axis = {code: ([], []) for code in AXIS_CODES}
+    for t, axis, value in recorder.samples():
+        times, values = per_axis[AXIS_CODES[axis]]
+        times.append(t)
+        values.append(value)
+
+    summary = {'events': recorder.count, 'dropped': recorder.dropped, 'axes': {}}
+    for code, (times, values) in per_axis.items():
+        if not times:
+            continue
+        stats = {'events': len(times)}
+
+        # Frecuencia de reporte e intervalos entre eventos (ms)
+        intervals = sorted((b - a) * 1000 for a, b in zip(times, times[1:]))
+        duration = times[-1] - times[0]
+        stats['rate_hz'] = (len(times) - 1) / duration if duration > 0 else 0.0
+        if intervals:
+            mean = sum(intervals) / len(intervals)
+            stats['interval_ms'] = mean
+            stats['jitter_ms'] = _std(intervals, mean)
+            stats['interval_p50_ms'] = _percentile(intervals, 0.5)
+            stats['interval_p99_ms'] = _percentile(intervals, 0.99)
+            stats['interval_max_ms'] = intervals[-1]
+
+        # Ruido en reposo: desviación respecto a la mediana de la fase quieta
+        if recorder.rest_until is not None:
+            rest = sorted(v for t, v in zip(times, values) if t <= recorder.rest_until)
+            if rest:
+                center = _percentile(rest, 0.5)
+                peak = max(abs(v - center) for v in rest)
+                scale = FULL_SCALE[code]
+                stats['rest_center'] = center
+                stats['noise_std'] = _std(rest, sum(rest) / len(rest))
+                stats['noise_peak'] = peak
+                deadzone = (abs(center) + peak) * DEADZONE_MARGIN / scale
+                stats['suggested_dead_zone'] = round(
+                    min(DEADZONE_MAX, max(DEADZONE_MIN, deadzone)), 3)
+
+        summary['axes'][code] = stats
+    return summary
+
+
+def save(path, recorder, summary, device_name=""):
+    """Guarda el resumen y las muestras crudas en un archivo .tlm compacto"""
+    summary = dict(summary, device=device_name, recorded_at=time.time())
+    meta = json.dumps(summary, separators=(',', ':')).encode('utf-8')
+    payload = recorder.pack()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, len(meta), len(payload)))
+        f.write(meta)
+        f.write(payload)
+
+
+def load_summary(path):
+    """Lee solo el resumen de un archivo .tlm"""
+    with open(path, 'rb') as f:
+        magic, version, meta_len, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"{path} no es un archivo de telemetría válido")
+        return json.loads(f.read(meta_len).decode('utf-8'))
+
+
+def load_samples(path):
+    """Lee las muestras crudas de un archivo .tlm como (tiempo, código, valor)"""
+    with open(path, 'rb') as f:
+        magic, version, meta_len, payload_len = HEADER.unpack(f.read(HEADER.size))
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"{path} no es un archivo de telemetría válido")
+        f.seek(meta_len, 1)
+        data = zlib.decompress(f.read(payload_len))
+    n = len(data) // 13
+    times, codes, values = array('d'), array('B'), array('i')
+    times.frombytes(data[:8 * n])
+    codes.frombytes(data[8 * n:9 * n])
+    values.frombytes(data[9 * n:])
+    return [(t, AXIS_CODES[c], v) for t, c, v in zip(times, codes, values)]
+
+
+def print_summary(summary):
+    print(f"Eventos: {summary['events']}  Descartados: {summary['dropped']}")
+    print(f"{'Eje':8} {'Hz':>8} {'Jitter ms':>10} {'p99 ms':>8} {'Ruido':>8} {'Zona muerta':>12}")
+    for code, stats in summary['axes'].items():
+        print(f"{code:8} {stats['rate_hz']:8.1f} "
+              f"{stats.get('jitter_ms', 0):10.3f} "
+              f"{stats.get('interval_p99_ms', 0):8.2f} "
+              f"{stats.get('noise_peak', 0):8} "
+              f"{stats.get('suggested_dead_zone', '-'):>12}")
+
+
+def compare(paths):
+    """Muestra lado a lado los resúmenes de varios controles"""
+    for path in paths:
+        summary = load_summary(path)
+        print(f"\n=== {path} ({summary.get('device', '')}) ===")
+        print_summary(summary)
+
+
+def capture_inputs(recorder, seconds, rest_seconds=0):
+    """Captura eventos de la librería inputs a la frecuencia del dispositivo
+
+    Usa la marca de tiempo del kernel de cada evento, así que la medida no
+    depende de cuándo Python lee el evento. `get_gamepad` bloquea hasta que
+    llega un evento (en reposo puede no llegar ninguno), así que se lee en
+    un hilo aparte y la captura termina a su hora aunque el control calle.
+    """
+    from inputs import get_gamepad
+
+    pending = queue.Queue()
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                pending.put(get_gamepad())
+            except Exception as e:
+                # Se relanza en el hilo de la captura (p. ej. control desconectado)
+                pending.put(e)
+                return
+
+    # evdev marca los eventos con el reloj de pared (CLOCK_REALTIME)
+    start = time.time()
+    recorder.mark_rest_end(start + rest_seconds)
+    end = start + seconds
+    threading.Thread(target=reader, name="telemetry-reader", daemon=True).start()
+    try:
+        while True:
+            remaining = end - time.time()
+            if remaining <= 0:
+                break
+            try:
+                events = pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if isinstance(events, Exception):
+                raise events
+            for event in events:
+                if event.ev_type == "Absolute" and event.timestamp < end:
+                    recorder.add(event.timestamp, event.code, event.state)
+    finally:
+        # El hilo termina con la próxima lectura; por ser daemon no retiene la salida
+        stop.set()
+
+
+def capture_pygame(joystick, recorder, seconds, rest_seconds=0):
+    """Alternativa cuando inputs no está disponible
+
+    SDL no expone la marca de tiempo del kernel, así que se usa la hora de
+    lectura y el jitter medido incluye el del propio bucle.
+    """
+    import pygame
+
+    start = time.time()
+    recorder.mark_rest_end(start + rest_seconds)
+    end = start + seconds
+    instance_id = joystick.get_instance_id()
+    while time.time() < end:
+        for event in pygame.event.get(pygame.JOYAXISMOTION):
+            if event.instance_id != instance_id or event.axis >= len(PYGAME_AXES):
+                continue
+            code = PYGAME_AXES[event.axis]
+            if code in ('ABS_Z', 'ABS_RZ'):
+                value = int((event.value + 1) / 2 * FULL_SCALE[code])
+            else:
+                value = int(event.value * (FULL_SCALE[code] - 1))
+            recorder.add(time.time(), code, value)
+        time.sleep(0.0005)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == 'compare':
+        compare(sys.argv[2:])
+    else:
+        print("Uso: python3 telemetry.py compare archivo1.tlm [archivo2.tlm ...]")
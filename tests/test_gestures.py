@@ -0,0 +1,12 @@
+import random
+
+from gestures import GestureRecognizer, replay, synthesize
+
+
+def test_replay_without_events_finds_nothing():
+    assert replay(GestureRecognizer(), []) == []
+
+
+def test_replay_finds_synthesized_flick():
+    events = synthesize('flick', random.Random(1))
+    assert 'flick' in replay(GestureRecognizer(), events)
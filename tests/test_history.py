@@ -0,0 +1,61 @@
+import pytest
+
+from history import History, SessionReplay
+
+
+class Player:
+    selected_index = 0
+
+
+def make_history(**kwargs):
+    positions = [[50 + i * 70, 300] for i in range(3)]
+    sizes = [100] * 3
+    rotations = [0.0] * 3
+    return History(positions, sizes, rotations, Player(), **kwargs), positions
+
+
+def test_export_after_wrap_and_full_undo(tmp_path):
+    history, positions = make_history(capacity=15, checkpoint_interval=4)
+    for k in range(40):
+        # Un segundo entre cambios: cada uno es un registro nuevo
+        positions[k % 3][1] += 1
+        history.record(float(k))
+    assert history.start > 0
+    while history.undo():
+        pass
+    path = tmp_path / "sesion.mvh"
+    count = history.export(str(path))
+    assert 0 <= count <= history.cursor - history.start
+    replay = SessionReplay(str(path))
+    assert len(replay.records) == count
+
+
+def test_export_replays_to_current_state(tmp_path):
+    history, positions = make_history(capacity=15, checkpoint_interval=4)
+    for k in range(40):
+        positions[k % 3][0] += 2
+        history.record(float(k))
+    history.rewind()
+    history.undo()
+    expected = history.snapshot()
+    path = tmp_path / "sesion.mvh"
+    history.export(str(path))
+
+    other, _ = make_history()
+    replay = SessionReplay(str(path))
+    replay.step(0.0, other)
+    assert not replay.step(1e9, other)
+    assert list(other.snapshot()) == list(expected)
+
+
+@pytest.mark.parametrize('keep', [0, 5, -1])
+def test_truncated_session_is_rejected(tmp_path, keep):
+    history, positions = make_history()
+    for k in range(5):
+        positions[0][0] += 3
+        history.record(float(k))
+    path = tmp_path / "sesion.mvh"
+    history.export(str(path))
+    path.write_bytes(path.read_bytes()[:keep])
+    with pytest.raises(ValueError):
+        SessionReplay(str(path))
@@ -0,0 +1,31 @@
+from input_shaping import StickShaper
+
+
+def elliptical_profile():
+    return {'dead_zone': 0.3, 'dead_zone_x': 0.05, 'dead_zone_y': 0.3,
+            'dead_zone_shape': 'elliptical'}
+
+
+def test_elliptical_profile_keeps_axis_radii():
+    shaper = StickShaper.from_profile(elliptical_profile())
+    # 0.1 en X está fuera del semieje X aunque esté dentro del radio global
+    x, y = shaper.update_x(int(0.1 * 32768))
+    assert x > 0 and y == 0
+    shaper.update_x(0)
+    x, y = shaper.update_y(int(0.2 * 32768))
+    assert (x, y) == (0.0, 0.0)
+
+
+def test_elliptical_reaches_full_deflection():
+    shaper = StickShaper.from_profile(elliptical_profile())
+    x, _ = shaper.update_x(32767)
+    assert abs(x - 1.0) < 0.01
+    _, y = shaper.update_y(-32768)
+    assert y < -0.7
+
+
+def test_out_of_range_raw_values_are_clamped():
+    shaper = StickShaper(0.1)
+    assert shaper.update_x(-40000) == shaper.update_x(-32768)
+    assert shaper.update_y(40000) == shaper.update_y(32767)
+    assert shaper.shape_axis(-40000) == shaper.shape_axis(-32768)
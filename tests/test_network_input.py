@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+from network_input import (EVENT, HEADER, MAX_EVENTS_PER_PACKET, PACKET_MAGIC, PACKET_VERSION,
+                           RATE_BURST, RATE_LIMIT, InputClient, NetworkInputServer, RemoteClient,
+                           decode_packet, encode_packet)
+
+
+class Player:
+    pass
+
+
+def wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+@pytest.fixture
+def server():
+    server = NetworkInputServer(Player, host='127.0.0.1', port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = InputClient(port=server.port)
+    yield client
+    client.close()
+
+
+def drain(server):
+    applied = []
+    server.drain(lambda player, ev_type, code, state: applied.append((code, state)))
+    return applied
+
+
+def client_state(server, client):
+    # El socket del cliente no está ligado a una dirección: el servidor lo ve como loopback
+    key = ('127.0.0.1', client.sock.getsockname()[1])
+    with server.lock:
+        return server.clients.get(key)
+
+
+def test_stale_and_duplicate_packets_are_dropped(server, client):
+    client.send([('BTN_SOUTH', 1)])  # seq 1, con reset
+    client.sock.sendto(encode_packet(1, [('BTN_NORTH', 1)]), client.addr)  # duplicado
+    client.sock.sendto(encode_packet(0, [('BTN_NORTH', 1)]), client.addr)  # atrasado
+    client.send([('BTN_SOUTH', 0)])  # seq 2
+    assert wait_for(lambda: client_state(server, client) is not None
+                    and client_state(server, client).last_seq == 2)
+    assert client_state(server, client).dropped_stale == 2
+    assert drain(server) == [('BTN_SOUTH', 1), ('BTN_SOUTH', 0)]
+
+
+def test_reset_flag_restarts_the_sequence(server, client):
+    client.sock.sendto(encode_packet(100, [('BTN_SOUTH', 1)], reset=True), client.addr)
+    # Un cliente que se reinicia vuelve a empezar en 1 con la bandera de reinicio
+    client.sock.sendto(encode_packet(1, [('BTN_NORTH', 1)], reset=True), client.addr)
+    client.sock.sendto(encode_packet(1, [('BTN_NORTH', 0)]), client.addr)
+    client.sock.sendto(encode_packet(2, [('BTN_SOUTH', 0)]), client.addr)
+    assert wait_for(lambda: client_state(server, client) is not None
+                    and client_state(server, client).last_seq == 2)
+    assert client_state(server, client).dropped_stale == 1
+    assert drain(server) == [('BTN_SOUTH', 1), ('BTN_NORTH', 1), ('BTN_SOUTH', 0)]
+
+
+def test_axes_are_coalesced_per_frame(server, client):
+    client.send([('ABS_X', 100), ('ABS_Y', -50), ('BTN_SOUTH', 1)])
+    client.send([('ABS_X', 200), ('BTN_SOUTH', 0)])
+    assert wait_for(lambda: client_state(server, client) is not None
+                    and client_state(server, client).last_seq == 2)
+    applied = drain(server)
+    assert sorted(a for a in applied if a[0].startswith('ABS_')) == [('ABS_X', 200), ('ABS_Y', -50)]
+    assert [a for a in applied if a[0].startswith('BTN_')] == [('BTN_SOUTH', 1), ('BTN_SOUTH', 0)]
+    assert drain(server) == []
+
+
+def test_malformed_datagrams_do_not_create_clients(server, client):
+    garbage = InputClient(port=server.port)
+    try:
+        garbage.sock.sendto(b'basura', garbage.addr)
+        garbage.sock.sendto(encode_packet(1, [('ABS_X', 1)])[:-1], garbage.addr)
+        client.send([('BTN_SOUTH', 1)])
+        assert wait_for(lambda: client_state(server, client) is not None)
+        assert client_state(server, garbage) is None
+    finally:
+        garbage.close()
+
+
+def test_token_bucket_limits_packet_rate():
+    client = RemoteClient(Player(), now=0.0)
+    assert all(client.allow(0.0) for _ in range(RATE_BURST))
+    assert not client.allow(0.0)
+    assert client.dropped_rate == 1
+    # Una ficha nueva cada 1/RATE_LIMIT segundos
+    assert client.allow(1.0 / RATE_LIMIT)
+    assert not client.allow(1.0 / RATE_LIMIT)
+
+
+def test_token_bucket_over_loopback(server, client):
+    for _ in range(RATE_BURST * 3):
+        client.send([('BTN_SOUTH', 1)])
+    assert wait_for(lambda: client_state(server, client) is not None
+                    and client_state(server, client).dropped_rate > 0)
+    assert len(drain(server)) < RATE_BURST * 3
+
+
+def header(count, magic=PACKET_MAGIC, version=PACKET_VERSION):
+    return HEADER.pack(magic, version, 0, 1, count)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    header(0)[:-1],
+    header(0, magic=b'XX'),
+    header(0, version=PACKET_VERSION + 1),
+    header(2) + EVENT.pack(0, 1),
+    header(MAX_EVENTS_PER_PACKET + 1) + EVENT.pack(0, 1) * (MAX_EVENTS_PER_PACKET + 1),
+    header(1) + EVENT.pack(200, 1),
+])
+def test_decode_rejects_malformed_packets(data):
+    assert decode_packet(data) is None
+
+
+def test_decode_round_trip():
+    assert decode_packet(encode_packet(7, [('ABS_X', 40000), ('BTN_NORTH', 1)], reset=True)) == \
+        (7, True, [('ABS_X', 32767), ('BTN_NORTH', 1)])
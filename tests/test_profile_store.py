@@ -0,0 +1,48 @@
+import json
+import os
+
+import profile_store
+
+
+def write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def test_version_0_file_is_migrated(tmp_path):
+    path = str(tmp_path / 'perfiles.json')
+    write_json(path, {'Default': {'sticks': {'LEFT': {'dead_zone': 0.3}}}})
+    profiles, found = profile_store.load_profiles(path)
+    assert found
+    left = profiles['Default']['sticks']['LEFT']
+    assert left['dead_zone_x'] == left['dead_zone_y'] == 0.3
+    assert left['gain_x'] == [1.0, 1.0]
+    assert left['dead_zone_shape'] == 'radial'
+
+
+def test_malformed_profile_is_quarantined(tmp_path):
+    path = str(tmp_path / 'perfiles.json')
+    for bad in ({'Default': {'sticks': {'LEFT': 5}}},
+                {'Default': {'sticks': 5}},
+                {'schema_version': 2, 'profiles': {'Default': {'triggers': {'LT': {'min': 'x'}}}}},
+                {'schema_version': 2, 'profiles': [1, 2]}):
+        write_json(path, bad)
+        profiles, found = profile_store.load_profiles(path)
+        assert not found
+        assert profiles == profile_store.default_profiles()
+        assert not os.path.exists(path)
+        assert os.path.exists(path + '.corrupt')
+
+
+def test_cache_is_used_and_invalidated(tmp_path):
+    path = str(tmp_path / 'perfiles.json')
+    profiles = profile_store.default_profiles()
+    profile_store.save_profiles(profiles, path)
+    assert os.path.exists(str(tmp_path / 'perfiles.cache'))
+    assert profile_store.load_profiles(path) == (profiles, True)
+
+    # Un cambio del JSON hecho a mano invalida la caché
+    profiles['Default']['sticks']['LEFT']['dead_zone'] = 0.35
+    write_json(path, {'schema_version': profile_store.SCHEMA_VERSION, 'profiles': profiles})
+    loaded, _ = profile_store.load_profiles(path)
+    assert loaded['Default']['sticks']['LEFT']['dead_zone'] == 0.35
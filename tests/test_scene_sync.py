@@ -0,0 +1,130 @@
+import socket
+
+import pytest
+
+from scene_sync import (FLAG_KEYFRAME, HEADER, KEYFRAME_INTERVAL, LETTER, SceneBroadcaster,
+                        SceneReceiver)
+
+
+def loopback_socket():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(1.0)
+    return sock
+
+
+@pytest.fixture
+def capture():
+    """Socket que recibe lo que envía el líder, para inspeccionar los paquetes"""
+    sock = loopback_socket()
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def broadcaster(capture):
+    broadcaster = SceneBroadcaster(group='127.0.0.1', port=capture.getsockname()[1])
+    yield broadcaster
+    broadcaster.close()
+
+
+@pytest.fixture
+def receiver():
+    receiver = SceneReceiver(group='127.0.0.1', port=0)
+    yield receiver
+    receiver.close()
+
+
+def scene(letters=3):
+    return [[100 + 50 * i, 200] for i in range(letters)], [100] * letters, [0.0] * letters
+
+
+def parse(packet):
+    _, _, flags, frame, _, _, count = HEADER.unpack_from(packet)
+    indices = [LETTER.unpack_from(packet, HEADER.size + k * LETTER.size)[0] for k in range(count)]
+    return flags & FLAG_KEYFRAME, frame, indices
+
+
+def deliver(packets, receiver):
+    """Reenvía paquetes capturados al seguidor en el orden indicado"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for packet in packets:
+            sock.sendto(packet, receiver.sock.getsockname())
+    finally:
+        sock.close()
+    before = receiver.packets
+    receiver.sock.setblocking(True)
+    receiver.sock.settimeout(0.2)
+    # Leer exactamente los datagramas enviados (poll() no bloquea)
+    for _ in packets:
+        receiver._handle(receiver.sock.recv(65536), 0.0)
+    receiver.sock.setblocking(False)
+    return receiver.packets - before
+
+
+def test_only_changed_letters_are_sent(broadcaster, capture):
+    positions, sizes, rotations = scene()
+    broadcaster.send(positions, sizes, rotations)
+    keyframe, _, indices = parse(capture.recv(65536))
+    assert keyframe and indices == [0, 1, 2]
+
+    # Sin cambios no se envía nada
+    broadcaster.send(positions, sizes, rotations)
+    positions[1][0] += 10
+    rotations[2] = 45.0
+    broadcaster.send(positions, sizes, rotations)
+    keyframe, frame, indices = parse(capture.recv(65536))
+    assert not keyframe and frame == 1 and indices == [1, 2]
+
+
+def test_keyframe_every_interval(broadcaster, capture):
+    positions, sizes, rotations = scene()
+    keyframes = []
+    for tick in range(2 * KEYFRAME_INTERVAL):
+        positions[0][0] = tick  # Un cambio por cuadro para que siempre se envíe
+        broadcaster.send(positions, sizes, rotations)
+        keyframe, _, indices = parse(capture.recv(65536))
+        if keyframe:
+            keyframes.append(tick)
+            assert indices == [0, 1, 2]
+        else:
+            assert indices == [0]
+    assert keyframes == [0, KEYFRAME_INTERVAL - 1, 2 * KEYFRAME_INTERVAL - 1]
+
+
+def test_late_and_duplicate_frames_are_ignored(broadcaster, capture, receiver):
+    positions, sizes, rotations = scene()
+    packets = []
+    for step in range(3):
+        positions[0][0] = 100 + step
+        broadcaster.send(positions, sizes, rotations)
+        packets.append(capture.recv(65536))
+
+    assert deliver([packets[0], packets[2]], receiver) == 2
+    assert receiver.lost == 1
+    assert deliver([packets[1], packets[2]], receiver) == 0
+    assert receiver.state[0][0] == 102
+
+
+def test_deltas_before_first_keyframe_are_dropped(broadcaster, capture, receiver):
+    positions, sizes, rotations = scene()
+    broadcaster.send(positions, sizes, rotations)
+    keyframe = capture.recv(65536)
+    positions[1][1] = 250
+    broadcaster.send(positions, sizes, rotations)
+    delta = capture.recv(65536)
+
+    assert deliver([delta], receiver) == 0
+    assert receiver.state is None and receiver.sample() is None
+    assert deliver([keyframe, delta], receiver) == 2
+    assert receiver.state[1] == (150, 250, 100, 0.0)
+
+
+def test_sample_interpolates_between_snapshots(receiver):
+    receiver.clock_offset = 0.0
+    receiver.snapshots = [(1.0, [(0, 0, 100, 350.0)]), (1.05, [(10, 20, 120, 10.0)])]
+    x, y, size, rotation = receiver.sample(1.025 + 0.05)[0]
+    assert (x, y, size) == pytest.approx((5, 10, 110))
+    # La rotación cruza 0 por el camino corto
+    assert rotation == pytest.approx(0.0, abs=1e-6) or rotation == pytest.approx(360.0)
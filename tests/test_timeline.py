@@ -0,0 +1,41 @@
+import pytest
+
+from timeline import Timeline, demo
+
+
+def test_show_without_keyframes_is_rejected():
+    with pytest.raises(ValueError):
+        Timeline.from_json({'letters': 2, 'keyframes': []})
+
+
+def test_show_with_letter_out_of_range_is_rejected():
+    data = {'letters': 2, 'keyframes': [{'t': 0, 'letters': {'5': {'x': 10}}}]}
+    with pytest.raises(ValueError):
+        Timeline.from_json(data)
+
+
+def test_initial_state_must_cover_every_letter():
+    data = {'letters': 3, 'initial': [[0, 0, 100, 0]], 'keyframes': [{'t': 0}]}
+    with pytest.raises(ValueError):
+        Timeline.from_json(data)
+
+
+def test_binary_round_trip(tmp_path):
+    path = str(tmp_path / 'demo.mvk')
+    show = demo()
+    show.save(path)
+    loaded = Timeline.load(path)
+    assert loaded.letters == show.letters
+    assert (loaded.sample(3.0) == show.sample(3.0)).all()
+
+
+@pytest.mark.parametrize('keep', [0, 5, -1])
+def test_truncated_binary_is_rejected(tmp_path, keep):
+    path = str(tmp_path / 'demo.mvk')
+    demo().save(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:keep])
+    with pytest.raises(ValueError):
+        Timeline.load(path)
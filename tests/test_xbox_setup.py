@@ -0,0 +1,59 @@
+import subprocess
+
+from xbox_setup import DEPENDENCIES, XboxControllerSetup
+
+KERNEL = '6.1.0-rpi7'
+
+
+def stub_runner(packages, lsmod='', dkms=''):
+    """Ejecutor falso: responde como un equipo con `packages` instalados"""
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        out = ''
+        if cmd[0] == 'dpkg-query':
+            out = ''.join(f"{p} installed\n" for p in cmd[3:] if p in packages)
+        elif cmd[0] == 'uname':
+            out = KERNEL + '\n'
+        elif cmd[0] == 'lsmod':
+            out = lsmod
+        elif cmd[:2] == ['dkms', 'status']:
+            out = dkms
+        return subprocess.CompletedProcess(cmd, 0, out, '')
+    return run, calls
+
+
+def apt_installs(calls):
+    return [c for c in calls if c[:2] == ['apt-get', 'install']]
+
+
+def test_installed_box_only_queries():
+    run, calls = stub_runner(set(DEPENDENCIES), lsmod='hid_xpadneo 16384 0\n')
+    assert XboxControllerSetup(run).install_dependencies()
+    assert {c[0] for c in calls} == {'dpkg-query', 'uname', 'lsmod'}
+
+
+def test_partial_install_batches_apt_and_rebuilds_registered_module():
+    dkms = "hid-xpadneo/0.9.5, 6.1.0-rpi6, aarch64: installed\n"
+    run, calls = stub_runner({'git', 'bluez'}, dkms=dkms)
+    assert XboxControllerSetup(run).install_dependencies()
+    installs = apt_installs(calls)
+    assert len(installs) == 1
+    assert sorted(installs[0][3:]) == sorted(set(DEPENDENCIES) - {'git', 'bluez'})
+    assert ['dkms', 'autoinstall'] in calls
+    assert not any(c[0] in ('git', './install.sh') for c in calls)
+
+
+def test_complete_cache_installs_without_download(tmp_path):
+    debs = tmp_path / 'debs'
+    debs.mkdir()
+    (tmp_path / 'xpadneo').mkdir()
+    for package in DEPENDENCIES:
+        (debs / f'{package}_1.0_arm64.deb').touch()
+    run, calls = stub_runner(set())
+    assert XboxControllerSetup(run, str(tmp_path)).install_dependencies()
+    installs = apt_installs(calls)
+    assert len(installs) == 1 and '--no-download' in installs[0]
+    assert ['apt-get', 'update'] not in calls
+    assert not any(c[0] == 'git' for c in calls)
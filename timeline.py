@@ -0,0 +1,259 @@
+import bisect
+import json
+import math
+import struct
+import sys
+import time
+
+import numpy as np
+
+from controls import MIN_SIZE, MAX_SIZE
+
+# Canales animados por letra
+CHANNELS = ('x', 'y', 'size', 'rotation')
+X, Y, SIZE, ROTATION = range(4)
+
+# Curvas de suavizado: se tabulan una vez y se evalúan en lote por índice
+EASING_STEPS = 1024
+EASINGS = {
+    'linear': lambda u: u,
+    'step': lambda u: np.where(u < 1.0, 0.0, 1.0),
+    'in_quad': lambda u: u * u,
+    'out_quad': lambda u: 1 - (1 - u) ** 2,
+    'in_out_quad': lambda u: np.where(u < 0.5, 2 * u * u, 1 - (-2 * u + 2) ** 2 / 2),
+    'in_out_cubic': lambda u: np.where(u < 0.5, 4 * u ** 3, 1 - (-2 * u + 2) ** 3 / 2),
+    'out_back': lambda u: 1 + 2.70158 * (u - 1) ** 3 + 1.70158 * (u - 1) ** 2,
+    'in_out_sine': lambda u: -(np.cos(math.pi * u) - 1) / 2,
+}
+EASING_NAMES = list(EASINGS)
+EASING_INDEX = {name: i for i, name in enumerate(EASING_NAMES)}
+_u = np.linspace(0.0, 1.0, EASING_STEPS + 1)
+EASING_TABLE = np.stack([np.asarray(EASINGS[name](_u), np.float32) for name in EASING_NAMES])
+
+# Archivo binario: cabecera, tiempos, suavizado por tramo y letra, valores
+FILE_MAGIC = b'MVKF'
+FILE_VERSION = 1
+HEADER = struct.Struct('<4sBHI')  # magia, versión, letras, fotogramas clave
+
+# Entrada en vivo sobre la coreografía: el desplazamiento del jugador vuelve
+# a cero con esta constante de tiempo cuando deja de mover la letra
+LIVE_RETURN = 2.0
+
+
+class Timeline:
+    """Fotogramas clave de toda la escena: tiempos, valores y suavizados
+
+    `times` es creciente (K), `values` tiene forma (K, letras, 4) y
+    `easing` (K, letras) indica la curva del tramo que empieza en cada
+    fotograma. Buscar el tramo de un instante es una bisección, así que
+    saltar a cualquier punto cuesta O(log K).
+    """
+
+    def __init__(self, times, values, easing, loop=False):
+        self.times = [float(t) for t in times]
+        self.values = np.asarray(values, np.float32)
+        self.easing = np.asarray(easing, np.uint8)
+        self.loop = loop
+        # Validar al cargar: una coreografía mal formada fallaría al muestrear
+        if not self.times:
+            raise ValueError("la línea de tiempo no tiene fotogramas clave")
+        if self.values.ndim != 3 or self.values.shape[0] != len(self.times) \
+                or self.values.shape[1] == 0 or self.values.shape[2] != len(CHANNELS):
+            raise ValueError(f"valores con forma {self.values.shape}, se esperaba "
+                             f"({len(self.times)}, letras, {len(CHANNELS)})")
+        if self.easing.shape != self.values.shape[:2]:
+            raise ValueError(f"suavizados con forma {self.easing.shape}, se esperaba {self.values.shape[:2]}")
+        if int(self.easing.max()) >= len(EASING_NAMES):
+            raise ValueError("suavizado desconocido en la línea de tiempo")
+        if any(b < a for a, b in zip(self.times, self.times[1:])):
+            raise ValueError("los tiempos de los fotogramas clave deben ser crecientes")
+        self.letters = self.values.shape[1]
+        self._out = np.zeros((self.letters, len(CHANNELS)), np.float32)
+        self._eased = np.zeros(self.letters, np.float32)
+
+    @property
+    def duration(self):
+        return self.times[-1] if self.times else 0.0
+
+    def sample(self, t):
+        """Estado de todas las letras en el instante `t` (array (letras, 4))
+
+        Devuelve siempre el mismo buffer; copiarlo si se necesita guardar.
+        """
+        times = self.times
+        if self.loop and self.duration > 0:
+            t %= self.duration
+        k = bisect.bisect_right(times, t) - 1
+        if k < 0:
+            self._out[...] = self.values[0]
+            return self._out
+        if k >= len(times) - 1:
+            self._out[...] = self.values[-1]
+            return self._out
+
+        u = (t - times[k]) / (times[k + 1] - times[k])
+        # Curva de cada letra en su tramo: un índice en la tabla por letra
+        np.take(EASING_TABLE[:, int(u * EASING_STEPS)], self.easing[k], out=self._eased)
+        a, b = self.values[k], self.values[k + 1]
+        np.subtract(b, a, out=self._out)
+        self._out *= self._eased[:, None]
+        self._out += a
+        return self._out
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, self.letters, len(self.times)))
+            f.write(np.asarray(self.times, '<f8').tobytes())
+            f.write(np.ascontiguousarray(self.easing, np.uint8).tobytes())
+            f.write(np.ascontiguousarray(self.values, '<f4').tobytes())
+
+    @classmethod
+    def load(cls, path, loop=False):
+        """Carga un .mvk binario o una coreografía JSON"""
+        if path.endswith('.json'):
+            with open(path) as f:
+                return cls.from_json(json.load(f), loop)
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} no es una línea de tiempo válida")
+        magic, version, letters, count = HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"{path} no es una línea de tiempo válida")
+        expected = HEADER.size + count * (8 + letters + letters * len(CHANNELS) * 4)
+        if len(data) != expected:
+            raise ValueError(f"{path} está truncado ({len(data)} bytes, se esperaban {expected})")
+        offset = HEADER.size
+        times = np.frombuffer(data, '<f8', count, offset)
+        offset += times.nbytes
+        easing = np.frombuffer(data, np.uint8, count * letters, offset).reshape(count, letters)
+        offset += easing.nbytes
+        values = np.frombuffer(data, '<f4', count * letters * len(CHANNELS), offset)
+        return cls(times, values.reshape(count, letters, len(CHANNELS)), easing, loop)
+
+    @classmethod
+    def from_json(cls, data, loop=False):
+        """Coreografía escrita a mano
+
+        {"letters": 10, "keyframes": [{"t": 0, "ease": "in_out_cubic",
+         "letters": {"0": {"x": 100, "rotation": 90}, ...}}, ...]}
+
+        Los canales que no se indican mantienen el valor del fotograma
+        anterior; `ease` puede ser un nombre o un dict por letra.
+        """
+        letters = int(data['letters'])
+        keyframes = sorted(data['keyframes'], key=lambda k: k['t'])
+        values = np.zeros((len(keyframes), letters, len(CHANNELS)), np.float32)
+        easing = np.zeros((len(keyframes), letters), np.uint8)
+        current = np.array(data.get('initial', [[0, 0, 100, 0]] * letters), np.float32)
+        if current.shape != (letters, len(CHANNELS)):
+            raise ValueError(f"'initial' debe tener {letters} letras con {len(CHANNELS)} canales")
+        for k, keyframe in enumerate(keyframes):
+            for index, channels in keyframe.get('letters', {}).items():
+                if not 0 <= int(index) < letters:
+                    raise ValueError(f"letra {index} fuera de rango en t={keyframe['t']}")
+                for name, value in channels.items():
+                    current[int(index), CHANNELS.index(name)] = value
+            values[k] = current
+            ease = keyframe.get('ease', 'linear')
+            if isinstance(ease, dict):
+                easing[k] = EASING_INDEX[ease.get('default', 'linear')]
+                for index, name in ease.items():
+                    if index != 'default':
+                        if not 0 <= int(index) < letters:
+                            raise ValueError(f"letra {index} fuera de rango en t={keyframe['t']}")
+                        easing[k, int(index)] = EASING_INDEX[name]
+            else:
+                easing[k] = EASING_INDEX[ease]
+        return cls([k['t'] for k in keyframes], values, easing, data.get('loop', loop))
+
+
+class TimelinePlayer:
+    """Reproduce una línea de tiempo sobre las listas de la escena
+
+    Lo que el jugador cambia entre cuadros (mover, rotar, cambiar tamaño) se
+    acumula como desplazamiento por letra y se suma a la coreografía; cuando
+    la letra deja de tocarse vuelve poco a poco a su lugar en la coreografía.
+    """
+
+    def __init__(self, timeline, start=None):
+        self.timeline = timeline
+        self.start = time.monotonic() if start is None else start
+        self.offsets = np.zeros((timeline.letters, len(CHANNELS)), np.float32)
+        self.written = None
+        self.last_step = None
+        self._current = np.zeros_like(self.offsets)
+
+    def seek(self, t, now=None):
+        """Salta al instante `t` de la coreografía"""
+        now = time.monotonic() if now is None else now
+        self.start = now - t
+
+    def step(self, positions, sizes, rotations, now=None):
+        now = time.monotonic() if now is None else now
+        current = self._current
+        n = self.timeline.letters
+        for i in range(n):
+            current[i] = (positions[i][0], positions[i][1], sizes[i], rotations[i])
+
+        if self.written is not None:
+            # Cambios hechos por la entrada desde el último cuadro
+            delta = current - self.written
+            # La rotación se guarda módulo 360: usar el camino más corto
+            delta[:, ROTATION] = (delta[:, ROTATION] + 180) % 360 - 180
+            moved = np.any(np.abs(delta) > 1e-3, axis=1)
+            self.offsets += delta
+            dt = now - self.last_step
+            decay = math.exp(-dt / LIVE_RETURN)
+            self.offsets[~moved] *= decay
+        self.last_step = now
+
+        composed = self.timeline.sample(now - self.start) + self.offsets
+        np.clip(composed[:, SIZE], MIN_SIZE, MAX_SIZE, out=composed[:, SIZE])
+        composed[:, SIZE] = np.round(composed[:, SIZE])
+        composed[:, ROTATION] %= 360
+        for i in range(n):
+            x, y, size, rotation = composed[i].tolist()
+            positions[i][0] = x
+            positions[i][1] = y
+            sizes[i] = int(size)
+            rotations[i] = rotation
+        self.written = composed.copy()
+
+
+def demo(letters=10, width=800, height=600):
+    """Coreografía de ejemplo: dispersar, girar y volver a formar la palabra"""
+    rng = np.random.default_rng(7)
+    word = [[50 + i * 70, height // 2, 120, 0] for i in range(letters)]
+    scattered = [[rng.uniform(60, width - 60), rng.uniform(60, height - 60), rng.uniform(80, 190), 0]
+                 for _ in range(letters)]
+    spun = [[x, y, s, 360] for x, y, s, _ in scattered]
+    circle = [[width / 2 + 220 * math.cos(2 * math.pi * i / letters),
+               height / 2 + 220 * math.sin(2 * math.pi * i / letters), 100, 720]
+              for i in range(letters)]
+    final = [[x, y, s, 720] for x, y, s, _ in word]
+    times = [0, 2, 4, 6, 8, 10]
+    values = [word, scattered, spun, circle, circle, final]
+    easing = np.full((len(times), letters), EASING_INDEX['in_out_cubic'], np.uint8)
+    # Al formar el círculo cada letra llega con un rebote
+    easing[2] = EASING_INDEX['out_back']
+    return Timeline(times, values, easing, loop=True)
+
+
+if __name__ == "__main__":
+    # python3 timeline.py demo salida.mvk          -> coreografía de ejemplo
+    # python3 timeline.py compile show.json s.mvk  -> JSON a binario
+    # python3 timeline.py info s.mvk               -> resumen y coste de muestreo
+    if len(sys.argv) >= 3 and sys.argv[1] == 'demo':
+        demo().save(sys.argv[2])
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'compile':
+        Timeline.load(sys.argv[2]).save(sys.argv[3])
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'info':
+        timeline = Timeline.load(sys.argv[2])
+        print(f"{timeline.letters} letras, {len(timeline.times)} fotogramas clave, {timeline.duration:.2f} s")
+        start = time.perf_counter()
+        for k in range(10000):
+            timeline.sample(k * timeline.duration / 10000)
+        print(f"Muestreo: {(time.perf_counter() - start) / 10000 * 1e6:.1f} µs por cuadro")
+    else:
+        print("Uso: python3 timeline.py demo|compile|info ...")
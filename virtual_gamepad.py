@@ -0,0 +1,270 @@
+import math
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+from shared_input import GamepadEvent
+
+# Como el buffer por cliente de evdev: si el lector se atrasa, los eventos
+# más viejos se pierden y se cuentan como descartados
+EVDEV_BUFFER = 64
+
+# Buffer de los controles que se envían por red: el puente lee por lotes y
+# sus descartes no son los de la aplicación
+BRIDGE_BUFFER = 1024
+
+# Códigos que genera el control virtual (nunca Start ni Select: saldrían de
+# la aplicación o pedirían un informe de memoria)
+STICK_CODES = ('ABS_X', 'ABS_Y', 'ABS_RX')
+TRIGGER_CODES = ('ABS_Z', 'ABS_RZ')
+BUTTON_CODES = ('BTN_SOUTH', 'BTN_NORTH')
+AXIS_MAX = 32767
+TRIGGER_MAX = 1023
+
+# Resolución del generador: cuánto duerme entre lotes (los ticks atrasados
+# se emiten juntos, así la tasa media no depende de la precisión del sleep)
+GENERATOR_SLEEP = 0.001
+
+
+class Storm:
+    """Parámetros de una tormenta de eventos
+
+    `axis_hz` reportes por segundo de los sticks (cada uno con X, Y, RX y
+    SYN_REPORT), `noise` amplitud del ruido en unidades crudas sobre un giro
+    lento de `sweep_hz` vueltas por segundo, `button_hz` pulsaciones por
+    segundo de A/Y y `trigger_hz` reportes de los gatillos.
+    """
+
+    def __init__(self, axis_hz=1000, noise=2000, sweep_hz=0.25, sweep_radius=0.6,
+                 button_hz=20, trigger_hz=50):
+        self.axis_hz = axis_hz
+        self.noise = noise
+        self.sweep_hz = sweep_hz
+        self.sweep_radius = sweep_radius
+        self.button_hz = button_hz
+        self.trigger_hz = trigger_hz
+
+
+class VirtualGamepad:
+    """Control virtual con la semántica de `inputs.get_gamepad`
+
+    Un hilo genera la tormenta y la deja en una cola acotada; `read()`
+    bloquea hasta que hay eventos y devuelve todos los pendientes (también
+    antes de `start()`, para poder instalarlo antes de arrancar la escena).
+    """
+
+    def __init__(self, storm=None, seed=0, buffer=EVDEV_BUFFER):
+        self.storm = storm or Storm()
+        self.random = random.Random(seed)
+        self.phase = self.random.random()
+        self.buffer = buffer
+        self.queue = deque()
+        self.ready = threading.Condition()
+        self.running = False
+        self.stopped = False
+        self.thread = None
+        self.generated = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.depths = deque(maxlen=4096)  # Profundidad de la cola en cada lectura
+        self.pressed = {code: 0 for code in BUTTON_CODES}
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="virtual-gamepad", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.stopped = True
+        with self.ready:
+            self.ready.notify_all()
+        if self.thread is not None:
+            self.thread.join(1)
+
+    # --- Generador ---
+
+    def _axis_events(self, t):
+        storm = self.storm
+        angle = 2 * math.pi * (storm.sweep_hz * t + self.phase)
+        sweep = storm.sweep_radius * AXIS_MAX
+        noise = self.random.randint
+        values = (sweep * math.cos(angle), sweep * math.sin(angle), sweep * math.sin(angle * 0.5))
+        events = [GamepadEvent("Absolute", code,
+                               max(-AXIS_MAX, min(AXIS_MAX, int(v) + noise(-storm.noise, storm.noise))))
+                  for code, v in zip(STICK_CODES, values)]
+        events.append(GamepadEvent("Sync", "SYN_REPORT", 0))
+        return events
+
+    def _button_events(self):
+        code = self.random.choice(BUTTON_CODES)
+        self.pressed[code] ^= 1
+        return [GamepadEvent("Key", code, self.pressed[code]), GamepadEvent("Sync", "SYN_REPORT", 0)]
+
+    def _trigger_events(self):
+        code = self.random.choice(TRIGGER_CODES)
+        return [GamepadEvent("Absolute", code, self.random.randint(0, TRIGGER_MAX)),
+                GamepadEvent("Sync", "SYN_REPORT", 0)]
+
+    def _run(self):
+        storm = self.storm
+        start = time.monotonic()
+        # Próximo instante de cada fuente; los botones llegan con llegadas de Poisson
+        next_axis = next_trigger = start
+        next_button = start + self.random.expovariate(storm.button_hz * 2) if storm.button_hz else math.inf
+        while self.running:
+            now = time.monotonic()
+            events = []
+            if storm.axis_hz:
+                while next_axis <= now:
+                    events.extend(self._axis_events(next_axis - start))
+                    next_axis += 1.0 / storm.axis_hz
+            if storm.trigger_hz:
+                while next_trigger <= now:
+                    events.extend(self._trigger_events())
+                    next_trigger += 1.0 / storm.trigger_hz
+            while next_button <= now:
+                # Cada pulsación son dos eventos (bajar y soltar)
+                events.extend(self._button_events())
+                next_button += self.random.expovariate(storm.button_hz * 2)
+            if events:
+                self._push(events)
+            time.sleep(GENERATOR_SLEEP)
+
+    def _push(self, events):
+        with self.ready:
+            for event in events:
+                if len(self.queue) >= self.buffer:
+                    self.queue.popleft()
+                    self.dropped += 1
+                self.queue.append(event)
+            self.generated += len(events)
+            self.max_depth = max(self.max_depth, len(self.queue))
+            self.ready.notify()
+
+    # --- Lector ---
+
+    def read(self):
+        """Eventos pendientes; bloquea hasta que haya alguno (como get_gamepad)"""
+        with self.ready:
+            while not self.queue and not self.stopped:
+                self.ready.wait(0.1)
+            events = list(self.queue)
+            self.queue.clear()
+            self.depths.append(len(events))
+            self.delivered += len(events)
+        return events
+
+    def stats(self):
+        with self.ready:
+            depths = sorted(self.depths)
+            return {
+                'generated': self.generated,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'pending': len(self.queue),
+                'max_depth': self.max_depth,
+                'p99_depth': depths[min(len(depths) - 1, int(len(depths) * 0.99))] if depths else 0,
+            }
+
+
+def install(gamepad):
+    """Reemplaza `inputs.get_gamepad` por el control virtual en este proceso
+
+    También en los módulos que ya lo importaron con `from inputs import get_gamepad`.
+    """
+    import inputs
+    original = inputs.get_gamepad
+    inputs.get_gamepad = gamepad.read
+    for module in list(sys.modules.values()):
+        if getattr(module, 'get_gamepad', None) is original:
+            module.get_gamepad = gamepad.read
+    return original
+
+
+class NetworkPad:
+    """Envía un control virtual al servidor de entrada remota por UDP
+
+    Agrupa los eventos en paquetes de hasta MAX_EVENTS_PER_PACKET cada
+    `interval` segundos, como haría un puente real. El control necesita un
+    buffer que aguante `interval` segundos de eventos (BRIDGE_BUFFER).
+    """
+
+    def __init__(self, gamepad, port, host='127.0.0.1', interval=0.008):
+        from network_input import InputClient
+        self.gamepad = gamepad
+        self.client = InputClient(host, port)
+        self.interval = interval
+        self.sent = 0
+        self.thread = threading.Thread(target=self._run, name="network-pad", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        from network_input import CODE_INDEX, MAX_EVENTS_PER_PACKET
+        while not self.gamepad.stopped:
+            events = [(e.code, e.state) for e in self.gamepad.read() if e.code in CODE_INDEX]
+            for i in range(0, len(events), MAX_EVENTS_PER_PACKET):
+                try:
+                    self.client.send(events[i:i + MAX_EVENTS_PER_PACKET])
+                    self.sent += 1
+                except OSError as e:
+                    print(f"Error enviando eventos virtuales: {e}")
+            time.sleep(self.interval)
+
+
+class UinputPad:
+    """Escribe un control virtual en un dispositivo uinput (requiere evdev y root)
+
+    Así la tormenta pasa por el kernel y la librería inputs real.
+    """
+
+    def __init__(self, gamepad, name="Movimiento Virtual Pad"):
+        from evdev import UInput, AbsInfo, ecodes
+        self.ecodes = ecodes
+        stick = AbsInfo(0, -AXIS_MAX - 1, AXIS_MAX, 16, 128, 0)
+        trigger = AbsInfo(0, 0, TRIGGER_MAX, 0, 0, 0)
+        capabilities = {
+            ecodes.EV_KEY: [getattr(ecodes, code) for code in BUTTON_CODES],
+            ecodes.EV_ABS: [(getattr(ecodes, code), stick) for code in STICK_CODES] +
+                           [(getattr(ecodes, code), trigger) for code in TRIGGER_CODES],
+        }
+        self.device = UInput(capabilities, name=name)
+        self.gamepad = gamepad
+        self.thread = threading.Thread(target=self._run, name="uinput-pad", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        ecodes = self.ecodes
+        try:
+            while not self.gamepad.stopped:
+                for event in self.gamepad.read():
+                    if event.ev_type == "Sync":
+                        self.device.syn()
+                    else:
+                        kind = ecodes.EV_ABS if event.ev_type == "Absolute" else ecodes.EV_KEY
+                        self.device.write(kind, getattr(ecodes, event.code), event.state)
+        finally:
+            self.device.close()
+
+
+if __name__ == "__main__":
+    # Muestra la tasa de eventos generada: python3 virtual_gamepad.py [segundos]
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    pad = VirtualGamepad().start()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pad.read()
+    pad.stop()
+    stats = pad.stats()
+    print(f"{stats['generated'] / seconds:.0f} eventos/s, {stats['dropped']} descartados, "
+          f"profundidad máx. {stats['max_depth']}")
@@ -1,11 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pygame
-import json
+import profile_store
 import os
 from PIL import Image, ImageTk
 import math
 
+# Intervalos de sondeo de la visualización (ms)
+VISUAL_ACTIVE_MS = 16
+VISUAL_IDLE_MS = 100
+
+# Cambio mínimo de un eje (-1..1) para mover su dibujo en el canvas
+AXIS_THRESHOLD = 0.02
+
+# Índices de ejes de pygame para el control Xbox
+AXIS_LX, AXIS_LY, AXIS_LT, AXIS_RX, AXIS_RY, AXIS_RT = range(6)
+
+# Eventos que consume la visualización
+VISUAL_EVENTS = (pygame.JOYAXISMOTION, pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED)
+
 class XboxControllerConfig:
     def __init__(self):
         self.root = tk.Tk()
@@ -15,22 +28,6 @@ class XboxControllerConfig:
         pygame.init()
         pygame.joystick.init()
         
-        # Configuración por defecto
-        self.default_config = {
-            'buttons': {
-                'A': None, 'B': None, 'X': None, 'Y': None,
-                'LB': None, 'RB': None, 'START': None, 'BACK': None
-            },
-            'triggers': {
-                'LT': {'min': 0, 'max': 1},
-                'RT': {'min': 0, 'max': 1}
-            },
-            'sticks': {
-                'LEFT': {'center_x': 0, 'center_y': 0, 'dead_zone': 0.2},
-                'RIGHT': {'center_x': 0, 'center_y': 0, 'dead_zone': 0.2}
-            }
-        }
-        
         self.profiles = {}
         self.current_profile = "Default"
         self.load_profiles()
@@ -40,15 +37,14 @@ class XboxControllerConfig:
         self.update_visualization()
     
     def load_profiles(self):
-        try:
-            with open('controller_profiles.json', 'r') as f:
-                self.profiles = json.load(f)
-        except FileNotFoundError:
-            self.profiles = {"Default": self.default_config.copy()}
+        self.profiles, _ = profile_store.load_profiles()
     
     def save_profiles(self):
-        with open('controller_profiles.json', 'w') as f:
-            json.dump(self.profiles, f, indent=4)
+        try:
+            profile_store.save_profiles(self.profiles)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudieron guardar los perfiles: {e}")
+            return
         messagebox.showinfo("Éxito", "Perfiles guardados correctamente")
     
     def create_notebook_interface(self):
@@ -136,28 +132,112 @@ class XboxControllerConfig:
             )
             scale.pack(side='left', expand=True, fill='x', padx=5)
     
+    def setup_visualization(self):
+        # Un único manejador de joystick para toda la aplicación
+        self.joystick = None
+        self.axis_values = [0.0] * 6
+        self.drawn_values = [None] * 6
+        self.visual_job = None
+        self.visual_interval = VISUAL_ACTIVE_MS
+        self.open_joystick()
+        
+        # Pausar el sondeo cuando la pestaña o la ventana no se ven
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_visibility_changed)
+        self.root.bind('<Map>', self.on_visibility_changed, add='+')
+        self.root.bind('<Unmap>', self.on_visibility_changed, add='+')
+    
+    def open_joystick(self, device_index=0):
+        if pygame.joystick.get_count() > device_index:
+            self.joystick = pygame.joystick.Joystick(device_index)
+            self.joystick.init()
+            self.read_all_axes()
+    
+    def read_all_axes(self):
+        # Sincronizar el estado completo al abrir el control o al reanudar
+        pygame.event.pump()
+        for axis in range(min(6, self.joystick.get_numaxes())):
+            self.axis_values[axis] = self.joystick.get_axis(axis)
+        self.drawn_values = [None] * 6
+    
+    def visualization_visible(self):
+        return (self.notebook.select() == str(self.visual_frame)
+                and self.root.state() != 'iconic')
+    
+    def on_visibility_changed(self, event=None):
+        if self.visualization_visible():
+            if self.visual_job is None:
+                pygame.event.set_allowed(pygame.JOYAXISMOTION)
+                if self.joystick is not None:
+                    self.read_all_axes()
+                self.visual_interval = VISUAL_ACTIVE_MS
+                self.update_visualization()
+        elif self.visual_job is not None:
+            self.root.after_cancel(self.visual_job)
+            self.visual_job = None
+            pygame.event.set_blocked(pygame.JOYAXISMOTION)
+    
     def update_visualization(self):
-        if pygame.joystick.get_count() > 0:
-            joystick = pygame.joystick.Joystick(0)
-            joystick.init()
-            
-            # Actualizar posición de sticks
-            lx = joystick.get_axis(0)
-            ly = joystick.get_axis(1)
-            rx = joystick.get_axis(3)
-            ry = joystick.get_axis(4)
-            
-            # Actualizar visualización de sticks
-            self.update_stick_position(self.left_stick, lx, ly)
-            self.update_stick_position(self.right_stick, rx, ry)
-            
-            # Actualizar visualización de triggers
-            lt = joystick.get_axis(2)
-            rt = joystick.get_axis(5)
-            self.update_trigger_position(self.lt_bar, lt)
-            self.update_trigger_position(self.rt_bar, rt)
+        self.visual_job = None
+        if not self.visualization_visible():
+            # No acumular movimientos de ejes mientras nadie los ve
+            pygame.event.set_blocked(pygame.JOYAXISMOTION)
+            return
+        
+        # Vaciar en un solo lote los eventos acumulados desde el último tick
+        changed = False
+        for event in pygame.event.get(VISUAL_EVENTS):
+            if event.type == pygame.JOYAXISMOTION:
+                if (self.joystick is not None and event.axis < 6
+                        and event.instance_id == self.joystick.get_instance_id()):
+                    self.axis_values[event.axis] = event.value
+                    changed = True
+            elif event.type == pygame.JOYDEVICEADDED:
+                if self.joystick is None:
+                    self.open_joystick(event.device_index)
+                    changed = self.joystick is not None
+            elif event.type == pygame.JOYDEVICEREMOVED:
+                if (self.joystick is not None
+                        and event.instance_id == self.joystick.get_instance_id()):
+                    self.joystick = None
+        # El resto (botones, crucetas...) no lo usa nadie en esta ventana:
+        # descartarlo para que la cola de SDL no crezca
+        pygame.event.clear()
+        
+        if changed:
+            self.redraw_changed_axes()
+            self.visual_interval = VISUAL_ACTIVE_MS
+        else:
+            # Sin actividad, espaciar los ticks hasta VISUAL_IDLE_MS
+            self.visual_interval = min(VISUAL_IDLE_MS, self.visual_interval * 2)
         
-        self.root.after(16, self.update_visualization)  # ~60 FPS
+        self.visual_job = self.root.after(self.visual_interval, self.update_visualization)
+    
+    def axes_moved(self, *axes):
+        # Solo se redibuja si algún eje superó el umbral desde el último dibujo
+        moved = any(
+            self.drawn_values[a] is None
+            or abs(self.axis_values[a] - self.drawn_values[a]) > AXIS_THRESHOLD
+            for a in axes
+        )
+        if moved:
+            for a in axes:
+                self.drawn_values[a] = self.axis_values[a]
+        return moved
+    
+    def redraw_changed_axes(self):
+        values = self.axis_values
+        
+        # Actualizar visualización de sticks
+        if self.axes_moved(AXIS_LX, AXIS_LY):
+            self.update_stick_position(self.left_stick, values[AXIS_LX], values[AXIS_LY])
+        if self.axes_moved(AXIS_RX, AXIS_RY):
+            self.update_stick_position(self.right_stick, values[AXIS_RX], values[AXIS_RY])
+        
+        # Actualizar visualización de triggers
+        if self.axes_moved(AXIS_LT):
+            self.update_trigger_position(self.lt_bar, values[AXIS_LT])
+        if self.axes_moved(AXIS_RT):
+            self.update_trigger_position(self.rt_bar, values[AXIS_RT])
     
     def update_stick_position(self, stick_obj, x, y):
         # Convertir coordenadas de -1,1 a coordenadas de pantalla
@@ -191,9 +271,12 @@ class XboxControllerConfig:
         )
     
     def calibrate_stick_center(self, stick):
-        if pygame.joystick.get_count() > 0:
-            joystick = pygame.joystick.Joystick(0)
-            joystick.init()
+        if self.joystick is None:
+            self.open_joystick()
+        
+        if self.joystick is not None:
+            joystick = self.joystick
+            pygame.event.pump()
             
             if stick == 'LEFT':
                 x = joystick.get_axis(0)
@@ -213,7 +296,7 @@ class XboxControllerConfig:
     def new_profile(self):
         name = tk.simpledialog.askstring("Nuevo Perfil", "Nombre del nuevo perfil:")
         if name and name not in self.profiles:
-            self.profiles[name] = self.default_config.copy()
+            self.profiles[name] = profile_store.default_config()
             self.profile_combo['values'] = list(self.profiles.keys())
             self.profile_var.set(name)
     
@@ -1,5 +1,7 @@
 import pygame
-import json
+import profile_store
+import calibration
+import telemetry
 import os
 import time
 import math
@@ -10,39 +12,24 @@ class XboxControllerConfigHeadless:
         pygame.init()
         pygame.joystick.init()
         
-        # Configuración por defecto
-        self.default_config = {
-            'buttons': {
-                'A': None, 'B': None, 'X': None, 'Y': None,
-                'LB': None, 'RB': None, 'START': None, 'BACK': None
-            },
-            'triggers': {
-                'LT': {'min': 0, 'max': 1},
-                'RT': {'min': 0, 'max': 1}
-            },
-            'sticks': {
-                'LEFT': {'center_x': 0, 'center_y': 0, 'dead_zone': 0.2},
-                'RIGHT': {'center_x': 0, 'center_y': 0, 'dead_zone': 0.2}
-            }
-        }
-        
         self.profiles = {}
         self.current_profile = "Default"
         self.load_profiles()
 
     def load_profiles(self):
-        try:
-            with open('controller_profiles.json', 'r') as f:
-                self.profiles = json.load(f)
-                print("Perfiles cargados exitosamente")
-                print("Perfiles disponibles:", list(self.profiles.keys()))
-        except FileNotFoundError:
-            self.profiles = {"Default": self.default_config.copy()}
+        self.profiles, found = profile_store.load_profiles()
+        if found:
+            print("Perfiles cargados exitosamente")
+            print("Perfiles disponibles:", list(self.profiles.keys()))
+        else:
             print("No se encontraron perfiles previos. Creando perfil por defecto")
 
     def save_profiles(self):
-        with open('controller_profiles.json', 'w') as f:
-            json.dump(self.profiles, f, indent=4)
+        try:
+            profile_store.save_profiles(self.profiles)
+        except OSError as e:
+            print(f"Error guardando perfiles: {e}")
+            return
         print("Perfiles guardados exitosamente")
 
     def monitor_controller(self):
@@ -91,7 +78,49 @@ class XboxControllerConfigHeadless:
             print("\n\nMonitoreo finalizado")
             return True
 
-    def calibrate_sticks(self):
+    def record_telemetry(self, rest_seconds=5, move_seconds=15):
+        """Captura todos los eventos a la frecuencia del control y los analiza"""
+        if pygame.joystick.get_count() == 0:
+            print("No se detectó ningún control")
+            return
+
+        joystick = pygame.joystick.Joystick(0)
+        joystick.init()
+        name = joystick.get_name()
+        recorder = telemetry.TelemetryRecorder()
+
+        print(f"\nTelemetría de alta frecuencia: {name}")
+        print(f"1. Deja los sticks y gatillos sin tocar durante {rest_seconds} s")
+        print(f"2. Después muévelos libremente durante {move_seconds} s")
+        input("Presiona Enter para comenzar...")
+
+        try:
+            telemetry.capture_inputs(recorder, rest_seconds + move_seconds, rest_seconds)
+        except ImportError:
+            print("Librería inputs no disponible, usando eventos de pygame")
+            telemetry.capture_pygame(joystick, recorder, rest_seconds + move_seconds, rest_seconds)
+        except (RuntimeError, OSError) as e:
+            # inputs.UnpluggedError hereda de RuntimeError; OSError al desconectarse
+            print(f"Error leyendo el control con inputs: {e}. Repitiendo la captura con pygame")
+            # Las muestras parciales tienen otro reloj: empezar de nuevo
+            recorder = telemetry.TelemetryRecorder()
+            try:
+                telemetry.capture_pygame(joystick, recorder, rest_seconds + move_seconds, rest_seconds)
+            except KeyboardInterrupt:
+                print("\nCaptura interrumpida")
+        except KeyboardInterrupt:
+            print("\nCaptura interrumpida")
+
+        summary = telemetry.analyze(recorder)
+        print()
+        telemetry.print_summary(summary)
+
+        path = f"telemetria_{time.strftime('%Y%m%d_%H%M%S')}.tlm"
+        telemetry.save(path, recorder, summary, name)
+        print(f"\nTelemetría guardada en {path}")
+        print("Compara controles con: python3 telemetry.py compare archivo1.tlm archivo2.tlm")
+
+    def calibrate_sticks(self, rest_seconds=3, sweep_seconds=8):
         if pygame.joystick.get_count() == 0:
             print("No se detectó ningún control")
             return
@@ -100,21 +129,29 @@ class XboxControllerConfigHeadless:
         joystick.init()
         
         print("\nCalibración de sticks:")
-        print("1. Deja los sticks en posición neutral")
+        print(f"1. Deja los sticks en posición neutral durante {rest_seconds} s")
         input("Presiona Enter cuando estés listo...")
+        rest = calibration.collect_samples(joystick, rest_seconds)
         
-        # Calibrar centro
+        print(f"2. Gira ambos sticks en círculos completos tocando el borde durante {sweep_seconds} s")
+        input("Presiona Enter cuando estés listo...")
+        sweep = calibration.collect_samples(joystick, sweep_seconds)
+        
+        # Ajustar centro, ganancia y zona muerta de cada stick
         for stick in ['LEFT', 'RIGHT']:
-            if stick == 'LEFT':
-                x = joystick.get_axis(0)
-                y = joystick.get_axis(1)
-            else:
-                x = joystick.get_axis(3)
-                y = joystick.get_axis(4)
+            try:
+                result = calibration.calibrate(rest[stick], sweep[stick])
+            except ValueError as e:
+                print(f"No se pudo calibrar el stick {stick}: {e}")
+                continue
             
-            self.profiles[self.current_profile]['sticks'][stick]['center_x'] = x
-            self.profiles[self.current_profile]['sticks'][stick]['center_y'] = y
-            print(f"Stick {stick} calibrado - Centro X:{x:.2f} Y:{y:.2f}")
+            self.profiles[self.current_profile]['sticks'][stick].update(result)
+            print(f"Stick {stick} calibrado con {len(rest[stick][0])} + {len(sweep[stick][0])} muestras")
+            print(f"  Centro X:{result['center_x']:.3f} Y:{result['center_y']:.3f}")
+            print(f"  Ganancia X:{result['gain_x'][0]:.3f}/{result['gain_x'][1]:.3f} "
+                  f"Y:{result['gain_y'][0]:.3f}/{result['gain_y'][1]:.3f}")
+            print(f"  Zona muerta X:{result['dead_zone_x']:.3f} Y:{result['dead_zone_y']:.3f}")
+        print("Recuerda guardar la configuración para conservar la calibración")
 
     def show_menu(self):
         while True:
@@ -124,7 +161,8 @@ class XboxControllerConfigHeadless:
             print("3. Crear nuevo perfil")
             print("4. Cambiar perfil actual")
             print("5. Guardar configuración")
-            print("6. Salir")
+            print("6. Telemetría de alta frecuencia")
+            print("7. Salir")
             
             option = input("\nSelecciona una opción: ")
             
@@ -135,7 +173,7 @@ class XboxControllerConfigHeadless:
             elif option == "3":
                 name = input("Nombre del nuevo perfil: ")
                 if name and name not in self.profiles:
-                    self.profiles[name] = self.default_config.copy()
+                    self.profiles[name] = profile_store.default_config()
                     self.current_profile = name
                     print(f"Perfil '{name}' creado y seleccionado")
             elif option == "4":
@@ -152,6 +190,8 @@ class XboxControllerConfigHeadless:
             elif option == "5":
                 self.save_profiles()
             elif option == "6":
+                self.record_telemetry()
+            elif option == "7":
                 print("¡Hasta luego!")
                 break
             else:
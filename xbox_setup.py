@@ -1,14 +1,31 @@
 #!/usr/bin/env python3
+import argparse
 import subprocess
 import time
 import os
 import sys
 
+# Paquetes necesarios para compilar e instalar xpadneo
+DEPENDENCIES = [
+    'dkms',
+    'git',
+    'raspberrypi-kernel-headers',
+    'bluetooth',
+    'bluez'
+]
+
+XPADNEO_URL = 'https://github.com/atar-axis/xpadneo.git'
+XPADNEO_MODULE = 'hid-xpadneo'
+
 class XboxControllerSetup:
-    def __init__(self):
+    def __init__(self, runner=None, cache_dir=None):
         self.controller_mac = None
         self.controller_name = "Xbox Wireless Controller"
         self.xpadneo_path = "xpadneo"
+        # Ejecutor de comandos con la firma de subprocess.run (reemplazable en pruebas)
+        self.run = runner or subprocess.run
+        # Caché local con debs/ y xpadneo/ para instalar sin conexión
+        self.cache_dir = cache_dir
 
     def check_root(self):
         """Verifica privilegios de root"""
@@ -17,42 +34,110 @@ class XboxControllerSetup:
             print("Por favor, ejecuta: sudo python3 xbox_setup.py")
             sys.exit(1)
 
+    def installed_packages(self, packages):
+        """Paquetes de la lista que dpkg ya tiene instalados (una sola consulta)"""
+        result = self.run(['dpkg-query', '-W', '-f=${Package} ${db:Status-Status}\n', *packages],
+                          capture_output=True, text=True)
+        # dpkg-query termina con error si algún paquete no existe, pero lista los demás
+        installed = set()
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if len(parts) == 2 and parts[1] == 'installed':
+                installed.add(parts[0].split(':')[0])
+        return installed
+
+    def xpadneo_status(self):
+        """'installed' si el módulo está compilado para el kernel actual,
+        'registered' si DKMS lo conoce pero no para este kernel, o None"""
+        kernel = self.run(['uname', '-r'], capture_output=True, text=True).stdout.strip()
+        lsmod = self.run(['lsmod'], capture_output=True, text=True)
+        if 'xpadneo' in lsmod.stdout:
+            return 'installed'
+        try:
+            dkms = self.run(['dkms', 'status', XPADNEO_MODULE], capture_output=True, text=True)
+        except OSError:
+            return None
+        status = None
+        for line in dkms.stdout.splitlines():
+            if 'xpadneo' not in line:
+                continue
+            status = 'registered'
+            if kernel in line and line.rstrip().endswith('installed'):
+                return 'installed'
+        return status
+
+    def cached_debs(self, packages):
+        """Rutas de los .deb en caché, o None si falta alguno de los paquetes"""
+        if not self.cache_dir:
+            return None
+        debs_dir = os.path.join(self.cache_dir, 'debs')
+        try:
+            files = os.listdir(debs_dir)
+        except OSError:
+            return None
+        for package in packages:
+            if not any(name.startswith(package + '_') and name.endswith('.deb') for name in files):
+                return None
+        # Se pasan todos los .deb de la caché para que apt resuelva las dependencias
+        return sorted(os.path.join(debs_dir, name) for name in files if name.endswith('.deb'))
+
+    def install_packages(self, packages):
+        """Instala los paquetes que faltan en una sola transacción de apt"""
+        installed = self.installed_packages(packages)
+        missing = [p for p in packages if p not in installed]
+        if not missing:
+            print("Dependencias ya instaladas")
+            return
+        debs = self.cached_debs(missing)
+        if debs:
+            print(f"Instalando desde la caché local: {', '.join(missing)}")
+            self.run(['apt-get', 'install', '-y', '--no-download', *debs], check=True)
+        else:
+            print(f"Instalando {', '.join(missing)}...")
+            self.run(['apt-get', 'update'], check=True)
+            self.run(['apt-get', 'install', '-y', *missing], check=True)
+
+    def xpadneo_source(self):
+        """Carpeta con el código de xpadneo: la caché local o un clon actualizado"""
+        if self.cache_dir:
+            cached = os.path.join(self.cache_dir, 'xpadneo')
+            if os.path.isdir(cached):
+                return cached
+        if os.path.isdir(os.path.join(self.xpadneo_path, '.git')):
+            self.run(['git', '-C', self.xpadneo_path, 'pull', '--ff-only'], check=True)
+        else:
+            self.run(['git', 'clone', XPADNEO_URL, self.xpadneo_path], check=True)
+        return self.xpadneo_path
+
+    def install_xpadneo(self):
+        status = self.xpadneo_status()
+        if status == 'installed':
+            print("xpadneo ya instalado")
+            return
+        if status == 'registered':
+            # Registrado en DKMS para otro kernel: solo hace falta compilarlo
+            print("Compilando xpadneo para el kernel actual...")
+            self.run(['dkms', 'autoinstall'], check=True)
+            return
+        print("\nInstalando xpadneo...")
+        self.run(['./install.sh'], check=True, cwd=self.xpadneo_source())
+
     def install_dependencies(self):
-        """Instala las dependencias necesarias y xpadneo"""
+        """Instala las dependencias necesarias y xpadneo
+
+        Consulta primero lo que ya está instalado, así que ejecutarlo de
+        nuevo en un equipo listo no descarga ni compila nada.
+        """
         print("Instalando dependencias...")
         try:
-            # Actualizar repositorios
-            subprocess.run(['apt-get', 'update'], check=True)
-            
-            # Instalar dependencias necesarias
-            dependencies = [
-                'dkms',
-                'git',
-                'raspberrypi-kernel-headers',
-                'bluetooth',
-                'bluez'
-            ]
-            
-            for dep in dependencies:
-                print(f"Instalando {dep}...")
-                subprocess.run(['apt-get', 'install', '-y', dep], check=True)
+            self.install_packages(DEPENDENCIES)
 
             # Desinstalar xboxdrv si está instalado
-            try:
-                subprocess.run(['apt-get', 'remove', '-y', 'xboxdrv'], check=True)
-            except:
-                pass
-
-            # Instalar xpadneo
-            print("\nInstalando xpadneo...")
-            if os.path.exists(self.xpadneo_path):
-                subprocess.run(['rm', '-rf', self.xpadneo_path], check=True)
-            
-            subprocess.run(['git', 'clone', 'https://github.com/atar-axis/xpadneo.git'], check=True)
-            os.chdir(self.xpadneo_path)
-            subprocess.run(['./install.sh'], check=True)
-            os.chdir('..')
-            
+            if self.installed_packages(['xboxdrv']):
+                self.run(['apt-get', 'remove', '-y', 'xboxdrv'], check=True)
+
+            self.install_xpadneo()
+
             print("Dependencias instaladas correctamente")
             return True
 
@@ -60,16 +145,37 @@ class XboxControllerSetup:
             print(f"Error instalando dependencias: {e}")
             return False
 
+    def fill_cache(self):
+        """Descarga a la caché los paquetes (con sus dependencias) y xpadneo"""
+        debs_dir = os.path.join(self.cache_dir, 'debs')
+        os.makedirs(debs_dir, exist_ok=True)
+        try:
+            self.run(['apt-get', 'update'], check=True)
+            # --reinstall baja también los paquetes ya instalados aquí; las dependencias
+            # instaladas no se bajan, así que conviene llenar la caché desde una imagen limpia
+            self.run(['apt-get', 'install', '-y', '--download-only', '--reinstall',
+                      '-o', f'Dir::Cache::archives={os.path.abspath(debs_dir)}', *DEPENDENCIES], check=True)
+            source = os.path.join(self.cache_dir, 'xpadneo')
+            if os.path.isdir(os.path.join(source, '.git')):
+                self.run(['git', '-C', source, 'pull', '--ff-only'], check=True)
+            else:
+                self.run(['git', 'clone', XPADNEO_URL, source], check=True)
+            print(f"Caché lista en {self.cache_dir}")
+            return True
+        except Exception as e:
+            print(f"Error preparando la caché: {e}")
+            return False
+
     def setup_bluetooth_connection(self):
         """Configura la conexión Bluetooth con el control"""
         print("\nConfigurando conexión Bluetooth...")
         
         def execute_bluetooth_command(command, timeout=10):
             try:
-                result = subprocess.run(['bluetoothctl', *command.split()],
-                                      capture_output=True,
-                                      text=True,
-                                      timeout=timeout)
+                result = self.run(['bluetoothctl', *command.split()],
+                                capture_output=True,
+                                text=True,
+                                timeout=timeout)
                 return result.stdout
             except Exception as e:
                 print(f"Error ejecutando comando bluetooth: {e}")
@@ -77,7 +183,7 @@ class XboxControllerSetup:
 
         try:
             # Reiniciar servicio bluetooth
-            subprocess.run(['systemctl', 'restart', 'bluetooth'], check=True)
+            self.run(['systemctl', 'restart', 'bluetooth'], check=True)
             time.sleep(2)
 
             # Configuración inicial bluetooth
@@ -153,24 +259,24 @@ class XboxControllerSetup:
         """Verifica el funcionamiento del control"""
         try:
             # Verificar módulo xpadneo
-            lsmod = subprocess.run(['lsmod'], capture_output=True, text=True)
+            lsmod = self.run(['lsmod'], capture_output=True, text=True)
             if 'xpadneo' not in lsmod.stdout:
                 print("Módulo xpadneo no detectado")
                 return False
 
             # Verificar dispositivo de juego
-            js_check = subprocess.run(['ls', '/dev/input/js0'], 
-                                    capture_output=True, 
-                                    text=True)
+            js_check = self.run(['ls', '/dev/input/js0'], 
+                              capture_output=True, 
+                              text=True)
             if js_check.returncode != 0:
                 print("Control no detectado en /dev/input/js0")
                 return False
 
             # Verificar conexión bluetooth
             if self.controller_mac:
-                info = subprocess.run(['bluetoothctl', 'info', self.controller_mac],
-                                    capture_output=True,
-                                    text=True)
+                info = self.run(['bluetoothctl', 'info', self.controller_mac],
+                              capture_output=True,
+                              text=True)
                 if "Connected: yes" not in info.stdout:
                     print("Control no conectado via Bluetooth")
                     return False
@@ -202,12 +308,22 @@ class XboxControllerSetup:
             print("\nSe recomienda reiniciar el sistema.")
             print("¿Deseas reiniciar ahora? (s/n)")
             if input().lower() == 's':
-                subprocess.run(['reboot'])
+                self.run(['reboot'])
             return True
         else:
             print("Error en la verificación final del control")
             return False
 
 if __name__ == "__main__":
-    setup = XboxControllerSetup()
+    # sudo python3 xbox_setup.py [--cache DIR] [--fill-cache]
+    parser = argparse.ArgumentParser(description="Configura un control Xbox One con xpadneo")
+    parser.add_argument('--cache', help="carpeta con paquetes y código de xpadneo para instalar sin conexión")
+    parser.add_argument('--fill-cache', action='store_true', help="solo descargar a la caché")
+    args = parser.parse_args()
+    setup = XboxControllerSetup(cache_dir=args.cache)
+    if args.fill_cache:
+        if not args.cache:
+            parser.error("--fill-cache necesita --cache")
+        setup.check_root()
+        sys.exit(0 if setup.fill_cache() else 1)
     setup.setup() 
\ No newline at end of file